@@ -0,0 +1,110 @@
+"""
+Una consulta lenta en una sesión no retrasa los eventos de otras sesiones.
+
+Se lanza una consulta de varios segundos con ``run_db`` y, en paralelo, se
+miden la latencia del event loop y de consultas rápidas en otras sesiones.
+Como comparación se ejecuta la misma consulta de forma síncrona dentro de la
+corrutina, como hacían antes los handlers. El script termina con código 1 si
+la latencia de las consultas rápidas supera ``--max-delay-ms`` en modo async.
+La base de datos es un SQLite temporal. ``tests/test_async_sessions.py``
+comprueba lo mismo con una consulta más corta.
+
+Uso:
+    python -m benchmarks.async_sessions [--rows 3000000] [--max-delay-ms 250]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import text
+
+SLOW_SQL = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT count(*) FROM c"
+)
+FAST_SQL = text("SELECT count(*) FROM users")
+
+
+def _slow(db, rows):
+    return db.execute(SLOW_SQL, {"n": rows}).scalar()
+
+
+def _fast(db):
+    return db.execute(FAST_SQL).scalar()
+
+
+async def _measure(slow_call):
+    from pacta.utils.database import run_db
+
+    delays = []
+
+    async def other_session():
+        # Eventos de otro cliente: una consulta corta cada 20 ms
+        while not done.is_set():
+            start = time.perf_counter()
+            await run_db(_fast)
+            delays.append(time.perf_counter() - start)
+            await asyncio.sleep(0.02)
+
+    done = asyncio.Event()
+    other = asyncio.create_task(other_session())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await slow_call()
+    slow_elapsed = time.perf_counter() - start
+    done.set()
+    await other
+    return slow_elapsed, max(delays) * 1000, len(delays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--max-delay-ms", type=float, default=250)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Antes de importar pacta: la configuración se lee al importar
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'sessions.db')}"
+        run(args)
+
+
+def run(args):
+    from pacta.utils.database import SessionLocal, async_engine, init_db, run_db
+
+    init_db()
+    print(f"driver async: {'sí' if async_engine is not None else 'no (pool de hilos)'}")
+
+    async def blocking():
+        db = SessionLocal()
+        try:
+            _slow(db, args.rows)
+        finally:
+            db.close()
+
+    async def offloaded():
+        await run_db(_slow, args.rows)
+
+    async def run_all():
+        # Un solo event loop: las conexiones async del pool están ligadas a él
+        results = {}
+        for name, call in (("bloqueante", blocking), ("run_db", offloaded)):
+            slow_elapsed, worst, count = await _measure(call)
+            results[name] = worst
+            print(
+                f"{name:>10}: consulta lenta {slow_elapsed:.2f}s, "
+                f"{count} consultas rápidas en paralelo, peor latencia {worst:.1f} ms"
+            )
+        return results
+
+    results = asyncio.run(run_all())
+    if results["run_db"] > args.max_delay_ms:
+        print(f"FALLO: la consulta lenta retrasó otras sesiones más de {args.max_delay_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
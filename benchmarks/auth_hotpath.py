@@ -0,0 +1,131 @@
+"""
+Microbenchmarks del camino crítico de autenticación, con salida JSON.
+
+Cubre bcrypt (hash/verify a varios costes), creación y decodificación de JWT,
+el rate limiter con muchas claves, tokens CSRF y la búsqueda de usuario sobre
+un SQLite temporal con 100k usuarios. No necesita red ni servicios externos.
+
+Uso:
+    python -m benchmarks.auth_hotpath --output results.json [--filter bcrypt] [--quick]
+    python -m benchmarks.compare base.json results.json
+"""
+import argparse
+import os
+import random
+import tempfile
+from datetime import timedelta
+
+import bcrypt
+import jwt
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.harness import Suite
+from pacta.models.user import Base, UserModel
+from pacta.utils.csrf import CsrfProtector
+from pacta.utils.database import create_db_engine
+from pacta.utils.rate_limit import MemoryRateLimiter
+from pacta.utils.tokens import ALGORITHM, SECRET_KEY, create_access_token
+from pacta.utils.user_cache import _load_user
+
+
+def bench_bcrypt(suite, costs):
+    password = b"correct horse battery staple"
+    for cost in costs:
+        stored = bcrypt.hashpw(password, bcrypt.gensalt(cost))
+        suite.bench(f"bcrypt.hash[cost={cost}]", lambda: bcrypt.hashpw(password, bcrypt.gensalt(cost)), cost=cost)
+        suite.bench(f"bcrypt.verify[cost={cost}]", lambda: bcrypt.checkpw(password, stored), cost=cost)
+
+
+def bench_jwt(suite):
+    expire = timedelta(minutes=60)
+    token = create_access_token({"sub": "admin"}, expire)
+    suite.bench("jwt.create_access_token", lambda: create_access_token({"sub": "admin"}, expire))
+    suite.bench("jwt.decode", lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
+
+
+def bench_rate_limit(suite, key_counts):
+    for keys in key_counts:
+        limiter = MemoryRateLimiter(5, 900, max_keys=keys * 2)
+        for i in range(keys):
+            limiter.check(f"ip:{i}")
+        counter = iter(range(10 ** 12))
+        suite.bench(
+            f"rate_limit.check_existing[keys={keys}]",
+            lambda: limiter.check(f"ip:{random.randrange(keys)}"),
+            keys=keys,
+        )
+        suite.bench(
+            f"rate_limit.check_new[keys={keys}]",
+            lambda: limiter.check(f"new:{next(counter)}"),
+            keys=keys,
+        )
+
+
+def bench_csrf(suite):
+    protector = CsrfProtector(keys=[b"bench-key"], one_time=False)
+    token = protector.issue("session")
+    suite.bench("csrf.issue", lambda: protector.issue("session"))
+    suite.bench("csrf.verify", lambda: protector.verify(token, "session"))
+
+    one_time = CsrfProtector(keys=[b"bench-key"], one_time=True)
+    suite.bench("csrf.issue_verify_one_time", lambda: one_time.verify(one_time.issue("session"), "session"))
+
+
+def bench_user_lookup(suite, users):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'users.db')}")
+        Base.metadata.create_all(engine)
+        batch = 10_000
+        with engine.begin() as conn:
+            for start in range(0, users, batch):
+                conn.execute(insert(UserModel), [
+                    {"username": f"user{i}", "email": f"user{i}@pacta.app", "password_hash": "x", "is_active": True}
+                    for i in range(start, min(start + batch, users))
+                ])
+        Session = sessionmaker(bind=engine, expire_on_commit=False)
+        db = Session()
+        try:
+            suite.bench(
+                f"user_lookup.by_username[users={users}]",
+                lambda: _load_user(db, f"user{random.randrange(users)}"),
+                users=users,
+            )
+            suite.bench(
+                f"user_lookup.missing[users={users}]",
+                lambda: _load_user(db, f"missing{random.randrange(users)}"),
+                users=users,
+            )
+        finally:
+            db.close()
+            engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    parser.add_argument("--filter", help="Ejecutar solo las mediciones cuyo nombre contenga este texto")
+    parser.add_argument("--quick", action="store_true", help="Menos repeticiones y tamaños reducidos")
+    args = parser.parse_args()
+
+    suite = Suite(
+        "auth_hotpath",
+        filter_=args.filter,
+        repeat=3 if args.quick else 5,
+        min_time=0.05 if args.quick else 0.2,
+    )
+    if suite.wants_group("bcrypt"):
+        bench_bcrypt(suite, (4, 10) if args.quick else (4, 10, 12, 14))
+    if suite.wants_group("jwt"):
+        bench_jwt(suite)
+    if suite.wants_group("rate_limit"):
+        bench_rate_limit(suite, (10_000,) if args.quick else (10_000, 1_000_000))
+    if suite.wants_group("csrf"):
+        bench_csrf(suite)
+    if suite.wants_group("user_lookup"):
+        bench_user_lookup(suite, 10_000 if args.quick else 100_000)
+    suite.write(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Arranque en frío: coste de importar pacta y tiempo hasta la primera petición
+servida por un worker.
+
+Cada medición se hace en un proceso nuevo, con ``DB_URL`` apuntando a un
+SQLite temporal y el directorio del repositorio como cwd (``rxconfig.py``):
+
+- ``import.<módulo>``: ``python -X importtime -c "import <módulo>"`` para
+  ``pacta``, ``pacta.utils.database``, ``pacta.cli`` y ``pacta.pacta``; guarda
+  el tiempo total y el desglose del tiempo propio por paquete raíz (reflex,
+  sqlalchemy, fastapi, alembic, numpy, pacta…), que indica qué se ha cargado;
+- ``first_request``: arranca un worker como ``reflex run --env prod``
+  (``granian --factory pacta.pacta:app`` sin compilar el frontend) y mide
+  desde el lanzamiento hasta la primera respuesta de ``/ping``, después de la
+  importación, ``app()`` y las lifespan tasks (``init_db`` incluido). El
+  primer arranque aplica las migraciones y no se mide.
+
+Termina con código 1 si ``import pacta`` carga reflex o SQLAlchemy, o si
+importar ``pacta.pacta`` crea la base de datos (la inicialización debe
+ocurrir al arrancar el worker, no al importar).
+
+Uso:
+    python -m benchmarks.cold_start [--repeat 5] [--top 8] [--output cold_start.json]
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.harness import Suite
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["pacta", "pacta.utils.database", "pacta.cli", "pacta.pacta"]
+BOOT_TIMEOUT = 120
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime(module: str, env: dict) -> tuple:
+    """Total en µs y tiempo propio por paquete raíz de ``import module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"import {module} ha fallado:\n{result.stderr[-2000:]}")
+    total = 0
+    packages = Counter()
+    for match in _IMPORT_LINE.finditer(result.stderr):
+        own, cumulative, indent, name = match.groups()
+        packages[name.split(".")[0]] += int(own)
+        # Los módulos de primer nivel no se solapan entre sí
+        if len(indent) == 1:
+            total += int(cumulative)
+    return total, packages
+
+
+def loads(module: str, env: dict, packages) -> list:
+    """Cuáles de ``packages`` quedan en ``sys.modules`` tras ``import module``."""
+    code = f"import sys, {module}; print(' '.join(p for p in {list(packages)!r} if p in sys.modules))"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, env=env, text=True)
+    return output.split()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def boot(env: dict) -> float:
+    """Segundos desde lanzar el worker hasta la primera respuesta de /ping."""
+    port = free_port()
+    start = time.perf_counter()
+    worker = subprocess.Popen(
+        ["granian", "--log-level", "critical", "--host", "127.0.0.1", "--port", str(port),
+         "--interface", "asgi", "--factory", "pacta.pacta:app"],
+        cwd=ROOT, env={**env, "__REFLEX_SKIP_COMPILE": "true"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/ping", timeout=1) as response:
+                    response.read()
+                return time.perf_counter() - start
+            except OSError:
+                if worker.poll() is not None:
+                    raise RuntimeError(f"el worker ha terminado:\n{worker.stderr.read()[-2000:]}")
+                if time.perf_counter() - start > BOOT_TIMEOUT:
+                    raise RuntimeError("el worker no responde")
+                time.sleep(0.01)
+    finally:
+        worker.terminate()
+        worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Paquetes del desglose por módulo")
+    parser.add_argument("--no-boot", action="store_true", help="Medir solo las importaciones")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    suite = Suite("cold_start", repeat=args.repeat)
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "cold_start.db"
+        env = {**os.environ, "PYTHONPATH": str(ROOT), "DB_URL": f"sqlite:///{db_path}"}
+
+        for module in MODULES:
+            runs = [importtime(module, env) for _ in range(args.repeat)]
+            total, packages = min(runs, key=lambda run: run[0])
+            top = dict(packages.most_common(args.top))
+            suite.results[f"import.{module}"] = {
+                "min_us": total,
+                "mean_us": sum(run[0] for run in runs) / len(runs),
+                "repeat": args.repeat,
+                "self_us_by_package": top,
+            }
+            breakdown = "  ".join(f"{name} {us / 1000:.0f}" for name, us in top.items())
+            print(f"{'import.' + module:<28} {total / 1000:8.1f} ms   ({breakdown})", file=sys.stderr)
+
+        heavy = loads("pacta", env, ["reflex", "sqlalchemy", "fastapi", "numpy"])
+        if {"reflex", "sqlalchemy"} & set(heavy):
+            failures.append(f"import pacta carga {', '.join(heavy)}")
+        if db_path.exists():
+            failures.append("importar pacta.pacta crea la base de datos")
+
+        if not args.no_boot:
+            boot(env)  # Primer arranque: migraciones
+            timings = [boot(env) for _ in range(args.repeat)]
+            suite.results["first_request"] = {
+                "min_us": min(timings) * 1e6,
+                "mean_us": sum(timings) / len(timings) * 1e6,
+                "repeat": args.repeat,
+            }
+            print(f"{'first_request':<28} {min(timings) * 1000:8.1f} ms   "
+                  f"(media {sum(timings) / len(timings) * 1000:.1f} ms)", file=sys.stderr)
+
+    suite.write(args.output)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Comparar dos resultados JSON de ``benchmarks/harness.py``.
+
+Termina con código 1 si alguna medición común empeora más que ``--threshold``
+(por defecto un 10 % en el tiempo mínimo por operación).
+
+Uso:
+    python -m benchmarks.compare base.json nuevo.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)["results"]
+
+    regressions = 0
+    for name in sorted(set(baseline) & set(candidate)):
+        before = baseline[name]["min_us"]
+        after = candidate[name]["min_us"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESIÓN"
+            regressions += 1
+        print(f"{name:<45} {before:12.2f} → {after:12.2f} µs  {change:+7.1%}{flag}")
+
+    for name in sorted(set(candidate) - set(baseline)):
+        print(f"{name:<45} (nuevo)")
+    for name in sorted(set(baseline) - set(candidate)):
+        print(f"{name:<45} (eliminado)")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
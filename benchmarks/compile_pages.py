@@ -0,0 +1,184 @@
+"""
+Compilación del frontend con muchas páginas: tiempo de ``reflex compile`` y
+``reflex export`` y tamaño del JS por página.
+
+Genera en un directorio temporal una aplicación Reflex con ``--pages``
+páginas (por defecto 32) que usan el marco de pacta (``LayoutBase``, con
+``Sidebar`` y ``Header``) y cuatro alertas (una por ``AlertType``, una de ellas
+con la descripción en un Var de estado). Los componentes y estilos se copian
+del árbol de trabajo, o de ``git show <rev>:...`` para ``--baseline``, así que
+la aplicación no importa ``pacta`` (ni su base de datos). Para cada versión
+mide:
+
+- ``compile``: ``reflex compile`` y bytes de JSX generados (rutas y módulo de
+  componentes memoizados), en total y por página;
+- ``export``: ``reflex export --frontend-only --no-zip`` (incluye instalar
+  las dependencias del frontend la primera vez, que se mide aparte con una
+  exportación previa) y bytes del bundle en ``.web/build/client``.
+
+Con ``--baseline`` termina con código 1 si el JSX por página no se reduce.
+
+Uso:
+    python -m benchmarks.compile_pages [--pages 32] [--baseline HEAD] [--no-export] [--output compile.json]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_NAME = "pactabench"
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = [
+    "pacta/components/alerts.py",
+    "pacta/components/header.py",
+    "pacta/components/layout_base.py",
+    "pacta/components/sidebar.py",
+    "pacta/styles/styles.py",
+]
+
+RXCONFIG = f"""\
+import reflex as rx
+
+config = rx.Config(app_name="{APP_NAME}", telemetry_enabled=False, plugins=[])
+"""
+
+APP = """\
+import reflex as rx
+
+from .components.alerts import AlertType, alert
+from .components.layout_base import LayoutBase
+
+
+class BenchState(rx.State):
+    error: str = ""
+
+    def clear_error(self):
+        self.error = ""
+
+
+def make_page(i: int):
+    def page():
+        return LayoutBase(
+            rx.vstack(
+                rx.heading(f"Página {i}"),
+                alert(title="Guardado", description=f"Contrato {i} guardado", status=AlertType.SUCCESS),
+                alert(title="Atención", description="Vence en 30 días", status=AlertType.WARNING, is_closable=False),
+                alert(description="Sin cambios pendientes", status=AlertType.INFO, show_icon=False),
+                alert(description=BenchState.error, status=AlertType.ERROR, on_close=BenchState.clear_error),
+                rx.text(f"Contenido de la página {i}"),
+                width="100%",
+            )
+        )
+    return page
+
+
+app = rx.App()
+for i in range(PAGES):
+    app.add_page(make_page(i), route=f"/pagina-{i}", title=f"Página {i}")
+"""
+
+
+def source(rev, path: str) -> str:
+    if rev is None:
+        return (ROOT / path).read_text()
+    return subprocess.check_output(["git", "show", f"{rev}:{path}"], cwd=ROOT, text=True)
+
+
+def build_app(directory: Path, rev, pages: int):
+    (directory / "rxconfig.py").write_text(RXCONFIG)
+    package = directory / APP_NAME
+    for path in SOURCES:
+        target = package / Path(path).relative_to("pacta")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(source(rev, path))
+        (target.parent / "__init__.py").touch()
+    (package / "__init__.py").touch()
+    (package / f"{APP_NAME}.py").write_text(APP.replace("PAGES", str(pages)))
+
+
+def reflex(directory: Path, *args) -> float:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "reflex", *args, "--loglevel", "warning"],
+        cwd=directory, env={**os.environ, "PYTHONPATH": str(directory)},
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(f"reflex {' '.join(args)} ha fallado:\n{result.stdout[-2000:]}")
+    return elapsed
+
+
+def tree_bytes(path: Path, pattern: str = "*") -> int:
+    return sum(f.stat().st_size for f in path.rglob(pattern) if f.is_file())
+
+
+def compiled_bytes(web: Path) -> int:
+    # Rutas compiladas más el módulo donde Reflex deja los componentes de rx.memo
+    return tree_bytes(web / "app" / "routes", "*.jsx") + tree_bytes(web / "utils", "components.js*")
+
+
+def run(label: str, rev, args, suite):
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        build_app(directory, rev, args.pages)
+        # Primera compilación: reflex init del directorio .web, no se mide
+        reflex(directory, "compile")
+        elapsed = min(reflex(directory, "compile") for _ in range(args.repeat))
+        jsx = compiled_bytes(directory / ".web")
+        suite.results[f"{label}.compile"] = {
+            "min_us": elapsed * 1e6,
+            "pages": args.pages,
+            "jsx_bytes": jsx,
+            "jsx_bytes_per_page": jsx / args.pages,
+        }
+        print(f"{label + '.compile':<22} {elapsed:8.2f} s   JSX {jsx / 1024:9.1f} KiB "
+              f"({jsx / args.pages / 1024:6.1f} KiB/página)", file=sys.stderr)
+        if args.no_export:
+            return
+        # La primera exportación instala las dependencias de node
+        reflex(directory, "export", "--frontend-only", "--no-zip")
+        elapsed = min(reflex(directory, "export", "--frontend-only", "--no-zip") for _ in range(args.repeat))
+        bundle = tree_bytes(directory / ".web" / "build" / "client", "*.js")
+        suite.results[f"{label}.export"] = {
+            "min_us": elapsed * 1e6,
+            "pages": args.pages,
+            "bundle_bytes": bundle,
+            "bundle_bytes_per_page": bundle / args.pages,
+        }
+        print(f"{label + '.export':<22} {elapsed:8.2f} s   JS  {bundle / 1024:9.1f} KiB "
+              f"({bundle / args.pages / 1024:6.1f} KiB/página)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="Revisión de git con la que comparar (p. ej. HEAD)")
+    parser.add_argument("--no-export", action="store_true", help="Medir solo reflex compile")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    from benchmarks.harness import Suite
+
+    suite = Suite("compile_pages")
+    failures = []
+    if args.baseline:
+        run("baseline", args.baseline, args, suite)
+    run("current", None, args, suite)
+    suite.write(args.output)
+
+    if args.baseline:
+        before = suite.results["baseline.compile"]["jsx_bytes_per_page"]
+        after = suite.results["current.compile"]["jsx_bytes_per_page"]
+        if after >= before:
+            failures.append(f"el JSX por página no se reduce ({before:.0f} -> {after:.0f} bytes)")
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Analítica de cartera: instantánea columnar con NumPy frente a recorrer el ORM.
+
+Carga ``--rows`` contratos (por defecto 1M) en un SQLite temporal con las
+migraciones aplicadas y mide:
+
+- ``snapshot.load``: carga completa de la instantánea y su tamaño en memoria,
+  con el diccionario de contrapartes (``snapshot.memory``: el tamaño una vez
+  calculado el índice de renovaciones);
+- ``snapshot.refresh``: refresco sin cambios y tras modificar e insertar 10k
+  contratos desde "otro worker";
+- ``metrics.*``: cada métrica vectorizada y ``portfolio`` completo sobre la
+  instantánea ya cargada (``.cold``: reconstruyendo el índice de
+  renovaciones, que se reutiliza mientras la instantánea no cambia);
+- ``orm``: las mismas métricas recorriendo ``ContractModel`` con
+  ``yield_per``, como haría el código fila a fila.
+
+Los resultados de las dos versiones deben coincidir; si no, termina con
+código 1.
+
+Uso:
+    python -m benchmarks.contract_analytics [--rows 1000000] [--output analytics.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from benchmarks.contracts_search import contract_rows
+from benchmarks.harness import Suite
+from benchmarks.reminder_scheduler import seed
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.utils import analytics
+from pacta.utils.database import create_db_engine
+from pacta.utils.statistics import TOP_COUNTERPARTIES, cents
+
+CHANGES = 10_000
+
+
+def _quarter(day: date) -> int:
+    return (day.year - 1970) * 4 + (day.month - 1) // 3
+
+
+def memory(snapshot: analytics.ContractSnapshot) -> dict:
+    """Bytes de la instantánea: total, por contrato y el diccionario de contrapartes."""
+    result = {
+        "bytes": snapshot.nbytes,
+        "bytes_per_contract": snapshot.nbytes / max(len(snapshot), 1),
+        "counterparties": len(snapshot.counterparties),
+        "counterparties_bytes": snapshot.counterparties.nbytes,
+    }
+    print(f"memoria: {result['bytes'] / 1024 ** 2:.0f} MB ({result['bytes_per_contract']:.0f} B/contrato), "
+          f"{result['counterparties']} contrapartes ({result['counterparties_bytes'] / 1024 ** 2:.0f} MB)",
+          file=sys.stderr)
+    return result
+
+
+def orm_portfolio(db, today: date) -> dict:
+    """Las métricas de ``analytics.portfolio`` contrato a contrato con el ORM."""
+    first = _quarter(today)
+    cohort_start = first - analytics.ANALYTICS_COHORTS + 1
+    expiry = defaultdict(lambda: [0, 0])
+    exposure = defaultdict(lambda: [0, 0])
+    starts = defaultdict(list)
+    ended = []
+    for contract in db.query(ContractModel).yield_per(10_000):
+        if contract.status == ContractStatus.DRAFT:
+            continue
+        starts[contract.counterparty, contract.contract_type].append((contract.start_date, contract.id))
+        if contract.end_date < today and _quarter(contract.end_date) >= cohort_start:
+            ended.append((contract.id, contract.counterparty, contract.contract_type, contract.end_date))
+        if contract.status == ContractStatus.ACTIVE and contract.end_date >= today:
+            value = cents(contract.value)
+            quarter = _quarter(contract.end_date)
+            if quarter - first < analytics.ANALYTICS_QUARTERS:
+                expiry[quarter, contract.currency][0] += 1
+                expiry[quarter, contract.currency][1] += value
+            exposure[contract.counterparty, contract.currency][0] += 1
+            exposure[contract.counterparty, contract.currency][1] += value
+        db.expunge(contract)
+
+    cohorts = defaultdict(lambda: [0, 0])
+    before, after = timedelta(days=analytics.RENEWAL_BEFORE_DAYS), timedelta(days=analytics.RENEWAL_AFTER_DAYS)
+    for contract_id, counterparty, contract_type, end_date in ended:
+        renewed = any(
+            other != contract_id and end_date - before <= start <= end_date + after
+            for start, other in starts[counterparty, contract_type]
+        )
+        cohort = cohorts[_quarter(end_date)]
+        cohort[0] += 1
+        cohort[1] += renewed
+
+    top = sorted(exposure.items(), key=lambda item: (-item[1][1], item[0]))[:TOP_COUNTERPARTIES]
+    return {
+        "value_at_expiry": [
+            {"key": analytics.quarter_label(quarter), "currency": currency, "contracts": count,
+             "value": f"{value / 100:,.2f}"}
+            for (quarter, currency), (count, value) in sorted(expiry.items())
+        ],
+        "renewal_cohorts": [
+            {"key": analytics.quarter_label(quarter), "ended": cohorts[quarter][0], "renewed": cohorts[quarter][1],
+             "rate": f"{cohorts[quarter][1] / cohorts[quarter][0] * 100:.1f} %" if cohorts[quarter][0] else "-"}
+            for quarter in range(cohort_start, first + 1)
+        ],
+        "exposure": [
+            {"key": counterparty, "currency": currency, "contracts": count, "value": f"{value / 100:,.2f}"}
+            for (counterparty, currency), (count, value) in top
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    rng = random.Random(22)
+    suite = Suite("contract_analytics", repeat=3, min_time=0.1)
+    failures = []
+    today = date(2025, 6, 15)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'analytics.db')}")
+        seed(engine, args.rows, rng)
+
+        snapshot = analytics.ContractSnapshot(engine)
+        start = time.perf_counter()
+        snapshot.load()
+        load_s = time.perf_counter() - start
+        suite.results["snapshot.load"] = {"min_us": load_s * 1e6, "contracts": len(snapshot), **memory(snapshot)}
+        print(f"instantánea: {load_s:.1f} s, {len(snapshot)} contratos", file=sys.stderr)
+        suite.bench("snapshot.refresh.no_changes", snapshot.refresh, rows=args.rows)
+
+        # Cambios de "otro worker": contratos modificados (con updated_at) y altas
+        with engine.begin() as conn:
+            conn.execute(
+                update(ContractModel).where(ContractModel.id <= CHANGES)
+                .values(status=ContractStatus.ACTIVE, end_date=today + timedelta(days=40), updated_at=func.now())
+            )
+            conn.execute(insert(ContractModel), list(contract_rows(rng, 10 ** 8, 10 ** 8 + CHANGES, 100)))
+        start = time.perf_counter()
+        changed = snapshot.refresh()
+        refresh_s = time.perf_counter() - start
+        suite.results["snapshot.refresh.changes"] = {"min_us": refresh_s * 1e6, "changed": changed}
+        print(f"refresco con {changed} cambios: {refresh_s * 1000:.1f} ms", file=sys.stderr)
+        if len(snapshot) != args.rows + CHANGES:
+            failures.append(f"refresco: {len(snapshot)} contratos en la instantánea")
+
+        suite.bench("metrics.value_at_expiry", lambda: analytics.value_at_expiry(snapshot, today), rows=args.rows)
+        suite.bench("metrics.renewal_cohorts", lambda: analytics.renewal_cohorts(snapshot, today), rows=args.rows)
+
+        def renewal_cohorts_cold():
+            # Con el índice de renovaciones recién invalidado, como tras un refresco con cambios
+            snapshot._derived.clear()
+            return analytics.renewal_cohorts(snapshot, today)
+
+        suite.bench("metrics.renewal_cohorts.cold", renewal_cohorts_cold, rows=args.rows)
+        suite.bench("metrics.exposure", lambda: analytics.counterparty_exposure(snapshot, today), rows=args.rows)
+        suite.bench("metrics.portfolio", lambda: analytics.portfolio(today, snapshot), rows=args.rows)
+        # Con el índice de renovaciones ya calculado
+        suite.results["snapshot.memory"] = memory(snapshot)
+
+        with Session(engine) as db:
+            start = time.perf_counter()
+            expected = orm_portfolio(db, today)
+            orm_s = time.perf_counter() - start
+        suite.results["orm"] = {"min_us": orm_s * 1e6}
+        print(f"orm: {orm_s:.1f} s", file=sys.stderr)
+
+        vectorized = analytics.portfolio(today, snapshot)
+        for metric, rows in expected.items():
+            if vectorized[metric] != rows:
+                failures.append(f"{metric}: los resultados no coinciden con el ORM")
+        engine.dispose()
+
+    suite.write(args.output)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
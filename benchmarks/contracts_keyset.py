@@ -0,0 +1,179 @@
+"""
+Paginación de /contratos: cursor (keyset) frente a OFFSET sobre 5M contratos.
+
+Genera (o reutiliza con ``--db``) un SQLite con ``--rows`` contratos
+sintéticos, crea los índices de ``ContractModel`` después de la carga y mide,
+para varias combinaciones de filtros y orden, el coste de obtener la página N
+con ``list_contracts(after=cursor)`` y con ``LIMIT/OFFSET``. El cursor de la
+página N se obtiene fuera de la medición. Con cursor el tiempo de la página
+5.000 debería ser el mismo que el de la primera.
+
+Antes de medir comprueba con ``EXPLAIN QUERY PLAN`` todas las combinaciones de
+filtros y orden (primera página, siguiente y anterior por cursor) y termina
+con código 1 si alguna ordena en una tabla temporal (``USE TEMP B-TREE``) o
+filtra sin índice. ``--plans-only`` hace solo esa comprobación.
+
+Uso:
+    python -m benchmarks.contracts_keyset [--rows 5000000] [--db /tmp/contracts.db] [--output keyset.json]
+    python -m benchmarks.contracts_keyset --rows 50000 --plans-only
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from benchmarks.harness import Suite
+from pacta.models.contract import ContractModel, ContractStatus, ContractType
+from pacta.models.user import UserModel
+from pacta.utils.contracts import PAGE_SIZE, SORTS, ContractFilters, build_query, encode_cursor, list_contracts
+from pacta.utils.database import create_db_engine
+
+OWNERS = 200
+BATCH = 50_000
+
+SCENARIOS = {
+    "recent": (ContractFilters(), "recent"),
+    "status+end_date": (ContractFilters(status=ContractStatus.ACTIVE), "end_date"),
+    "type+status+recent": (ContractFilters(contract_type=ContractType.LEASE, status=ContractStatus.ACTIVE), "recent"),
+    "owner+status+recent": (ContractFilters(owner_id=7, status=ContractStatus.ACTIVE), "recent"),
+}
+
+# Valores de cada filtro para comprobar los planes de todas sus combinaciones
+PLAN_FILTERS = {"status": ContractStatus.ACTIVE, "contract_type": ContractType.LEASE, "owner_id": 7}
+
+
+def seed(engine, rows: int):
+    table = ContractModel.__table__
+    rng = random.Random(42)
+    base = date(2020, 1, 1)
+    with engine.begin() as conn:
+        UserModel.__table__.create(conn)
+        conn.execute(insert(UserModel), [
+            {"username": f"owner{i}", "email": f"owner{i}@pacta.app", "password_hash": "x", "is_active": True}
+            for i in range(1, OWNERS + 1)
+        ])
+        # Índices después de la carga: mucho más rápido que mantenerlos fila a fila
+        conn.execute(CreateTable(table))
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH):
+        batch = []
+        for i in range(offset, min(offset + BATCH, rows)):
+            start_date = base + timedelta(days=rng.randrange(2000))
+            batch.append({
+                "reference": f"CTR-{i:08d}",
+                "title": f"Contrato {i}",
+                "counterparty": f"Proveedor {rng.randrange(20_000)}",
+                "contract_type": rng.choice(ContractType.ALL),
+                "status": rng.choice(ContractStatus.ALL),
+                "value": rng.randrange(100, 1_000_000),
+                "currency": "EUR",
+                "start_date": start_date,
+                "end_date": start_date + timedelta(days=rng.randrange(30, 1500)),
+                "owner_id": rng.randrange(1, OWNERS + 1),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+        print(f"\r{min(offset + BATCH, rows):>10} filas", end="", file=sys.stderr)
+    with engine.begin() as conn:
+        for index in table.indexes:
+            index.create(conn)
+        conn.execute(text("ANALYZE"))
+    print(f"\rcarga e índices: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+
+def cursor_before_page(db, filters, sort, page):
+    """Cursor de la última fila de la página ``page - 1`` (fuera de la medición)."""
+    if page <= 1:
+        return None
+    query = build_query(filters, sort).offset((page - 1) * PAGE_SIZE - 1).limit(1)
+    row = db.execute(query).mappings().first()
+    return encode_cursor(sort, row) if row else None
+
+
+def explain(db, engine, query) -> str:
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[-1] for row in db.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+
+def check_plans(db, engine, failures):
+    """Plan de cada combinación de filtros y orden: sin ordenación temporal y con índice."""
+    for n in range(len(PLAN_FILTERS) + 1):
+        for names in itertools.combinations(PLAN_FILTERS, n):
+            filters = ContractFilters(**{name: PLAN_FILTERS[name] for name in names})
+            for sort in SORTS:
+                cursor = cursor_before_page(db, filters, sort, 2)
+                queries = {"first": build_query(filters, sort)}
+                if cursor:
+                    queries["next"] = build_query(filters, sort, cursor, forward=True)
+                    queries["prev"] = build_query(filters, sort, cursor, forward=False)
+                for direction, query in queries.items():
+                    label = f"{'+'.join(names) or 'all'}.{sort}.{direction}"
+                    plan = explain(db, engine, query.limit(PAGE_SIZE))
+                    print(f"plan {label}: {plan}", file=sys.stderr)
+                    if "TEMP B-TREE" in plan:
+                        failures.append(f"{label} ordena en una tabla temporal: {plan}")
+                    elif names and "INDEX ix_contracts_" not in plan:
+                        failures.append(f"{label} no usa un índice del listado: {plan}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--db", help="Fichero SQLite a reutilizar (se crea si no existe)")
+    parser.add_argument("--pages", default="1,100,1000,5000")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    parser.add_argument("--filter", help="Ejecutar solo las mediciones cuyo nombre contenga este texto")
+    parser.add_argument("--plans-only", action="store_true", help="Comprobar solo los planes de consulta")
+    args = parser.parse_args()
+    pages = [int(p) for p in args.pages.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "contracts.db")
+        fresh = not os.path.exists(path)
+        engine = create_db_engine(f"sqlite:///{path}")
+        if fresh:
+            seed(engine, args.rows)
+
+        suite = Suite("contracts_keyset", filter_=args.filter, repeat=3, min_time=0.1)
+        failures = []
+        db = Session(engine)
+        try:
+            check_plans(db, engine, failures)
+            for label, (filters, sort) in SCENARIOS.items():
+                if args.plans_only or not suite.wants_group(label):
+                    continue
+                for page in pages:
+                    cursor = cursor_before_page(db, filters, sort, page)
+                    if page > 1 and cursor is None:
+                        continue
+                    suite.bench(
+                        f"{label}.keyset[page={page}]",
+                        lambda: list_contracts(db, filters, sort, after=cursor),
+                        page=page,
+                    )
+                    offset_query = build_query(filters, sort).offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE)
+                    suite.bench(
+                        f"{label}.offset[page={page}]",
+                        lambda: db.execute(offset_query).all(),
+                        page=page,
+                    )
+        finally:
+            db.close()
+            engine.dispose()
+        if not args.plans_only:
+            suite.write(args.output)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
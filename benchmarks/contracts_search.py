@@ -0,0 +1,167 @@
+"""
+Búsqueda de texto completo de contratos: latencia de consulta y coste de
+mantener el índice con 1M documentos.
+
+Aplica las migraciones sobre un SQLite temporal (tabla FTS5 y triggers), carga
+``--rows`` contratos con descripciones sintéticas y mide:
+
+- la carga completa, con el índice actualizado por los triggers;
+- insertar 10k contratos con y sin triggers (en una transacción que se
+  revierte) para aislar el coste del índice;
+- actualizar el título (reindexa la fila) frente a actualizar el estado (no
+  toca el índice);
+- consultas: referencia exacta, contraparte, términos frecuentes y raros, y
+  prefijos de 2-4 caracteres para el type-ahead;
+- ``reindex`` completo.
+
+Uso:
+    python -m benchmarks.contracts_search [--rows 1000000] [--output search.json]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from alembic import command
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import Suite
+from pacta.models.contract import ContractModel, ContractStatus, ContractType
+from pacta.models.user import UserModel
+from pacta.utils.database import alembic_config, create_db_engine
+from pacta.utils.search import reindex, search_contracts
+
+BATCH = 20_000
+WORDS = (
+    "arrendamiento servicios suministro mantenimiento confidencialidad penalización "
+    "rescisión prórroga garantía indemnización propiedad intelectual licencia software "
+    "transporte almacenamiento consultoría auditoría seguro responsabilidad plazo pago "
+    "factura anticipo entrega inspección calidad subcontratación exclusividad territorio "
+    "jurisdicción arbitraje notificación cesión fuerza mayor protección datos personales "
+    "tratamiento encargado confidencial obligaciones partes cláusula anexo vigencia "
+    "renovación automática preaviso incumplimiento resolución daños perjuicios limitación "
+    "inmueble local oficina nave vehículo equipo maquinaria obra reforma proyecto"
+).split()
+COMPANIES = ("Iberia", "Atlántica", "Levante", "Norte", "Sur", "Meseta", "Cantábrico", "Ebro", "Tajo", "Duero")
+SUFFIXES = ("Logística", "Servicios", "Ingeniería", "Consultores", "Inmobiliaria", "Tecnología", "Suministros")
+
+
+def contract_rows(rng, start, stop, owners):
+    weights = [1 / (i + 1) for i in range(len(WORDS))]
+    base = date(2020, 1, 1)
+    for i in range(start, stop):
+        start_date = base + timedelta(days=rng.randrange(2000))
+        yield {
+            "reference": f"CTR-{i:08d}",
+            "title": " ".join(rng.choices(WORDS, weights, k=4)).capitalize(),
+            "counterparty": f"{rng.choice(COMPANIES)} {rng.choice(SUFFIXES)} {rng.randrange(5000)} S.L.",
+            "description": " ".join(rng.choices(WORDS, weights, k=40)),
+            "contract_type": rng.choice(ContractType.ALL),
+            "status": rng.choice(ContractStatus.ALL),
+            "value": rng.randrange(100, 1_000_000),
+            "currency": "EUR",
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=rng.randrange(30, 1500)),
+            "owner_id": rng.randrange(1, owners + 1),
+        }
+
+
+def seed(engine, rows: int, rng):
+    with engine.begin() as conn:
+        command.upgrade(alembic_config(conn), "head")
+        conn.execute(insert(UserModel), [
+            {"username": f"owner{i}", "email": f"owner{i}@pacta.app", "password_hash": "x", "is_active": True}
+            for i in range(1, 101)
+        ])
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH):
+        with engine.begin() as conn:
+            conn.execute(insert(ContractModel), list(contract_rows(rng, offset, min(offset + BATCH, rows), 100)))
+        print(f"\r{min(offset + BATCH, rows):>10} contratos", end="", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"\rcarga con índice FTS: {elapsed:.1f} s ({rows / elapsed:.0f} contratos/s)", file=sys.stderr)
+    return elapsed
+
+
+def insert_cost(engine, rng, rows: int, with_triggers: bool) -> float:
+    """Segundos para insertar ``rows`` contratos; la transacción se revierte."""
+    batch = list(contract_rows(rng, 10 ** 9, 10 ** 9 + rows, 100))
+    with engine.connect() as conn:
+        tx = conn.begin()
+        if not with_triggers:
+            conn.execute(text("DROP TRIGGER contracts_fts_ai"))
+        start = time.perf_counter()
+        conn.execute(insert(ContractModel), batch)
+        elapsed = time.perf_counter() - start
+        tx.rollback()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    parser.add_argument("--filter", help="Ejecutar solo las mediciones cuyo nombre contenga este texto")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        suite = Suite("contracts_search", filter_=args.filter, repeat=3, min_time=0.1)
+        # Mediciones únicas con ``min_us`` para que benchmarks.compare las compare
+        load_s = seed(engine, args.rows, rng)
+        suite.results["load"] = {"min_us": load_s * 1e6, "rows": args.rows}
+
+        with_fts = insert_cost(engine, rng, 10_000, with_triggers=True)
+        without_fts = insert_cost(engine, rng, 10_000, with_triggers=False)
+        suite.results["insert_10k"] = {
+            "min_us": with_fts * 1e6,
+            "with_index_s": with_fts,
+            "without_index_s": without_fts,
+            "index_us_per_row": (with_fts - without_fts) / 10_000 * 1e6,
+        }
+        print(f"insertar 10k: {with_fts:.2f} s con índice, {without_fts:.2f} s sin índice", file=sys.stderr)
+
+        with engine.connect() as conn:
+            ids = itertools.cycle(rng.sample(range(1, args.rows + 1), min(args.rows, 100_000)))
+            for label, column, value in (("title", "title", "'Contrato revisado de garantía'"), ("status", "status", "'vencido'")):
+                def update():
+                    conn.execute(text(f"UPDATE contracts SET {column} = {value} WHERE id = :id"), {"id": next(ids)})
+                    conn.commit()
+                suite.bench(f"update.{label}", update)
+
+        db = Session(engine)
+        try:
+            target = rng.randrange(args.rows)
+            queries = {
+                "reference": f"CTR-{target:08d}",
+                "counterparty": "Levante Logística",
+                "frequent_term": "arrendamiento",
+                "rare_terms": "cesión arbitraje maquinaria",
+                "prefix2": "ar",
+                "prefix3": "arr",
+                "prefix4": "arre",
+                "typeahead_phrase": "fuerza may",
+            }
+            for label, query in queries.items():
+                suite.bench(f"search.{label}", lambda: search_contracts(db, query), query=query)
+        finally:
+            db.close()
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            indexed = reindex(conn)
+        reindex_s = time.perf_counter() - start
+        suite.results["reindex"] = {"min_us": reindex_s * 1e6, "rows": indexed}
+        print(f"reindex: {reindex_s:.1f} s", file=sys.stderr)
+        engine.dispose()
+    suite.write(args.output)
+
+
+if __name__ == "__main__":
+    main()
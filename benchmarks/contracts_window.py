@@ -0,0 +1,130 @@
+"""
+Tabla virtualizada de contratos: bytes por delta y tiempo hasta la primera fila.
+
+Sobre un SQLite temporal con ``--rows`` contratos (por defecto 100k, todos en
+el resultado) compara:
+
+- ``full``: cargar el resultado entero en el estado, como haría una tabla
+  sin virtualizar (una consulta y un delta con todas las filas);
+- ``window``: la primera ventana de ``ContractsState`` y su recuento
+  (``get_listing``: recorrido del índice sin caché y con caché), un recorrido
+  completo con scroll secuencial (ventanas contiguas por cursor) y saltos con
+  la barra de scroll a mitad y al final, desde el ancla más cercana y, para
+  comparar, con ``OFFSET``.
+
+El tamaño del delta se aproxima con el JSON de las vars que cambian. Termina
+con código 1 si un salto desde un ancla no devuelve las mismas filas que
+``OFFSET``.
+
+Uso:
+    python -m benchmarks.contracts_window [--rows 100000]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy.orm import Session
+
+from benchmarks.contracts_keyset import seed
+from pacta.state.contracts_state import OVERSCAN, VISIBLE_ROWS, WINDOW_SIZE
+from pacta.utils.contracts import ContractFilters, _row, build_query, fetch_window, get_listing, listing_cache
+from pacta.utils.database import create_db_engine
+
+
+def delta_bytes(**changed) -> int:
+    return len(json.dumps({"contracts_state": changed}, separators=(",", ":"), default=str))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    filters, sort = ContractFilters(), "recent"
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'contracts.db')}")
+        seed(engine, args.rows)
+        db = Session(engine)
+        try:
+            results = {}
+            failures = []
+
+            def full():
+                rows = [dict(r._mapping) for r in db.execute(build_query(filters, sort))]
+                return delta_bytes(rows=rows)
+
+            size, ms = timed(full)
+            results["full"] = {"first_row_ms": ms, "delta_bytes": size}
+
+            window, first_ms = timed(lambda: fetch_window(db, filters, sort, 0, WINDOW_SIZE))
+            first_size = delta_bytes(rows=window.rows, window_start=0, total=len(window.rows))
+            listing_cache.invalidate()
+            listing, count_ms = timed(lambda: get_listing(db, filters, sort))
+            _, cached_count_ms = timed(lambda: get_listing(db, filters, sort))
+            total = listing.total
+            results["window.first"] = {
+                "first_row_ms": first_ms,
+                "delta_bytes": first_size,
+                "count_ms": count_ms,
+                "cached_count_ms": cached_count_ms,
+                "total": total,
+                "capped": listing.capped,
+                "anchors": len(listing.anchors),
+            }
+
+            # Scroll secuencial: cada ventana nueva empieza OVERSCAN filas por
+            # encima de lo visible cuando lo visible llega al borde
+            step = WINDOW_SIZE - OVERSCAN - VISIBLE_ROWS
+            start, times, sizes = 0, [], []
+            while start + WINDOW_SIZE < total:
+                after = window.cursors[step - 1]
+                start += step
+                window, ms = timed(lambda: fetch_window(db, filters, sort, start, WINDOW_SIZE, after=after))
+                times.append(ms)
+                sizes.append(delta_bytes(rows=window.rows, window_start=start))
+            results["window.scroll_seek"] = {
+                "windows": len(times),
+                "p50_ms": statistics.median(times),
+                "max_ms": max(times),
+                "max_delta_bytes": max(sizes),
+            }
+
+            for label, position in (("middle", total // 2 + 123), ("end", max(0, total - WINDOW_SIZE))):
+                window, ms = timed(lambda: fetch_window(db, filters, sort, position, WINDOW_SIZE))
+                offset_query = build_query(filters, sort).offset(position).limit(WINDOW_SIZE)
+                offset_rows, offset_ms = timed(lambda: [_row(r) for r in db.execute(offset_query)])
+                if [row["id"] for row in window.rows] != [row["id"] for row in offset_rows]:
+                    failures.append(f"el salto a la fila {position} no coincide con OFFSET")
+                results[f"window.jump_{label}"] = {
+                    "ms": ms,
+                    "offset_ms": offset_ms,
+                    "delta_bytes": delta_bytes(rows=window.rows, window_start=position),
+                }
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(json.dumps(results, indent=2))
+    full, first = results["full"], results["window.first"]
+    print(
+        f"primera fila: {full['first_row_ms']:.0f} ms -> {first['first_row_ms']:.1f} ms; "
+        f"delta: {full['delta_bytes'] / 1024:.0f} KiB -> {first['delta_bytes'] / 1024:.1f} KiB",
+        file=sys.stderr,
+    )
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
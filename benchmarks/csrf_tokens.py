@@ -0,0 +1,85 @@
+"""
+Emisión/verificación de tokens CSRF y memoria con 1M de tokens emitidos:
+conjunto global + un temporizador call_later por token (anterior) vs tokens
+HMAC sin estado con filtro de reutilización (y bytes por token consumido en
+el filtro).
+
+Las velocidades se miden con tracemalloc activo, que encarece cada reserva de
+memoria; sirven para comparar entre sí, no como valor absoluto.
+
+Uso:
+    python -m benchmarks.csrf_tokens [--tokens 1000000]
+"""
+import argparse
+import asyncio
+import secrets
+import time
+import tracemalloc
+
+from pacta.utils.csrf import CsrfProtector
+
+SESSION_ID = "bench-session"
+
+
+def _legacy(n):
+    loop = asyncio.new_event_loop()
+    tokens = set()
+    handles = []
+    start = time.perf_counter()
+    for _ in range(n):
+        token = secrets.token_urlsafe(32)
+        tokens.add(token)
+        handles.append(loop.call_later(24 * 3600, tokens.discard, token))
+    issue_s = time.perf_counter() - start
+    issued = list(tokens)
+    start = time.perf_counter()
+    for token in issued:
+        if token in tokens:
+            tokens.discard(token)
+    verify_s = time.perf_counter() - start
+    return (loop, handles, tokens), issue_s, verify_s, issued
+
+
+def _hmac(n):
+    protector = CsrfProtector(keys=[b"bench-key"], one_time=True)
+    start = time.perf_counter()
+    issued = [protector.issue(SESSION_ID) for _ in range(n)]
+    issue_s = time.perf_counter() - start
+    start = time.perf_counter()
+    valid = sum(protector.verify(token, SESSION_ID) for token in issued)
+    verify_s = time.perf_counter() - start
+    assert valid == n
+    assert not protector.verify(issued[0], SESSION_ID), "token reutilizado aceptado"
+    return protector, issue_s, verify_s, issued
+
+
+def _run(label, fn, n):
+    tracemalloc.start()
+    state, issue_s, verify_s, issued = fn(n)
+    # Los tokens ya entregados a clientes no cuentan como memoria del servidor
+    del issued
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:>8}: emisión {n / issue_s:9.0f}/s  verificación {n / verify_s:9.0f}/s  "
+        f"memoria retenida {current / 1024 / 1024:7.1f} MiB"
+    )
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy = _run("set", _legacy, args.tokens)
+    legacy[0].close()
+    del legacy
+    protector = _run("hmac", _hmac, args.tokens)
+    replay = protector.replay_filter
+    print(f"{'':>8}  filtro de reutilización: {len(replay)} tokens, "
+          f"{replay.nbytes / len(replay):.1f} bytes/token")
+
+
+if __name__ == "__main__":
+    main()
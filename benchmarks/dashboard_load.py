@@ -0,0 +1,131 @@
+"""
+Carga del dashboard con usuarios concurrentes: tiempo hasta el primer widget y
+hasta el último.
+
+Sobre un SQLite temporal con ``--rows`` contratos repartidos entre 100
+usuarios, simula ``--users`` sesiones que abren el dashboard a la vez (por
+``run_db``, con su pool de hilos, como los handlers) en tres modos:
+
+- ``single``: un solo handler que calcula los tres widgets seguidos, como
+  haría ``load`` sin eventos en segundo plano: el primer widget llega con el
+  último;
+- ``widgets``: un evento en segundo plano por widget (tareas concurrentes),
+  con la caché vacía;
+- ``widgets.cached``: la segunda visita, con la caché por usuario caliente.
+
+Después comprueba la invalidación: un cambio de contrato confirmado con el
+ORM debe vaciar la caché de su propietario y la siguiente carga debe reflejar
+el cambio. Termina con código 1 si no es así.
+
+Uso:
+    python -m benchmarks.dashboard_load [--rows 200000] [--users 1,50,200] [--output dashboard.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+OWNERS = 100
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(args, suite, failures):
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    from benchmarks.reminder_scheduler import seed
+    from pacta.models.contract import ContractModel, ContractStatus
+    from pacta.utils import dashboard
+    from pacta.utils.database import engine, run_db
+
+    seed(engine, args.rows, random.Random(23))
+
+    async def single(owner_id):
+        # Un handler: los widgets uno detrás de otro y un único envío al final
+        start = time.perf_counter()
+        for load in dashboard.WIDGETS.values():
+            await run_db(load, owner_id, date.today())
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    async def widgets(owner_id):
+        start = time.perf_counter()
+        finished = []
+
+        async def widget(name):
+            await dashboard.widget_data(name, owner_id)
+            finished.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(widget(name) for name in dashboard.WIDGETS))
+        return min(finished), max(finished)
+
+    async def visit(mode, label, users):
+        timings = await asyncio.gather(*(mode(i % OWNERS + 1) for i in range(users)))
+        first = [t[0] for t in timings]
+        total = [t[1] for t in timings]
+        suite.results[f"{label}.{users}"] = {
+            "min_us": statistics.median(total) * 1e6,
+            "first_widget_p50_ms": statistics.median(first) * 1000,
+            "first_widget_p95_ms": percentile(first, 0.95) * 1000,
+            "total_p50_ms": statistics.median(total) * 1000,
+            "total_p95_ms": percentile(total, 0.95) * 1000,
+        }
+        print(f"{label + '.' + str(users):<22} primer widget p50 {statistics.median(first) * 1000:8.1f} ms "
+              f"p95 {percentile(first, 0.95) * 1000:8.1f} ms   total p50 {statistics.median(total) * 1000:8.1f} ms "
+              f"p95 {percentile(total, 0.95) * 1000:8.1f} ms", file=sys.stderr)
+
+    for users in (int(n) for n in args.users.split(",")):
+        dashboard.dashboard_cache.clear()
+        await visit(single, "single", users)
+        await visit(widgets, "widgets", users)
+        await visit(widgets, "widgets.cached", users)
+
+    # Invalidación: un contrato del usuario 1 pasa a rescindido con el ORM
+    before = await dashboard.widget_data("totals", 1)
+    with Session(engine) as db:
+        contract = db.scalars(
+            select(ContractModel).where(ContractModel.owner_id == 1, ContractModel.status == ContractStatus.ACTIVE)
+            .limit(1)
+        ).one()
+        contract.status = ContractStatus.TERMINATED
+        db.commit()
+    if dashboard.dashboard_cache.get(1, "totals") is not None:
+        failures.append("la caché del propietario sigue llena tras el commit")
+    after = await dashboard.widget_data("totals", 1)
+    if after == before:
+        failures.append("los totales no cambian tras modificar un contrato")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", default="1,50,200", help="Sesiones concurrentes, separadas por comas")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Antes de importar pacta: la configuración se lee al importar
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'dashboard.db')}"
+        from benchmarks.harness import Suite
+
+        suite = Suite("dashboard_load")
+        asyncio.run(run(args, suite, failures))
+        suite.write(args.output)
+
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Extracción de texto de documentos: documentos por segundo y por núcleo.
+
+Genera ``--documents`` DOCX sintéticos de ``--paragraphs`` párrafos (más los
+PDF de ``--pdf-dir``, si se indica) y mide:
+
+- ``pool.N``: extracción pura en el pool de ``pacta.utils.extractors`` con 1,
+  2, 4… procesos hasta ``--workers``; documentos/s y documentos/s por proceso;
+- ``pipeline``: el pipeline completo sobre un SQLite temporal con las
+  migraciones aplicadas (reclamar, extraer, guardar en lotes y actualizar el
+  índice FTS), comprobando después que una palabra única de cada documento se
+  encuentra con ``search_contracts``;
+- los límites: un DOCX "bomba zip" y un tiempo máximo mínimo deben terminar
+  en ``failed`` sin tumbar el pool.
+
+Termina con código 1 si alguna comprobación falla.
+
+Uso:
+    python -m benchmarks.document_extraction [--documents 2000] [--workers 8] [--output extraction.json]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from alembic import command
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.contracts_search import WORDS
+from benchmarks.harness import Suite
+from pacta.models.contract import ContractModel
+from pacta.models.document import DocumentModel
+from pacta.models.user import UserModel
+from pacta.utils.database import alembic_config, create_db_engine
+from pacta.utils.documents import DocumentStore
+from pacta.utils.extraction import EXTRACTION_MAX_CHARS, ExtractionPipeline
+from pacta.utils.extractors import extract_document, init_worker
+from pacta.utils.search import search_contracts
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def write_docx(path: Path, paragraphs):
+    body = "".join(f"<w:p><w:r><w:t>{escape(p)}</w:t></w:r></w:p>" for p in paragraphs)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", f"<w:document {_NS}><w:body>{body}</w:body></w:document>")
+
+
+def write_zip_bomb(path: Path, megabytes: int = 300):
+    """DOCX cuyo document.xml ocupa ``megabytes`` MB descomprimido (y ~300 KB comprimido)."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("word/document.xml", "w", force_zip64=True) as xml:
+            block = b" " * (1024 * 1024)
+            for _ in range(megabytes):
+                xml.write(block)
+
+
+def generate(directory: Path, documents: int, paragraphs: int, rng):
+    """``(ruta, palabra única)`` de cada DOCX generado."""
+    files = []
+    for i in range(documents):
+        marker = f"marcador{i:06d}"
+        text = [" ".join(rng.choices(WORDS, k=60)) for _ in range(paragraphs)]
+        text[rng.randrange(paragraphs)] += f" {marker}"
+        path = directory / f"contrato-{i:06d}.docx"
+        write_docx(path, text)
+        files.append((path, marker))
+    return files
+
+
+def pool_throughput(tasks, workers: int) -> float:
+    """Segundos para extraer ``tasks`` con ``workers`` procesos."""
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(1024 ** 3,)) as pool:
+        start = time.perf_counter()
+        results = pool.starmap(extract_document, tasks, chunksize=4)
+        elapsed = time.perf_counter() - start
+    failed = [r for r in results if r[1] != "done"]
+    if failed:
+        print(f"  {len(failed)} documentos fallidos, p. ej. {failed[0][3]}", file=sys.stderr)
+    return elapsed
+
+
+def run_pipeline(tmp: Path, files, workers: int):
+    """Cargar los documentos en un SQLite temporal y vaciar la cola del pipeline."""
+    engine = create_db_engine(f"sqlite:///{tmp / 'extraction.db'}")
+    store = DocumentStore(tmp / "store")
+    with engine.begin() as conn:
+        command.upgrade(alembic_config(conn), "head")
+        conn.execute(insert(UserModel), [{"username": "docs", "email": "docs@pacta.app", "password_hash": "x"}])
+        conn.execute(insert(ContractModel), [
+            {"reference": f"EXT-{i:06d}", "title": "Contrato con anexo", "counterparty": "Duero Servicios",
+             "start_date": date(2025, 1, 1), "end_date": date(2026, 1, 1), "owner_id": 1}
+            for i in range(len(files))
+        ])
+        rows = []
+        for i, (path, _) in enumerate(files):
+            with open(path, "rb") as f:
+                blob = store.save_file(f)
+            rows.append({"contract_id": i + 1, "sha256": blob.sha256, "size": blob.size,
+                         "filename": path.name, "content_type": DOCX_TYPE, "uploaded_by": 1})
+        conn.execute(insert(DocumentModel), rows)
+
+    pipeline = ExtractionPipeline(engine, store, workers=workers)
+    try:
+        start = time.perf_counter()
+        processed = asyncio.run(pipeline.drain())
+        elapsed = time.perf_counter() - start
+    finally:
+        pipeline.close()
+
+    with Session(engine) as db:
+        missing = [marker for _, marker in files[:: max(1, len(files) // 50)]
+                   if not search_contracts(db, marker, prefix=False)]
+    engine.dispose()
+    return processed, elapsed, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--paragraphs", type=int, default=200, help="Párrafos de ~60 palabras por DOCX")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pdf-dir", help="Directorio con PDF reales que añadir a la medición del pool")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    rng = random.Random(42)
+    suite = Suite("document_extraction")
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = generate(tmp, args.documents, args.paragraphs, rng)
+        tasks = [(i, str(path), path.name, DOCX_TYPE, 60.0, EXTRACTION_MAX_CHARS) for i, (path, _) in enumerate(files)]
+        if args.pdf_dir:
+            pdfs = sorted(Path(args.pdf_dir).glob("*.pdf"))
+            tasks += [(len(tasks) + i, str(p), p.name, "application/pdf", 60.0, EXTRACTION_MAX_CHARS)
+                      for i, p in enumerate(pdfs)]
+        size_mb = sum(os.path.getsize(task[1]) for task in tasks) / 1024 / 1024
+        print(f"{len(tasks)} documentos, {size_mb:.0f} MB", file=sys.stderr)
+
+        for workers in sorted({1 << i for i in range(args.workers.bit_length()) if 1 << i <= args.workers} | {args.workers}):
+            elapsed = pool_throughput(tasks, workers)
+            rate = len(tasks) / elapsed
+            suite.results[f"pool.{workers}"] = {
+                "min_us": elapsed / len(tasks) * 1e6 * workers,
+                "documents_per_sec": rate,
+                "documents_per_sec_per_core": rate / workers,
+            }
+            print(f"pool.{workers:<3} {rate:8.1f} doc/s  {rate / workers:8.1f} doc/s por proceso", file=sys.stderr)
+
+        processed, elapsed, missing = run_pipeline(tmp, files, args.workers)
+        suite.results["pipeline"] = {
+            "min_us": elapsed / max(processed, 1) * 1e6,
+            "documents": processed,
+            "documents_per_sec": processed / elapsed,
+            "documents_per_sec_per_core": processed / elapsed / args.workers,
+        }
+        print(f"pipeline ({args.workers} procesos): {processed / elapsed:.1f} doc/s", file=sys.stderr)
+        if processed != len(files):
+            failures.append(f"pipeline: {processed} de {len(files)} documentos procesados")
+        if missing:
+            failures.append(f"búsqueda: {len(missing)} marcadores sin resultados, p. ej. {missing[0]}")
+
+        bomb = tmp / "bomba.docx"
+        write_zip_bomb(bomb)
+        with multiprocessing.Pool(1, initializer=init_worker, initargs=(256 * 1024 ** 2,)) as pool:
+            _, status, _, error = pool.apply(extract_document, (0, str(bomb), bomb.name, DOCX_TYPE, 60.0, EXTRACTION_MAX_CHARS))
+            if status != "failed":
+                failures.append(f"bomba zip: estado {status}")
+            print(f"bomba zip: {status} ({error})", file=sys.stderr)
+            path = str(files[0][0])
+            _, status, _, error = pool.apply(extract_document, (0, path, "lento.docx", DOCX_TYPE, 0.001, EXTRACTION_MAX_CHARS))
+            if status != "failed":
+                failures.append(f"tiempo máximo: estado {status}")
+            print(f"tiempo máximo: {status} ({error})", file=sys.stderr)
+            # El proceso sigue sirviendo tareas después de los fallos
+            _, status, _, _ = pool.apply(extract_document, (0, path, "normal.docx", DOCX_TYPE, 60.0, EXTRACTION_MAX_CHARS))
+            if status != "done":
+                failures.append(f"pool tras los fallos: estado {status}")
+
+    suite.write(args.output)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
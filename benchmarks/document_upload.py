@@ -0,0 +1,153 @@
+"""
+Subida y descarga de documentos de varios GB con un techo de memoria.
+
+Contra la app FastAPI de ``pacta.api`` en proceso (``httpx.ASGITransport``,
+que transmite el cuerpo de la petición por trozos) y sobre un SQLite y un
+directorio de documentos temporales:
+
+1. sube ``--size-mb`` MB generados al vuelo y comprueba el SHA-256;
+2. vuelve a subir el mismo contenido a otro contrato y comprueba que en disco
+   sigue habiendo un solo fichero;
+3. descarga el documento por rangos (``Range``) verificando el hash.
+
+Durante todo el proceso se muestrea el RSS; termina con código 1 si crece más
+de ``--ceiling-mb`` sobre el valor inicial o si algo no cuadra.
+
+Uso:
+    python -m benchmarks.document_upload [--size-mb 2048] [--ceiling-mb 64]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+import psutil
+
+CHUNK = 256 * 1024
+RANGE_SIZE = 16 * 1024 * 1024
+
+
+async def sample_rss(samples: list, stop: asyncio.Event):
+    process = psutil.Process()
+    while not stop.is_set():
+        samples.append(process.memory_info().rss)
+        await asyncio.sleep(0.05)
+
+
+def payload(size: int, expected):
+    """Generar ``size`` bytes por trozos actualizando ``expected`` (hashlib)."""
+    # Contenido determinista: dos llamadas generan exactamente los mismos bytes
+    block = random.Random(0).randbytes(CHUNK)
+
+    async def chunks():
+        sent = 0
+        counter = 0
+        while sent < size:
+            chunk = counter.to_bytes(8, "little") + block[: min(CHUNK, size - sent) - 8]
+            expected.update(chunk)
+            sent += len(chunk)
+            counter += 1
+            yield chunk
+
+    return chunks()
+
+
+async def run(args):
+    from pacta.api import api
+    from pacta.models.contract import ContractModel
+    from pacta.models.user import UserModel
+    from pacta.utils.database import init_db, session_scope
+    from pacta.utils.documents import document_store
+    from pacta.utils.tokens import create_access_token
+    from datetime import date
+
+    init_db()
+    with session_scope() as db:
+        user = UserModel(username="docs", email="docs@pacta.app", password_hash="x", is_active=True)
+        db.add(user)
+        db.flush()
+        for i in (1, 2):
+            db.add(ContractModel(
+                reference=f"DOC-{i}", title="Contrato con anexos", counterparty="Ebro Logística",
+                start_date=date(2025, 1, 1), end_date=date(2026, 1, 1), owner_id=user.id,
+            ))
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'docs'})}"}
+    size = args.size_mb * 1024 * 1024
+
+    stop, samples = asyncio.Event(), []
+    baseline = psutil.Process().memory_info().rss
+    sampler = asyncio.create_task(sample_rss(samples, stop))
+    failures = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://pacta", timeout=None) as client:
+        expected = hashlib.sha256()
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/contracts/1/documents", params={"filename": "anexo.pdf"}, headers=headers,
+            content=payload(size, expected),
+        )
+        upload_s = time.perf_counter() - start
+        document = response.json()
+        if response.status_code != 201 or document["sha256"] != expected.hexdigest():
+            failures.append(f"subida: {response.status_code} {document}")
+
+        again = await client.post(
+            "/api/contracts/2/documents", params={"filename": "copia.pdf"}, headers=headers,
+            content=payload(size, hashlib.sha256()),
+        )
+        blobs = [name for _, _, files in os.walk(document_store.root) for name in files]
+        if again.status_code != 201 or again.json()["sha256"] != document.get("sha256") or len(blobs) != 1:
+            failures.append(f"deduplicación: {again.status_code}, {len(blobs)} ficheros en disco")
+
+        downloaded = hashlib.sha256()
+        start = time.perf_counter()
+        for offset in range(0, size, RANGE_SIZE):
+            end = min(offset + RANGE_SIZE, size) - 1
+            part = await client.get(
+                f"/api/documents/{document['id']}", headers={**headers, "Range": f"bytes={offset}-{end}"}
+            )
+            if part.status_code != 206:
+                failures.append(f"descarga: estado {part.status_code} en el rango {offset}-{end}")
+                break
+            downloaded.update(part.content)
+        download_s = time.perf_counter() - start
+        if downloaded.hexdigest() != document.get("sha256"):
+            failures.append("descarga: el hash no coincide")
+
+    stop.set()
+    await sampler
+    growth_mb = (max(samples) - baseline) / 1024 / 1024
+    print(
+        f"{args.size_mb} MB  subida {args.size_mb / upload_s:.0f} MB/s  "
+        f"descarga por rangos {args.size_mb / download_s:.0f} MB/s  "
+        f"RSS +{growth_mb:.1f} MB (techo {args.ceiling_mb} MB)"
+    )
+    if growth_mb > args.ceiling_mb:
+        failures.append(f"memoria: el RSS creció {growth_mb:.1f} MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--ceiling-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Antes de importar pacta: la configuración se lee al importar
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'documents.db')}"
+        os.environ["DOCUMENTS_DIR"] = os.path.join(tmp, "documents")
+        os.environ["DOCUMENT_MAX_BYTES"] = str(args.size_mb * 1024 * 1024 * 2)
+        failures = asyncio.run(run(args))
+
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Sobrecoste por llamada de la instrumentación de event handlers.
+
+Compara un handler síncrono y uno async sin envolver y envueltos con
+``instrument_handler``; la diferencia es el coste de las métricas. No
+necesita arrancar Reflex: se usa un objeto con ``dirty_vars`` como estado.
+
+Después importa la aplicación (``pacta.pacta``, con un SQLite temporal),
+ejecuta ``instrument_states()`` sobre sus estados reales y comprueba que
+todos los event handlers, incluidos los ``setvar`` generados por Reflex,
+quedan envueltos y registrados en ``handler_stats``. Termina con código 1 si
+no es así.
+
+Uso:
+    python -m benchmarks.handler_overhead [--output overhead.json]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.harness import Suite
+from pacta.utils.metrics import handler_stats, instrument_handler, instrument_states
+
+
+class FakeState:
+    def __init__(self):
+        self.dirty_vars = {"username", "error"}
+        self.value = 0
+
+
+def handler(self):
+    self.value += 1
+
+
+async def async_handler(self):
+    self.value += 1
+
+
+def check_app_states(failures):
+    """Instrumentar los estados de la aplicación y verificar cada handler."""
+    import reflex as rx
+
+    import pacta.pacta  # noqa: F401 - registra los estados
+
+    instrument_states()
+    # Una segunda pasada no debe volver a envolver
+    instrument_states()
+    pending, checked = [rx.State], 0
+    while pending:
+        state_cls = pending.pop()
+        pending.extend(state_cls.get_substates())
+        for name, handler in state_cls.event_handlers.items():
+            label = f"{state_cls.get_full_name()}.{name}"
+            checked += 1
+            if not getattr(handler.fn, "__pacta_instrumented__", False):
+                failures.append(f"{label} no está instrumentado")
+            elif getattr(handler.fn, "__wrapped__", None) is not None and getattr(
+                handler.fn.__wrapped__, "__pacta_instrumented__", False
+            ):
+                failures.append(f"{label} está envuelto dos veces")
+            if label not in handler_stats:
+                failures.append(f"{label} no tiene métricas")
+            if getattr(state_cls, name) is not handler:
+                failures.append(f"{label}: el atributo de la clase no es el handler instrumentado")
+    print(f"handlers instrumentados: {checked}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    suite = Suite("handler_overhead")
+    state = FakeState()
+    wrapped = instrument_handler("bench.handler", handler)
+    async_wrapped = instrument_handler("bench.async_handler", async_handler)
+
+    plain = suite.bench("sync.plain", lambda: handler(state))
+    instrumented = suite.bench("sync.instrumented", lambda: wrapped(state))
+
+    # Las corrutinas se avanzan a mano para no medir el event loop
+    def drive(coro_fn):
+        coro = coro_fn(state)
+        try:
+            coro.send(None)
+        except StopIteration:
+            pass
+
+    async_plain = suite.bench("async.plain", lambda: drive(async_handler))
+    async_instrumented = suite.bench("async.instrumented", lambda: drive(async_wrapped))
+
+    print(f"sobrecoste síncrono: {instrumented['min_us'] - plain['min_us']:.2f} µs/llamada")
+    print(f"sobrecoste async:    {async_instrumented['min_us'] - async_plain['min_us']:.2f} µs/llamada")
+    suite.write(args.output)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'handlers.db')}"
+        check_app_states(failures)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Utilidades mínimas para microbenchmarks con resultados en JSON.
+
+Cada medición se calibra para que una repetición dure al menos
+``min_time`` segundos y se repite ``repeat`` veces; se guarda el mínimo, la
+media y la desviación por operación. ``Suite.write`` emite un JSON con los
+metadatos del entorno para comparar ejecuciones con ``benchmarks/compare.py``.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def measure(fn, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """Medir ``fn()`` y devolver estadísticas por operación en microsegundos."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 24:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": min(samples) * 1e6,
+        "mean_us": statistics.mean(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        "ops_per_sec": 1 / min(samples),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Suite:
+    """Colección de mediciones de una ejecución."""
+
+    def __init__(self, name: str, filter_: str = None, repeat: int = 5, min_time: float = 0.2):
+        self.name = name
+        self.filter = filter_
+        self.repeat = repeat
+        self.min_time = min_time
+        self.results = {}
+
+    def wants(self, name: str) -> bool:
+        return not self.filter or self.filter in name
+
+    def wants_group(self, group: str) -> bool:
+        """Evitar la preparación de un grupo cuyas mediciones no se van a ejecutar."""
+        return not self.filter or group in self.filter or self.filter in group
+
+    def bench(self, name: str, fn, **params):
+        if not self.wants(name):
+            return None
+        result = measure(fn, repeat=self.repeat, min_time=self.min_time)
+        result["params"] = params
+        self.results[name] = result
+        print(f"{name:<45} {result['min_us']:12.2f} µs  {result['ops_per_sec']:12.0f} ops/s", file=sys.stderr)
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "suite": self.name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "results": self.results,
+        }
+
+    def write(self, path: str = None):
+        data = json.dumps(self.to_dict(), indent=2, sort_keys=True)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data + "\n")
+        else:
+            print(data)
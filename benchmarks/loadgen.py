@@ -0,0 +1,382 @@
+"""
+Generador de carga de sesiones concurrentes contra un worker de ``pacta.pacta:app``.
+
+Arranca el backend en local (``reflex run --env prod --backend-only``) o se
+conecta a uno existente con ``--url``, y simula clientes que hablan el
+protocolo de eventos de Reflex por Socket.IO (``/_event``) con el flujo
+completo: abrir ``/login`` (con el token CSRF que pide el formulario),
+rellenar el formulario, ``AuthState.handle_submit``, cargar ``/dashboard`` y
+``AuthState.logout``. Cada cliente repite el flujo hasta que termina la prueba.
+Un login que no deja la sesión autenticada cuenta como error (``login: <motivo>``)
+y el flujo no se completa.
+
+Todos los clientes comparten IP y usuario. El backend local se arranca sobre
+un SQLite temporal con el usuario ``loadgen`` (contraseña aleatoria) y con
+``LOGIN_ATTEMPT_LIMIT`` alto para que el rate limiting de login no falsee la
+prueba. Con ``--url`` hay que indicar ``--username`` y ``--password`` de un
+usuario existente y configurar igual el límite en el worker.
+
+El número de clientes sigue un perfil de rampa ``segundo:clientes`` con
+interpolación lineal, p. ej. ``0:0,30:200,90:200`` sube a 200 clientes en 30 s
+y los mantiene un minuto. Al final se emite JSON con throughput, percentiles
+de latencia por evento y CPU/RSS del worker.
+
+Necesita ``python-socketio[asyncio_client]`` (aiohttp) además de las
+dependencias de la aplicación.
+
+Uso:
+    python -m benchmarks.loadgen --ramp 0:0,30:100,90:100 --output load.json
+    python -m benchmarks.loadgen --url http://localhost:8000 --username ana --password ... --ramp 0:50,60:50
+"""
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import psutil
+
+try:
+    import socketio
+except ImportError:  # pragma: no cover - dependencia opcional
+    socketio = None
+
+EVENT_TIMEOUT = 30.0
+LOADGEN_LOGIN_ATTEMPT_LIMIT = "1000000000"
+
+
+def parse_ramp(spec: str):
+    """Convertir ``"0:0,30:100"`` en una lista ordenada de (segundo, clientes)."""
+    points = []
+    for part in spec.split(","):
+        second, clients = part.split(":")
+        points.append((float(second), int(clients)))
+    points.sort()
+    if points[0][0] > 0:
+        points.insert(0, (0.0, points[0][1]))
+    return points
+
+
+def clients_at(points, t: float) -> int:
+    for (t0, c0), (t1, c1) in zip(points, points[1:]):
+        if t0 <= t <= t1:
+            return round(c0 + (c1 - c0) * (t - t0) / (t1 - t0)) if t1 > t0 else c1
+    return points[-1][1]
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.flows = 0
+
+    def record(self, name: str, seconds: float):
+        self.latencies.setdefault(name, []).append(seconds)
+
+    def error(self, name: str):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        per_event = {
+            name: {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "mean_ms": statistics.mean(values) * 1000,
+            }
+            for name, values in self.latencies.items()
+        }
+        return {
+            "elapsed_s": elapsed,
+            "flows": self.flows,
+            "flows_per_s": self.flows / elapsed if elapsed else 0,
+            "events": len(all_latencies),
+            "events_per_s": len(all_latencies) / elapsed if elapsed else 0,
+            "p50_ms": (percentile(all_latencies, 0.50) or 0) * 1000,
+            "p95_ms": (percentile(all_latencies, 0.95) or 0) * 1000,
+            "p99_ms": (percentile(all_latencies, 0.99) or 0) * 1000,
+            "per_event": per_event,
+            "errors": self.errors,
+        }
+
+
+class ReflexClient:
+    """Cliente mínimo del protocolo de eventos de Reflex."""
+
+    def __init__(self, url: str, state_name: str, root_state: str):
+        self.url = url
+        self.state_name = state_name
+        self.root_state = root_state
+        self.token = str(uuid.uuid4())
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._final = None
+        self._delta = {}
+        self.sio.on("event", self._on_update, namespace="/_event")
+
+    async def _on_update(self, data):
+        update = json.loads(data) if isinstance(data, str) else data
+        if self._final is None or self._final.done():
+            return
+        for state, delta in update.get("delta", {}).items():
+            self._delta.setdefault(state, {}).update(delta)
+        if update.get("final", True):
+            self._final.set_result(self._delta)
+
+    async def connect(self):
+        await self.sio.connect(
+            f"{self.url}?token={self.token}",
+            socketio_path="/_event",
+            namespaces=["/_event"],
+            transports=["websocket"],
+        )
+
+    async def emit(self, handler: str, payload: dict, pathname: str, state: str = None):
+        """Enviar un evento y devolver el delta acumulado hasta la actualización final."""
+        self._final = asyncio.get_running_loop().create_future()
+        self._delta = {}
+        await self.sio.emit(
+            "event",
+            {
+                "token": self.token,
+                "name": f"{state or self.state_name}.{handler}",
+                "payload": payload,
+                "router_data": {"pathname": pathname, "query": {}, "asPath": pathname},
+            },
+            namespace="/_event",
+        )
+        return await asyncio.wait_for(self._final, EVENT_TIMEOUT)
+
+    def var(self, delta: dict, name: str, state: str = None):
+        """Valor de una variable de estado en un delta (None si no ha cambiado)."""
+        return delta.get(state or self.state_name, {}).get(f"{name}_rx_state_")
+
+    async def close(self):
+        await self.sio.disconnect()
+
+
+class FlowError(Exception):
+    """Paso del flujo fallido; ya contabilizado en ``Stats.errors``."""
+
+
+async def run_flow(client: ReflexClient, stats: Stats, username: str, password: str):
+    async def step(label, handler, payload, pathname, state=None):
+        start = time.perf_counter()
+        try:
+            delta = await client.emit(handler, payload, pathname, state)
+        except Exception as e:
+            stats.error(label)
+            raise FlowError(label) from e
+        stats.record(label, time.perf_counter() - start)
+        return delta
+
+    try:
+        await step("hydrate:/login", "hydrate", {}, "/login", client.root_state)
+        # on_mount del formulario de login
+        delta = await step("issue_csrf_token", "issue_csrf_token", {}, "/login")
+        csrf_token = client.var(delta, "csrf_token")
+        await step("set_username", "set_username", {"value": username}, "/login")
+        await step("set_password", "set_password", {"value": password}, "/login")
+        delta = await step("handle_submit", "handle_submit", {"form_data": {"csrf_token": csrf_token}}, "/login")
+        if client.var(delta, "is_authenticated") is not True:
+            # Credenciales, CSRF o rate limiting: el error de AuthState dice cuál
+            stats.error(f"login: {client.var(delta, 'error') or 'sin sesión'}")
+            return
+        await step("hydrate:/dashboard", "hydrate", {}, "/dashboard", client.root_state)
+        await step("logout", "logout", {}, "/dashboard")
+    except FlowError:
+        return
+    stats.flows += 1
+
+
+async def client_loop(args, state_name, root_state, stats, stop: asyncio.Event):
+    client = ReflexClient(args.url, state_name, root_state)
+    try:
+        await client.connect()
+    except Exception:
+        stats.error("connect")
+        return
+    try:
+        while not stop.is_set():
+            await run_flow(client, stats, args.username, args.password)
+            if args.think_time:
+                await asyncio.sleep(args.think_time)
+    finally:
+        await client.close()
+
+
+async def sample_worker(pid: int, samples: list, stop: asyncio.Event):
+    """Muestrear CPU y RSS del worker (y sus hijos) una vez por segundo."""
+    try:
+        root = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return
+    known = {root.pid: root}
+    while not stop.is_set():
+        # Reutilizar los objetos Process: cpu_percent mide desde la llamada anterior
+        for child in root.children(recursive=True):
+            known.setdefault(child.pid, child)
+        cpu = rss = 0.0
+        for proc in list(known.values()):
+            try:
+                cpu += proc.cpu_percent(interval=None)
+                rss += proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                known.pop(proc.pid, None)
+        samples.append({"t": time.monotonic(), "cpu_percent": cpu, "rss_mb": rss / 1024 / 1024})
+        await asyncio.sleep(1)
+
+
+async def drive(args, state_name, root_state, worker_pid):
+    points = parse_ramp(args.ramp)
+    duration = points[-1][0]
+    stats = Stats()
+    stop_sampling = asyncio.Event()
+    samples = []
+    sampler = asyncio.create_task(sample_worker(worker_pid, samples, stop_sampling)) if worker_pid else None
+
+    clients = []  # (tarea, evento de parada)
+    retired = []
+    start = time.monotonic()
+    while (elapsed := time.monotonic() - start) < duration:
+        target = clients_at(points, elapsed)
+        while len(clients) < target:
+            stop = asyncio.Event()
+            clients.append((asyncio.create_task(client_loop(args, state_name, root_state, stats, stop)), stop))
+        while len(clients) > target:
+            task, stop = clients.pop()
+            stop.set()
+            retired.append(task)
+        await asyncio.sleep(0.25)
+
+    for _, stop in clients:
+        stop.set()
+    await asyncio.gather(*(task for task, _ in clients), *retired, return_exceptions=True)
+    elapsed = time.monotonic() - start
+
+    stop_sampling.set()
+    if sampler:
+        await sampler
+
+    result = stats.summary(elapsed)
+    result["ramp"] = points
+    if samples:
+        result["worker"] = {
+            "cpu_percent_mean": statistics.mean(s["cpu_percent"] for s in samples),
+            "cpu_percent_max": max(s["cpu_percent"] for s in samples),
+            "rss_mb_max": max(s["rss_mb"] for s in samples),
+            "samples": samples,
+        }
+    return result
+
+
+def start_backend(port: int):
+    """Arrancar un worker del backend y esperar a que responda a /ping."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "reflex", "run", "--env", "prod", "--backend-only", "--backend-port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={
+            **os.environ,
+            "REFLEX_TELEMETRY_ENABLED": "false",
+            "LOGIN_ATTEMPT_LIMIT": os.getenv("LOGIN_ATTEMPT_LIMIT", LOADGEN_LOGIN_ATTEMPT_LIMIT),
+        },
+    )
+    url = f"http://localhost:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("El backend terminó durante el arranque")
+        try:
+            if httpx.get(f"{url}/ping", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("El backend no respondió a /ping a tiempo")
+
+
+def provision_user(username: str, password: str):
+    """Crear las tablas y el usuario de la prueba en la base de datos de ``DB_URL``."""
+    from pacta.utils.database import create_admin, init_db
+
+    init_db()
+    create_admin(username=username, email=f"{username}@pacta.app", password=password)
+
+
+def run(args) -> dict:
+    from reflex.state import State
+    from pacta.state.auth_state import AuthState
+
+    proc = None
+    worker_pid = None
+    if args.url is None:
+        args.username = args.username or "loadgen"
+        args.password = args.password or secrets.token_urlsafe(16)
+        provision_user(args.username, args.password)
+        proc, args.url = start_backend(args.port)
+        worker_pid = proc.pid
+    try:
+        return asyncio.run(drive(args, AuthState.get_full_name(), State.get_full_name(), worker_pid))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Backend ya arrancado (por defecto se arranca uno local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ramp", default="0:0,30:50,90:50", help="Perfil segundo:clientes")
+    parser.add_argument("--username", help="Usuario existente (obligatorio con --url)")
+    parser.add_argument("--password", help="Contraseña del usuario (obligatoria con --url)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pausa entre flujos de un cliente (s)")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    if args.url and not (args.username and args.password):
+        parser.error("con --url hay que indicar --username y --password")
+
+    if socketio is None:
+        sys.exit("Falta python-socketio con cliente asyncio: pip install 'python-socketio[asyncio_client]'")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url is None:
+            # Antes de importar pacta: el worker y este proceso usan la misma base de datos
+            os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'loadgen.db')}"
+        result = run(args)
+
+    result["created_at"] = datetime.now(timezone.utc).isoformat()
+    result["url"] = args.url
+    data = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+    else:
+        print(data)
+    print(
+        f"{result['flows_per_s']:.1f} flujos/s  {result['events_per_s']:.1f} eventos/s  "
+        f"p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput de login con la caché de usuarios activada y desactivada.
+
+Se reproduce el camino de ``AuthState.login`` (lookup + verificación bcrypt)
+para un conjunto de usuarios reales y un porcentaje de usernames inexistentes,
+sobre un SQLite temporal.
+
+Uso:
+    BCRYPT_ROUNDS=4 python -m benchmarks.login_cache [--logins 5000] [--users 200] [--unknown 0.2]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+PASSWORD = "bench-password"
+
+
+async def _run(usernames, concurrency):
+    from pacta.utils.passwords import dummy_password_hash, verify_password
+    from pacta.utils.user_cache import get_user
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(username):
+        async with semaphore:
+            user = await get_user(username)
+            password_hash = user.password_hash if user else await dummy_password_hash()
+            ok = await verify_password(PASSWORD, password_hash)
+            return bool(user and ok)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(u) for u in usernames))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--unknown", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Antes de importar pacta: la configuración se lee al importar
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'logins.db')}"
+        run(args)
+
+
+def run(args):
+    from pacta.utils.database import create_admin, init_db
+    from pacta.utils.user_cache import user_cache
+
+    init_db()
+    for i in range(args.users):
+        create_admin(username=f"bench{i}", email=f"bench{i}@pacta.app", password=PASSWORD)
+    usernames = [
+        f"missing{random.randrange(10_000)}" if random.random() < args.unknown else f"bench{random.randrange(args.users)}"
+        for _ in range(args.logins)
+    ]
+
+    async def run_all():
+        results = {}
+        for label, ttl in (("sin caché", 0), ("con caché", 60)):
+            user_cache.ttl = ttl
+            user_cache.clear()
+            results[label] = await _run(usernames, args.concurrency)
+        return results
+
+    for label, elapsed in asyncio.run(run_all()).items():
+        print(f"{label:>10}: {args.logins / elapsed:8.0f} logins/s")
+    print(f"caché: {user_cache.hits} aciertos, {user_cache.misses} fallos")
+
+
+if __name__ == "__main__":
+    main()
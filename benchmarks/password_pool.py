@@ -0,0 +1,84 @@
+"""
+Latencia del event loop con 50 logins concurrentes: bcrypt en línea vs pool.
+
+Mientras los logins están en curso, una tarea "latido" simula los eventos de
+otras sesiones (se despierta cada 5 ms) y mide cuánto se retrasa respecto a lo
+previsto. Con bcrypt en línea el retraso es del orden de segundos; con el pool
+se mantiene cerca de cero.
+
+Uso:
+    python -m benchmarks.password_pool [--logins 50] [--rounds 12]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bcrypt
+
+from pacta.utils.passwords import PasswordHasher
+
+TICK = 0.005
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(verify, logins: int):
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(TICK * 4)
+    start = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    lags.sort()
+    return {
+        "total_s": elapsed,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000 if len(lags) > 1 else lags[-1] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    stored = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(args.rounds)).decode("utf-8")
+
+    async def inline():
+        # Comportamiento anterior: bcrypt.checkpw directamente en el handler
+        return bcrypt.checkpw(password.encode("utf-8"), stored.encode("utf-8"))
+
+    kwargs = {"max_pending": args.logins, "rounds": args.rounds}
+    if args.workers:
+        kwargs["max_workers"] = args.workers
+    pool = PasswordHasher(**kwargs)
+
+    async def pooled():
+        return await pool.verify(password, stored)
+
+    for name, verify in (("inline", inline), ("pool", pooled)):
+        result = asyncio.run(_run(verify, args.logins))
+        print(
+            f"{name:>7}: total {result['total_s']:.2f}s  "
+            f"lag p50 {result['lag_p50_ms']:.1f}ms  "
+            f"p99 {result['lag_p99_ms']:.1f}ms  max {result['lag_max_ms']:.1f}ms"
+        )
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
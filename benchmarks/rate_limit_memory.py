@@ -0,0 +1,87 @@
+"""
+Memoria del rate limiting tras 1M de IPs distintas: dict de listas de
+timestamps (implementación anterior) vs ``MemoryRateLimiter``.
+
+Con ``--redis-url`` se ejecuta además contra un Redis local (o un sustituto
+compatible, p. ej. un contenedor efímero) y se comprueba que el límite se
+aplica de forma atómica con peticiones concurrentes.
+
+Uso:
+    python -m benchmarks.rate_limit_memory [--ips 1000000] [--redis-url redis://localhost:6379/15]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from pacta.utils.rate_limit import MemoryRateLimiter, RedisRateLimiter
+
+LIMIT = 5
+WINDOW = 900
+
+
+def _legacy(ips):
+    # Equivalente al decorador anterior: solo se limpiaba al volver la misma IP
+    login_attempts = {}
+    now = time.time()
+    for i in range(ips):
+        ip = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:{i >> 24}"
+        attempts = login_attempts.setdefault(ip, [])
+        attempts.append(now)
+    return login_attempts
+
+
+def _limiter(ips, max_keys):
+    limiter = MemoryRateLimiter(LIMIT, WINDOW, max_keys=max_keys)
+    for i in range(ips):
+        limiter.check(f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:{i >> 24}")
+    return limiter
+
+
+def _measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 1024 / 1024, elapsed
+
+
+async def _redis_check(url, concurrency):
+    import redis.asyncio as redis
+
+    client = redis.from_url(url)
+    limiter = RedisRateLimiter(client, LIMIT, WINDOW, prefix="pacta:bench:rl:")
+    await limiter.reset("ip:bench")
+    results = await asyncio.gather(*(limiter.hit("ip:bench") for _ in range(concurrency)))
+    await limiter.reset("ip:bench")
+
+    start = time.perf_counter()
+    for i in range(5000):
+        await limiter.hit(f"ip:bench-{i}")
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return sum(results), 5000 / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ips", type=int, default=1_000_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    legacy, legacy_mb, legacy_s = _measure(_legacy, args.ips)
+    print(f"dict anterior:     {len(legacy):>9} claves  {legacy_mb:8.1f} MiB  {legacy_s:.2f}s")
+    del legacy
+    limiter, limiter_mb, limiter_s = _measure(_limiter, args.ips, args.max_keys)
+    print(f"MemoryRateLimiter: {len(limiter):>9} claves  {limiter_mb:8.1f} MiB  {limiter_s:.2f}s")
+
+    if args.redis_url:
+        allowed, rate = asyncio.run(_redis_check(args.redis_url, 50))
+        print(f"Redis: {allowed}/50 intentos concurrentes permitidos (límite {LIMIT}), {rate:.0f} hits/s")
+
+
+if __name__ == "__main__":
+    main()
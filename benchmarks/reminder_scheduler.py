@@ -0,0 +1,196 @@
+"""
+Planificador de avisos de vencimiento con 1M contratos.
+
+Aplica las migraciones sobre un SQLite temporal, carga ``--rows`` contratos y
+comprueba que el planificador no recorre la tabla:
+
+- el plan (``EXPLAIN QUERY PLAN``) de las consultas de ventana y de
+  sincronización usa índices, sin ``SCAN contracts``;
+- tiempo de cargar la ventana frente a leer la tabla entera;
+- sincronización incremental sin cambios y tras modificar/insertar contratos,
+  y propagación de un cambio hecho con el ORM;
+- dos planificadores (dos workers) recorren la ventana en tiempo simulado: el
+  total de avisos disparados debe coincidir con las filas de
+  ``contract_reminders`` y con el cálculo de fuerza bruta sobre la tabla.
+
+Termina con código 1 si alguna comprobación falla.
+
+Uso:
+    python -m benchmarks.reminder_scheduler [--rows 1000000] [--output reminders.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from alembic import command
+from sqlalchemy import event, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from benchmarks.contracts_search import BATCH, contract_rows
+from benchmarks.harness import Suite
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.models.reminder import ReminderModel
+from pacta.models.user import UserModel
+from pacta.utils.database import alembic_config, create_db_engine
+from pacta.utils.reminders import ReminderScheduler, due_at, kind_for, reminder_scheduler
+
+
+def seed(engine, rows: int, rng):
+    with engine.begin() as conn:
+        command.upgrade(alembic_config(conn), "head")
+        # El índice de búsqueda no interviene: carga más rápida sin su trigger
+        conn.execute(text("DROP TRIGGER contracts_fts_ai"))
+        conn.execute(insert(UserModel), [
+            {"username": f"owner{i}", "email": f"owner{i}@pacta.app", "password_hash": "x", "is_active": True}
+            for i in range(1, 101)
+        ])
+    for offset in range(0, rows, BATCH):
+        with engine.begin() as conn:
+            conn.execute(insert(ContractModel), list(contract_rows(rng, offset, min(offset + BATCH, rows), 100)))
+        print(f"\r{min(offset + BATCH, rows):>10} contratos", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+
+def query_plans(engine, fn) -> list:
+    """Planes de las consultas SELECT que ejecuta ``fn()``."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "contracts" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = " | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            plans.append((" ".join(statement.split())[:90], plan))
+    return plans
+
+
+def expected_keys(engine, scheduler: ReminderScheduler, now: datetime) -> set:
+    """Avisos de la ventana calculados recorriendo toda la tabla."""
+    keys = set()
+    with engine.connect() as conn:
+        for contract_id, end_date in conn.execute(
+            select(ContractModel.id, ContractModel.end_date).where(ContractModel.status.in_(scheduler.statuses))
+        ):
+            if end_date < now.date():
+                continue
+            passed = [d for d in scheduler.days if due_at(end_date, d) <= now]
+            if passed:
+                keys.add((contract_id, kind_for(min(passed)), end_date))
+            keys.update(
+                (contract_id, kind_for(d), end_date) for d in scheduler.days
+                if now < due_at(end_date, d) <= scheduler.window_end
+            )
+    return keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    rng = random.Random(7)
+    suite = Suite("reminder_scheduler", repeat=3, min_time=0.1)
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'reminders.db')}")
+        seed(engine, args.rows, rng)
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+        worker_a, worker_b = ReminderScheduler(engine), ReminderScheduler(engine)
+        for label, plan in query_plans(engine, lambda: worker_a.reload(now)) + query_plans(engine, lambda: worker_a.sync(now)):
+            print(f"{label:<92} {plan}", file=sys.stderr)
+            if "SCAN contracts" in plan:
+                failures.append(f"recorrido completo de contracts: {label}")
+
+        start = time.perf_counter()
+        worker_a.reload(now)
+        window_s = time.perf_counter() - start
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            scanned = len(conn.execute(select(ContractModel.id, ContractModel.end_date, ContractModel.status)).all())
+        scan_s = time.perf_counter() - start
+        suite.results["load_window"] = {
+            "min_us": window_s * 1e6, "scheduled_contracts": len(worker_a._scheduled), "heap": len(worker_a),
+            "full_scan_us": scan_s * 1e6, "full_scan_rows": scanned,
+        }
+        print(f"ventana: {window_s * 1000:.1f} ms, {len(worker_a._scheduled)} contratos, {len(worker_a)} avisos "
+              f"(tabla entera: {scan_s * 1000:.0f} ms)", file=sys.stderr)
+        suite.bench("sync.no_changes", lambda: worker_a.sync(now))
+
+        # Cambios de "otro worker": vencimientos movidos dentro de la ventana y altas
+        with engine.begin() as conn:
+            moved = [row.id for row in conn.execute(
+                select(ContractModel.id).where(ContractModel.status == ContractStatus.ACTIVE)
+                .order_by(ContractModel.id).limit(1000)
+            )]
+            conn.execute(
+                update(ContractModel).where(ContractModel.id.in_(moved))
+                .values(end_date=(now + timedelta(days=3)).date(), updated_at=func.now())
+            )
+            new_rows = list(contract_rows(rng, 10 ** 8, 10 ** 8 + 1000, 100))
+            for row in new_rows:
+                row.update(status=ContractStatus.ACTIVE, end_date=(now + timedelta(days=5)).date())
+            conn.execute(insert(ContractModel), new_rows)
+        start = time.perf_counter()
+        worker_a.sync(now)
+        sync_s = time.perf_counter() - start
+        suite.results["sync.2000_changes"] = {"min_us": sync_s * 1e6}
+        missing = [i for i in moved if worker_a._scheduled.get(i) != (now + timedelta(days=3)).date()]
+        if missing:
+            failures.append(f"sincronización: {len(missing)} contratos modificados sin programar")
+        print(f"sincronizar 2000 cambios: {sync_s * 1000:.1f} ms", file=sys.stderr)
+
+        # Cambio con el ORM en este proceso: llega por los eventos de sesión
+        reminder_scheduler.tracking = True
+        with Session(engine) as db:
+            contract = db.get(ContractModel, moved[0])
+            contract.end_date = (now + timedelta(days=1)).date()
+            db.commit()
+        reminder_scheduler.tracking = False
+        if list(reminder_scheduler._changes) != [(moved[0], (now + timedelta(days=1)).date(), ContractStatus.ACTIVE)]:
+            failures.append(f"eventos del ORM: {list(reminder_scheduler._changes)}")
+        reminder_scheduler._changes.clear()
+
+        # Dos workers recorren la ventana hora a hora en tiempo simulado
+        worker_a.reload(now)
+        worker_b.reload(now)
+        expected = expected_keys(engine, worker_a, now)
+        fired = 0
+        start = time.perf_counter()
+        hours = int(worker_a.window.total_seconds() // 3600)
+        for hour in range(hours + 1):
+            clock = now + timedelta(hours=hour)
+            for worker in ((worker_a, worker_b) if hour % 2 else (worker_b, worker_a)):
+                fired += len(worker.fire(worker.pop_due(clock)))
+        fire_s = time.perf_counter() - start
+        with engine.connect() as conn:
+            stored = set(conn.execute(select(ReminderModel.contract_id, ReminderModel.kind, ReminderModel.end_date)).all())
+        suite.results["fire_window"] = {"min_us": fire_s * 1e6, "reminders": fired}
+        print(f"ventana simulada: {fired} avisos en {fire_s:.2f} s ({hours} h, 2 workers)", file=sys.stderr)
+        if fired != len(stored):
+            failures.append(f"disparados {fired} pero hay {len(stored)} filas: aviso duplicado")
+        if stored != expected:
+            failures.append(f"avisos: {len(stored - expected)} de más, {len(expected - stored)} de menos")
+        engine.dispose()
+
+    suite.write(args.output)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Coste del arranque del esquema: create_all + consulta del admin (antes) vs
+comprobación de la revisión de Alembic (ahora).
+
+El arranque anterior se ejecutaba además en cada construcción de AuthState,
+es decir, en cada nueva sesión de cliente; ahora la creación de estado no
+toca la base de datos.
+
+Uso:
+    python -m benchmarks.schema_bootstrap [--iterations 200]
+"""
+import argparse
+import time
+
+from pacta.models.user import Base, UserModel
+from pacta.utils.database import SessionLocal, engine, init_db, schema_revision
+
+
+def _legacy_bootstrap():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.query(UserModel).filter_by(username="admin").first()
+    finally:
+        db.close()
+
+
+def _time(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"create_all + admin query: {_time(_legacy_bootstrap, args.iterations):.3f} ms/llamada")
+    print(f"schema_revision:          {_time(schema_revision, args.iterations):.3f} ms/llamada")
+    print("AuthState.__init__:       0 consultas a la base de datos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Prueba de resistencia: 10k logins concurrentes y ninguna conexión perdida.
+
+Cada login reproduce el camino de ``AuthState.login`` sin la caché de usuarios
+(búsqueda en la base de datos con ``run_db`` y verificación bcrypt en el pool)
+sobre un SQLite temporal. Al terminar, el número de sesiones abiertas y de
+conexiones prestadas debe volver a cero; si no, el script termina con código
+1. ``tests/test_sessions.py`` es la versión corta.
+
+Uso:
+    BCRYPT_ROUNDS=4 python -m benchmarks.session_soak [--logins 10000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Coste bcrypt bajo para que la prueba mida sesiones, no hashing
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+USERNAME = "soak-admin"
+PASSWORD = "soak-password"
+
+
+async def _soak(logins, concurrency):
+    from pacta.utils.database import run_db
+    from pacta.utils.passwords import verify_password
+    from pacta.utils.user_cache import _load_user
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            user = await run_db(_load_user, USERNAME)
+            return user is not None and await verify_password(PASSWORD, user.password_hash)
+
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    return sum(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Antes de importar pacta: la configuración se lee al importar
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'soak.db')}"
+        run(args)
+
+
+def run(args):
+    from pacta.utils.database import checked_out_connections, create_admin, init_db, session_stats
+
+    init_db()
+    create_admin(username=USERNAME, email="soak@pacta.app", password=PASSWORD)
+    session_stats.reset()
+
+    start = time.perf_counter()
+    ok = asyncio.run(_soak(args.logins, args.concurrency))
+    elapsed = time.perf_counter() - start
+
+    stats = session_stats.snapshot()
+    leaked = checked_out_connections()
+    print(f"{ok}/{args.logins} logins correctos en {elapsed:.1f}s ({args.logins / elapsed:.0f}/s)")
+    print(f"sesiones abiertas: {stats['open_sessions']}  conexiones prestadas: {leaked}")
+    print(f"préstamos: {stats['checkouts_total']}  histograma: {stats['checkout_buckets']}")
+
+    if ok != args.logins or stats["open_sessions"] or stats["stale_sessions"] or stats["checked_out"] or leaked:
+        print("FALLO: quedaron sesiones o conexiones sin devolver al pool")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Lectores concurrentes + un escritor sobre la tabla users, con y sin los
+PRAGMAs de rendimiento de SQLite (WAL, synchronous=NORMAL, busy_timeout, ...).
+
+Cada lector busca usuarios aleatorios por username; el escritor inserta y
+actualiza filas en transacciones cortas. Se informa de operaciones por
+segundo y de errores "database is locked".
+
+Uso:
+    python -m benchmarks.sqlite_contention [--readers 8] [--seconds 5] [--users 20000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from pacta.models.user import Base, UserModel
+from pacta.utils.database import create_db_engine
+
+
+def _seed(engine, users):
+    Base.metadata.create_all(engine)
+    rows = [
+        {"username": f"user{i}", "email": f"user{i}@pacta.app", "password_hash": "x", "is_active": True}
+        for i in range(users)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), rows)
+
+
+def _run(engine, readers, seconds, users):
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def reader():
+        done = locked = 0
+        while not stop.is_set():
+            stmt = select(UserModel.id, UserModel.email).where(
+                UserModel.username == f"user{random.randrange(users)}"
+            )
+            try:
+                with engine.connect() as conn:
+                    conn.execute(stmt).first()
+                done += 1
+            except OperationalError:
+                locked += 1
+        with lock:
+            counts["reads"] += done
+            counts["locked"] += locked
+
+    def writer():
+        done = locked = 0
+        n = users
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(UserModel).values(
+                        username=f"user{n}", email=f"user{n}@pacta.app", password_hash="x", is_active=True
+                    ))
+                    conn.execute(
+                        update(UserModel)
+                        .where(UserModel.id == random.randrange(1, users))
+                        .values(is_active=bool(n % 2))
+                    )
+                n += 1
+                done += 1
+            except OperationalError:
+                locked += 1
+        with lock:
+            counts["writes"] += done
+            counts["locked"] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {k: v / seconds if k != "locked" else v for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=20000)
+    args = parser.parse_args()
+
+    for tuned in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            engine = create_db_engine(url, pool_size=args.readers + 1, max_overflow=0, tune_sqlite=tuned)
+            _seed(engine, args.users)
+            result = _run(engine, args.readers, args.seconds, args.users)
+            engine.dispose()
+        label = "pragmas" if tuned else "default"
+        print(
+            f"{label:>8}: {result['reads']:.0f} lecturas/s  {result['writes']:.0f} escrituras/s  "
+            f"{result['locked']} errores 'database is locked'"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Página /estadisticas: agregados incrementales frente a ``GROUP BY`` completo.
+
+Para cada tamaño de ``--rows`` (por defecto 1M y 10M) carga los contratos en
+un SQLite temporal con SQL Core y reconstruye los agregados, y mide:
+
+- ``rebuild``: ``statistics.rebuild`` (lo que hace ``rebuild-stats``);
+- ``page.aggregates``: ``load_statistics``, lo que lee la página;
+- ``page.naive``: las consultas ``GROUP BY`` sobre toda la tabla que harían
+  falta sin los agregados;
+- ``orm.insert``/``orm.update``/``orm.delete``: coste por contrato de
+  mantener los agregados en el flush frente a la misma operación sin el
+  listener.
+
+Después de los cambios por el ORM, ``statistics.check`` no debe encontrar
+diferencias; si las hay termina con código 1.
+
+Uso:
+    python -m benchmarks.statistics_page [--rows 1000000,10000000] [--output stats.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+from alembic import command
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+
+from benchmarks.contracts_search import BATCH, contract_rows
+from benchmarks.harness import Suite
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.models.user import UserModel
+from pacta.utils import statistics
+from pacta.utils.database import alembic_config, create_db_engine
+
+ORM_ROWS = 1000
+
+
+def seed(engine, rows: int, rng):
+    with engine.begin() as conn:
+        command.upgrade(alembic_config(conn), "head")
+        # La búsqueda no interviene: carga más rápida sin su trigger
+        conn.execute(text("DROP TRIGGER contracts_fts_ai"))
+        conn.execute(insert(UserModel), [
+            {"username": f"owner{i}", "email": f"owner{i}@pacta.app", "password_hash": "x", "is_active": True}
+            for i in range(1, 101)
+        ])
+    for offset in range(0, rows, BATCH):
+        with engine.begin() as conn:
+            conn.execute(insert(ContractModel), list(contract_rows(rng, offset, min(offset + BATCH, rows), 100)))
+        print(f"\r{min(offset + BATCH, rows):>10} contratos", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+
+def naive_page(db):
+    return [db.execute(query).all() for query in statistics.grouped_queries(db.connection())]
+
+
+def orm_writes(engine, rng, label: str, suite: Suite):
+    """Segundos por contrato de insertar, modificar y borrar ``ORM_ROWS`` contratos."""
+    results = {}
+    with Session(engine) as db:
+        contracts = [ContractModel(**row) for row in contract_rows(rng, 10 ** 9, 10 ** 9 + ORM_ROWS, 100)]
+        start = time.perf_counter()
+        for contract in contracts:
+            db.add(contract)
+            db.flush()
+        db.commit()
+        results["insert"] = (time.perf_counter() - start) / ORM_ROWS
+
+        start = time.perf_counter()
+        for contract in contracts:
+            contract.status = ContractStatus.TERMINATED
+            contract.value = rng.randrange(100, 1_000_000)
+            db.flush()
+        db.commit()
+        results["update"] = (time.perf_counter() - start) / ORM_ROWS
+
+        start = time.perf_counter()
+        for contract in contracts:
+            db.delete(contract)
+            db.flush()
+        db.commit()
+        results["delete"] = (time.perf_counter() - start) / ORM_ROWS
+    for operation, seconds in results.items():
+        suite.results[f"orm.{operation}.{label}"] = {"min_us": seconds * 1e6}
+        print(f"orm.{operation}.{label:<18} {seconds * 1e6:10.1f} µs/contrato", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="1000000,10000000", help="Tamaños separados por comas")
+    parser.add_argument("--output", help="Fichero JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+    suite = Suite("statistics_page", repeat=3, min_time=0.05)
+    failures = []
+
+    for rows in (int(size) for size in args.rows.split(",")):
+        rng = random.Random(rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'statistics.db')}")
+            seed(engine, rows, rng)
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                aggregates = statistics.rebuild(conn)
+            rebuild_s = time.perf_counter() - start
+            suite.results[f"rebuild.{rows}"] = {"min_us": rebuild_s * 1e6, "aggregates": aggregates}
+            print(f"rebuild: {rebuild_s:.1f} s, {aggregates} filas de agregados", file=sys.stderr)
+
+            with Session(engine) as db:
+                today = date.today()
+                suite.bench(f"page.aggregates.{rows}", lambda: statistics.load_statistics(db, today), rows=rows)
+                suite.bench(f"page.naive.{rows}", lambda: naive_page(db), rows=rows)
+
+            orm_writes(engine, rng, f"aggregates.{rows}", suite)
+            event.remove(Session, "before_flush", statistics._update_aggregates)
+            try:
+                orm_writes(engine, rng, f"no_aggregates.{rows}", suite)
+            finally:
+                event.listen(Session, "before_flush", statistics._update_aggregates)
+
+            with engine.connect() as conn:
+                differences = statistics.check(conn)
+            if differences:
+                failures.append(f"{rows} contratos: {len(differences)} agregados no coinciden, p. ej. {differences[0]}")
+            engine.dispose()
+
+    suite.write(args.output)
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
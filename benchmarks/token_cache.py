@@ -0,0 +1,54 @@
+"""
+Restauración repetida de sesiones: ``jwt.decode`` en cada construcción de
+estado (anterior) vs ``decode_token`` con caché de claims verificados.
+
+Uso:
+    python -m benchmarks.token_cache [--sessions 1000] [--restores 100000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from pacta.utils.tokens import ALGORITHM, SECRET_KEY, decode_token, revoke_token, token_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--restores", type=int, default=100_000)
+    args = parser.parse_args()
+
+    expire = datetime.now(timezone.utc) + timedelta(minutes=60)
+    tokens = [
+        jwt.encode({"sub": f"user{i}", "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+        for i in range(args.sessions)
+    ]
+    sequence = [random.choice(tokens) for _ in range(args.restores)]
+
+    start = time.perf_counter()
+    for token in sequence:
+        jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    plain = time.perf_counter() - start
+
+    async def restore_all():
+        for token in sequence:
+            await decode_token(token)
+
+    start = time.perf_counter()
+    asyncio.run(restore_all())
+    cached = time.perf_counter() - start
+
+    print(f"jwt.decode:   {args.restores / plain:10.0f} restauraciones/s")
+    print(f"decode_token: {args.restores / cached:10.0f} restauraciones/s  {token_cache.stats()}")
+
+    asyncio.run(revoke_token(tokens[0]))
+    assert asyncio.run(decode_token(tokens[0])) is None, "token revocado aceptado"
+    print("token revocado rechazado desde la caché")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Alta masiva de usuarios: throughput y memoria de ``provision_users``.
+
+Genera un CSV temporal con ``--users`` filas (con un porcentaje de filas
+inválidas y duplicadas), lo carga en un SQLite temporal y mide usuarios por
+segundo y el pico de RSS. Después repite la carga sobre la misma base de datos:
+todas las filas son conflictos y no se debería gastar tiempo en bcrypt.
+
+Con 100k usuarios, el coste por defecto (12) y 8 núcleos el tiempo lo domina
+bcrypt (~0,25 s por hash y núcleo); ``--rounds 4`` mide solo el resto del
+camino.
+
+Uso:
+    python -m benchmarks.user_provisioning [--users 100000] [--rounds 12] [--workers 8]
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from pacta.models.user import Base
+from pacta.utils.database import create_db_engine
+from pacta.utils.provisioning import PROVISION_WORKERS, provision_users, read_rows
+
+
+def write_csv(path: str, users: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "email", "password"])
+        for i in range(users):
+            if i % 100 == 1:
+                writer.writerow([f"bad{i}", "no-es-un-email", "x"])
+            elif i % 100 == 2:
+                writer.writerow([f"user{i - 2}", f"dup{i}@pacta.app", "x"])
+            else:
+                writer.writerow([f"user{i}", f"user{i}@pacta.app", f"password-{i}"])
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run(path, engine, args):
+    start = time.perf_counter()
+    report = provision_users(
+        read_rows(path), engine, batch_size=args.batch_size, workers=args.workers, rounds=args.rounds
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_s": elapsed,
+        "rows_per_s": report.read / elapsed,
+        "inserted": report.inserted,
+        "conflicts": report.conflicts,
+        "invalid": report.invalid,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=PROVISION_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.csv")
+        write_csv(path, args.users)
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'users.db')}")
+        Base.metadata.create_all(engine)
+        try:
+            results = {"first_load": run(path, engine, args), "rerun": run(path, engine, args)}
+        finally:
+            engine.dispose()
+
+    results["params"] = vars(args)
+    print(json.dumps(results, indent=2))
+    first = results["first_load"]
+    if first["inserted"] + first["conflicts"] + first["invalid"] != args.users or results["rerun"]["inserted"]:
+        sys.exit("Recuento inconsistente entre filas leídas, creadas y rechazadas")
+
+
+if __name__ == "__main__":
+    main()
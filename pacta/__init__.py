@@ -1,17 +1,48 @@
 """
 PACTA - Aplicación web para la gestión de contratos y acuerdos.
-"""
 
-# Importar componentes principales
-from .components import *
-from .pages import *
-from .state import *
-from .styles import *
-from .utils import *
+Las exportaciones se resuelven al primer acceso (``__getattr__`` de módulo):
+importar ``pacta`` o cualquiera de sus submódulos (la CLI, los benchmarks,
+``pacta.utils.*``) no carga Reflex, las páginas ni la aplicación. Reflex
+importa ``pacta.pacta`` directamente.
+"""
+import importlib
 
-# Exportar la aplicación principal
-from .pacta import app
+# Nombre exportado -> submódulo que lo define
+_EXPORTS = {
+    "app": ".pacta",
+    # Componentes
+    "Header": ".components",
+    "UserMenu": ".components",
+    "alert": ".components",
+    "AlertType": ".components",
+    "Sidebar": ".components",
+    "LayoutBase": ".components",
+    "footer": ".components",
+    "ContractsTable": ".components",
+    "Reminders": ".components",
+    # Páginas
+    "login": ".pages",
+    "dashboard": ".pages",
+    "contracts": ".pages",
+    "statistics": ".pages",
+}
 
 __all__ = [
     'app',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Los siguientes accesos no pasan por aquí
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
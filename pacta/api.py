@@ -0,0 +1,172 @@
+"""
+Rutas HTTP adicionales montadas en el backend de Reflex (``api_transformer``).
+
+Los documentos de contratos se suben y descargan por HTTP y no por el
+websocket de estado, para poder transmitirlos en streaming:
+
+- ``POST /api/contracts/{id}/documents?filename=…`` con el fichero como cuerpo
+  ``application/octet-stream`` (un formulario de otro sitio no puede enviar ese
+  tipo sin preflight CORS, y la cookie es ``SameSite=Lax``);
+- ``GET /api/contracts/{id}/documents`` lista los documentos de un contrato;
+- ``GET /api/documents/{id}`` descarga con soporte de ``Range``.
+
+Cada documento nuevo queda pendiente de extracción de texto
+(``pacta.utils.extraction``) y la subida despierta al pipeline.
+
+Se autentican con la cookie ``auth_token`` o una cabecera ``Authorization: Bearer``.
+"""
+import mimetypes
+import os
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from pacta.models.contract import ContractModel
+from pacta.models.document import Document, DocumentModel, ExtractionStatus
+from pacta.utils import metrics, query_stats
+from pacta.utils.database import run_db, session_stats
+from pacta.utils.documents import DocumentTooLarge, StoredBlob, document_store
+from pacta.utils.extraction import extraction_pipeline
+from pacta.utils.tokens import decode_token, token_cache
+from pacta.utils.user_cache import UserRecord, get_user
+
+api = FastAPI()
+
+
+def _database_metrics():
+    snapshot = session_stats.snapshot()
+    yield "# TYPE pacta_db_open_sessions gauge"
+    yield f"pacta_db_open_sessions {snapshot['open_sessions']}"
+    yield "# TYPE pacta_db_checked_out_connections gauge"
+    yield f"pacta_db_checked_out_connections {snapshot['checked_out']}"
+    yield "# TYPE pacta_db_stale_sessions gauge"
+    yield f"pacta_db_stale_sessions {snapshot['stale_sessions']}"
+    yield "# TYPE pacta_db_long_lived_sessions_total counter"
+    yield f"pacta_db_long_lived_sessions_total {snapshot['long_lived_sessions']}"
+    yield "# TYPE pacta_db_checkout_seconds histogram"
+    total = 0
+    for bound, count in snapshot["checkout_buckets"].items():
+        total += count
+        le = "+Inf" if bound == float("inf") else repr(float(bound))
+        yield f'pacta_db_checkout_seconds_bucket{{le="{le}"}} {total}'
+    yield f"pacta_db_checkout_seconds_sum {snapshot['checkout_seconds_sum']}"
+    yield f"pacta_db_checkout_seconds_count {snapshot['checkouts_total']}"
+
+
+def _token_cache_metrics():
+    stats = token_cache.stats()
+    yield "# TYPE pacta_token_cache_hits_total counter"
+    yield f"pacta_token_cache_hits_total {stats['hits']}"
+    yield "# TYPE pacta_token_cache_misses_total counter"
+    yield f"pacta_token_cache_misses_total {stats['misses']}"
+
+
+metrics.collectors.extend([_database_metrics, _token_cache_metrics, query_stats.prometheus_lines])
+
+
+@api.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Métricas en formato de texto de Prometheus."""
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+async def current_user(request: Request) -> UserRecord:
+    """Usuario activo del token de la cookie o de ``Authorization: Bearer``."""
+    token = request.cookies.get("auth_token")
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        token = authorization[len("Bearer "):]
+    claims = await decode_token(token) if token else None
+    user = await get_user(claims.get("sub", "")) if claims else None
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="No autenticado")
+    return user
+
+
+def _contract_exists(db: Session, contract_id: int) -> bool:
+    return db.get(ContractModel, contract_id) is not None
+
+
+def _link_document(db: Session, contract_id: int, blob: StoredBlob, filename: str,
+                   content_type: str, user_id: int) -> Document:
+    existing = db.query(DocumentModel).filter_by(contract_id=contract_id, sha256=blob.sha256).first()
+    if existing is None:
+        existing = DocumentModel(
+            contract_id=contract_id,
+            sha256=blob.sha256,
+            size=blob.size,
+            filename=filename,
+            content_type=content_type,
+            uploaded_by=user_id,
+        )
+        try:
+            with db.begin_nested():
+                db.add(existing)
+        except IntegrityError:
+            # Subida simultánea del mismo fichero al mismo contrato
+            existing = db.query(DocumentModel).filter_by(contract_id=contract_id, sha256=blob.sha256).one()
+    return Document.model_validate(existing)
+
+
+def _list_documents(db: Session, contract_id: int) -> List[Document]:
+    rows = db.query(DocumentModel).filter_by(contract_id=contract_id).order_by(DocumentModel.id)
+    return [Document.model_validate(row) for row in rows]
+
+
+def _get_document(db: Session, document_id: int) -> Optional[Document]:
+    row = db.get(DocumentModel, document_id)
+    return Document.model_validate(row) if row is not None else None
+
+
+@api.post("/api/contracts/{contract_id}/documents", status_code=201, response_model=Document)
+async def upload_document(
+    contract_id: int,
+    filename: str,
+    request: Request,
+    user: UserRecord = Depends(current_user),
+):
+    """Subir un documento en streaming; los ficheros idénticos se guardan una vez."""
+    length = request.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > document_store.max_bytes:
+        raise HTTPException(status_code=413, detail="Documento demasiado grande")
+    if not await run_db(_contract_exists, contract_id):
+        raise HTTPException(status_code=404, detail="Contrato no encontrado")
+
+    filename = os.path.basename(filename.replace("\\", "/")).strip()[:255] or "documento"
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    try:
+        blob = await document_store.save(request.stream())
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    document = await run_db(_link_document, contract_id, blob, filename, content_type, user.id)
+    if document.extraction_status == ExtractionStatus.PENDING:
+        extraction_pipeline.wake()
+    return document
+
+
+@api.get("/api/contracts/{contract_id}/documents", response_model=List[Document])
+async def list_documents(contract_id: int, user: UserRecord = Depends(current_user)):
+    return await run_db(_list_documents, contract_id)
+
+
+@api.get("/api/documents/{document_id}")
+async def download_document(document_id: int, user: UserRecord = Depends(current_user)):
+    """Descargar un documento; ``FileResponse`` atiende ``Range`` y usa pathsend si el servidor lo ofrece."""
+    document = await run_db(_get_document, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Documento no encontrado")
+    path = document_store.path_for(document.sha256)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Contenido del documento no disponible")
+    return FileResponse(
+        path,
+        media_type=document.content_type,
+        filename=document.filename,
+        # El contenido de un hash no cambia nunca
+        headers={"ETag": f'"{document.sha256}"', "Cache-Control": "private, max-age=31536000, immutable"},
+    )
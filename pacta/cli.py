@@ -0,0 +1,141 @@
+"""
+Comandos de administración de PACTA.
+
+Uso:
+    python -m pacta.cli migrate
+    python -m pacta.cli create-admin --username admin --email admin@pacta.app
+    python -m pacta.cli provision-users usuarios.csv --errors rechazados.csv
+    python -m pacta.cli reindex-search
+    python -m pacta.cli extract-documents --workers 4
+    python -m pacta.cli rebuild-stats
+    python -m pacta.cli check-stats
+"""
+import asyncio
+import csv
+import sys
+
+import click
+
+from pacta.utils import database, extraction, provisioning, search, statistics
+
+
+@click.group()
+def cli():
+    """Administración de PACTA."""
+
+
+@cli.command()
+def migrate():
+    """Aplicar las migraciones pendientes de la base de datos."""
+    current, head = database.schema_revision()
+    if current == head:
+        click.echo(f"El esquema ya está actualizado (revisión {head}).")
+        return
+    database.init_db()
+    click.echo(f"Esquema migrado de {current or 'vacío'} a {head}.")
+
+
+@cli.command("create-admin")
+@click.option("--username", default="admin", show_default=True)
+@click.option("--email", default="admin@pacta.app", show_default=True)
+@click.option("--password", prompt=True, hide_input=True, confirmation_prompt=True)
+def create_admin(username, email, password):
+    """Crear el usuario administrador si no existe."""
+    database.init_db()
+    if database.create_admin(username=username, email=email, password=password):
+        click.echo("Usuario administrador creado exitosamente!")
+    else:
+        click.echo(f"El usuario '{username}' ya existe.")
+
+
+@cli.command("provision-users")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Por defecto según la extensión")
+@click.option("--batch-size", type=int, default=provisioning.PROVISION_BATCH_SIZE, show_default=True)
+@click.option("--workers", type=int, default=provisioning.PROVISION_WORKERS, show_default=True,
+              help="Procesos para bcrypt")
+@click.option("--errors", "errors_path", type=click.Path(dir_okay=False, writable=True),
+              help="CSV con las filas rechazadas (por defecto stderr)")
+def provision_users(path, fmt, batch_size, workers, errors_path):
+    """Dar de alta usuarios en bloque desde un CSV o JSONL (username, email, password)."""
+    database.init_db()
+    errors_file = open(errors_path, "w", newline="", encoding="utf-8") if errors_path else sys.stderr
+    try:
+        writer = csv.writer(errors_file)
+        writer.writerow(["linea", "username", "motivo"])
+
+        def on_batch(report):
+            click.echo(
+                f"{report.read} leídos, {report.inserted} creados, "
+                f"{report.conflicts} en conflicto, {report.invalid} inválidos",
+                err=True,
+            )
+
+        report = provisioning.provision_users(
+            provisioning.read_rows(path, fmt),
+            database.engine,
+            batch_size=batch_size,
+            workers=workers,
+            on_problem=lambda line_no, username, reason: writer.writerow([line_no, username, reason]),
+            on_batch=on_batch,
+        )
+    finally:
+        if errors_path:
+            errors_file.close()
+    click.echo(f"Usuarios creados: {report.inserted} de {report.read}.")
+    if report.conflicts or report.invalid:
+        click.echo(f"Rechazados: {report.conflicts} en conflicto, {report.invalid} inválidos.")
+
+
+@cli.command("reindex-search")
+def reindex_search():
+    """Reconstruir el índice de búsqueda de contratos."""
+    database.init_db()
+    with database.engine.begin() as conn:
+        indexed = search.reindex(conn)
+    click.echo(f"Contratos indexados: {indexed}.")
+
+
+@cli.command("extract-documents")
+@click.option("--workers", type=int, default=extraction.EXTRACTION_WORKERS, show_default=True,
+              help="Procesos de extracción")
+def extract_documents(workers):
+    """Extraer el texto de los documentos pendientes y añadirlo al índice de búsqueda."""
+    database.init_db()
+    pipeline = extraction.ExtractionPipeline(database.engine, workers=workers)
+    try:
+        processed = asyncio.run(pipeline.drain())
+    finally:
+        pipeline.close()
+    with database.session_scope(commit=False) as db:
+        backlog = extraction.extraction_backlog(db)
+    click.echo(f"Documentos procesados: {processed} ({backlog['failed']} fallidos en total).")
+
+
+@cli.command("rebuild-stats")
+def rebuild_stats():
+    """Recalcular los agregados de /estadisticas desde la tabla de contratos."""
+    database.init_db()
+    with database.engine.begin() as conn:
+        rows = statistics.rebuild(conn)
+    click.echo(f"Agregados recalculados: {rows} filas.")
+
+
+@cli.command("check-stats")
+@click.option("--limit", type=int, default=20, show_default=True, help="Diferencias a mostrar")
+def check_stats(limit):
+    """Comparar los agregados con un recálculo completo; termina con código 1 si difieren."""
+    database.init_db()
+    with database.engine.connect() as conn:
+        differences = statistics.check(conn)
+    if not differences:
+        click.echo("Los agregados coinciden con la tabla de contratos.")
+        return
+    for key, expected, stored in differences[:limit]:
+        click.echo(f"{'/'.join(key)}: esperado {expected}, guardado {stored}", err=True)
+    click.echo(f"{len(differences)} agregados no coinciden; ejecuta rebuild-stats.", err=True)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
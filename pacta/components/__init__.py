@@ -6,6 +6,8 @@ from .sidebar import Sidebar
 from .layout_base import LayoutBase
 from .alerts import alert, AlertType
 from .footer import footer
+from .contracts_table import ContractsTable
+from .reminders import Reminders
 
 __all__ = [
     "Header",
@@ -15,4 +17,6 @@ __all__ = [
     "Sidebar",
     "LayoutBase",
     "footer",
+    "ContractsTable",
+    "Reminders",
 ]
\ No newline at end of file
@@ -35,6 +35,74 @@ alert_styles = {
     },
 }
 
+
+# Estilos de cada variante calculados una sola vez al importar el módulo: cada
+# llamada a ``alert`` solo elige la suya y construye los hijos necesarios.
+_CONTAINER_STYLE = {
+    "width": "100%",
+    "margin_bottom": "1rem",
+    "font_family": Font.SECONDARY,
+    "transition": "all 0.2s ease-in-out",
+}
+
+
+def _variant(styles: dict) -> dict:
+    return {
+        "content": {
+            "align_items": "flex-start",
+            "padding": "1rem",
+            "border_radius": "0.5rem",
+            "border_left": f"4px solid {styles['border_color']}",
+            "background_color": styles["bg"],
+            "width": "100%",
+            "box_shadow": "0 1px 3px 0 rgba(0, 0, 0, 0.05)",
+        },
+        "icon": {
+            "tag": styles["icon"],
+            "color": styles["color"],
+            "margin_right": "0.75rem",
+            "flex_shrink": 0,
+            "size": 20,
+        },
+        "title": {
+            "color": styles["color"],
+            "font_family": Font.PRIMARY,
+            "font_weight": "600",
+            "line_height": "1.3",
+        },
+        "description": {
+            **TextStyles.BODY,
+            "color": styles["color"],
+            "opacity": 0.9,
+            "font_size": "0.9375rem",  # Tamaño ligeramente más pequeño para la descripción
+        },
+        "close": {
+            "variant": "ghost",
+            "size": "1",  # Using valid size value (1-4)
+            "color": styles["color"],
+            "_hover": {"background": "transparent", "opacity": "0.8"},
+            "_active": {"background": "transparent"},
+            "padding": "0.25rem",
+            "height": "auto",
+        },
+    }
+
+
+alert_variants = {status: _variant(styles) for status, styles in alert_styles.items()}
+
+
+def _optional(value, build):
+    """``build()`` condicionado en el cliente si ``value`` es un Var; si no, solo cuando es verdadero."""
+    if isinstance(value, rx.Var):
+        return rx.cond(value, build())
+    return build() if value else None
+
+
+def _present(*components):
+    # Sin ``filter(None, ...)``: la veracidad de un componente no está definida
+    return [component for component in components if component is not None]
+
+
 def alert(
     title: str = None,
     description: str = None,
@@ -46,7 +114,12 @@ def alert(
 ) -> rx.Component:
     """
     Componente de alerta personalizado que utiliza la paleta de colores global.
-    
+
+    Los estilos de cada tipo están precalculados en ``alert_variants``. Las
+    partes opcionales (icono, título, descripción, botón de cierre) solo
+    generan un ``rx.cond`` cuando dependen de un Var; con valores de Python se
+    incluyen u omiten directamente y no llegan al JS compilado.
+
     Args:
         title: Título de la alerta (opcional)
         description: Descripción de la alerta (opcional)
@@ -55,118 +128,42 @@ def alert(
         is_closable: Permitir cerrar la alerta
         on_close: Función a ejecutar al cerrar la alerta
         **props: Propiedades adicionales para personalización
-        
-    Returns:
-        Componente de alerta de Reflex
-    """
-    """
-    Componente de alerta personalizado.
-    
-    Args:
-        title: Título de la alerta (opcional)
-        description: Descripción de la alerta (opcional)
-        status: Tipo de alerta (success, error, warning, info)
-        show_icon: Mostrar icono
-        is_closable: Permitir cerrar la alerta
-        on_close: Función a ejecutar al cerrar la alerta
-        **props: Propiedades adicionales
-        
+
     Returns:
         Componente de alerta de Reflex
     """
-    status = status.lower()
-    styles = alert_styles.get(status, alert_styles[AlertType.INFO])
-    
-    # Estilo base para el contenedor de la alerta
-    alert_container_style = {
-        "width": "100%",
-        "margin_bottom": "1rem",
-        "font_family": Font.SECONDARY,
-        "transition": "all 0.2s ease-in-out",
-    }
-    
-    # Estilo para el contenido de la alerta
-    content_style = {
-        "align_items": "flex-start",
-        "padding": "1rem",
-        "border_radius": "0.5rem",
-        "border_left": f"4px solid {styles['border_color']}",
-        "background_color": styles["bg"],
-        "width": "100%",
-        "box_shadow": "0 1px 3px 0 rgba(0, 0, 0, 0.05)",
-    }
-    
+    variant = alert_variants.get(status.lower(), alert_variants[AlertType.INFO])
+    content_style = variant["content"]
     # Aplicar estilos personalizados adicionales si se proporcionan
     if "style" in props:
-        content_style.update(props.pop("style"))
-    
-    return rx.box(
-        rx.hstack(
-            # Icono
-            rx.cond(
-                show_icon,
-                rx.icon(
-                    tag=styles["icon"],
-                    color=styles["color"],
-                    margin_right="0.75rem",
-                    flex_shrink=0,
-                    size=20,
-                ),
-                None,
-            ),
-            
-            # Contenido
-            rx.vstack(
-                rx.cond(
-                    title,
-                    rx.text(
-                        title,
-                        color=styles["color"],
-                        margin_bottom=rx.cond(description, "0.25rem", "0"),
-                        font_family=Font.PRIMARY,
-                        font_weight="600",
-                        line_height="1.3",
-                    ),
-                    None,
-                ),
-                rx.cond(
-                    description,
-                    rx.text(
-                        description,
-                        color=styles["color"],
-                        opacity=0.9,
-                        **TextStyles.BODY,
-                        font_size="0.9375rem",  # Tamaño ligeramente más pequeño para la descripción
-                    ),
-                    None,
-                ),
-                align_items="flex-start",
-                spacing="0",
-                width="100%",
-            ),
-            
-            # Botón de cierre
-            rx.cond(
-                is_closable,
-                rx.button(
-                    rx.icon(
-                        tag="octagon-x",  # Using x_mark instead of x
-                        size=16,
-                    ),
-                    on_click=on_close,
-                    variant="ghost",
-                    size="1",  # Using valid size value (1-4)
-                    color=styles["color"],
-                    _hover={"background": "transparent", "opacity": "0.8"},
-                    _active={"background": "transparent"},
-                    padding="0.25rem",
-                    height="auto",
-                ),
-                None,
+        content_style = {**content_style, **props.pop("style")}
+
+    if isinstance(description, rx.Var):
+        title_margin = rx.cond(description, "0.25rem", "0")
+    else:
+        title_margin = "0.25rem" if description else "0"
+
+    children = (
+        # Icono
+        _optional(show_icon, lambda: rx.icon(**variant["icon"])),
+        # Contenido
+        rx.vstack(
+            *_present(
+                _optional(title, lambda: rx.text(title, margin_bottom=title_margin, **variant["title"])),
+                _optional(description, lambda: rx.text(description, **variant["description"])),
             ),
-            
-            **content_style,
-            **props,
+            align_items="flex-start",
+            spacing="0",
+            width="100%",
         ),
-        **alert_container_style,
+        # Botón de cierre
+        _optional(is_closable, lambda: rx.button(
+            rx.icon(tag="octagon-x", size=16),
+            on_click=on_close,
+            **variant["close"],
+        )),
+    )
+    return rx.box(
+        rx.hstack(*_present(*children), **content_style, **props),
+        **_CONTAINER_STYLE,
     )
@@ -0,0 +1,103 @@
+import reflex as rx
+from ..state.contracts_state import COUNT_CAP, ContractsState, ROW_HEIGHT, SCROLL_CONTAINER_ID, VISIBLE_ROWS
+from ..styles.styles import Color
+
+# (título, clave de la fila, ancho, orden al pulsar la cabecera)
+COLUMNS = (
+    ("Referencia", "reference", "130px", "recent"),
+    ("Título", "title", "2fr", None),
+    ("Contraparte", "counterparty", "1.5fr", None),
+    ("Tipo", "contract_type", "130px", None),
+    ("Estado", "status", "110px", None),
+    ("Valor", "value", "130px", None),
+    ("Vencimiento", "end_date", "120px", "end_date"),
+)
+GRID_TEMPLATE = " ".join(width for _, _, width, _ in COLUMNS)
+
+_cell_style = {
+    "overflow": "hidden",
+    "white_space": "nowrap",
+    "text_overflow": "ellipsis",
+    "padding_x": "0.5rem",
+}
+
+
+def _header_cell(title, sort):
+    if sort is None:
+        return rx.text(title, font_weight="600", style=_cell_style)
+    return rx.text(
+        title,
+        rx.cond(ContractsState.sort == sort, " ▾", ""),
+        font_weight="600",
+        cursor="pointer",
+        color=rx.cond(ContractsState.sort == sort, Color.ACCENT, Color.CONTENT),
+        on_click=ContractsState.set_sort(sort),
+        style=_cell_style,
+    )
+
+
+def _row(contract: rx.Var):
+    return rx.grid(
+        rx.text(contract["reference"], style=_cell_style),
+        rx.text(contract["title"], style=_cell_style),
+        rx.text(contract["counterparty"], style=_cell_style),
+        rx.text(contract["contract_type"], style=_cell_style),
+        rx.box(rx.badge(contract["status"]), style=_cell_style),
+        rx.text(contract["value"], " ", contract["currency"], text_align="right", style=_cell_style),
+        rx.text(contract["end_date"], style=_cell_style),
+        grid_template_columns=GRID_TEMPLATE,
+        align_items="center",
+        height=f"{ROW_HEIGHT}px",
+        border_bottom=f"1px solid {Color.BORDER}",
+    )
+
+
+def ContractsTable():
+    """Tabla de contratos que solo pinta la ventana de filas que tiene el estado.
+
+    Un espaciador de ``total * ROW_HEIGHT`` píxeles da a la barra de scroll el
+    tamaño del resultado completo y las filas de la ventana se colocan en su
+    posición absoluta. El ``scrollTop`` se envía al estado con throttle. Como
+    ``total`` se acota a ``COUNT_CAP``, el espaciador no pasa de 8M px.
+    """
+    return rx.vstack(
+        rx.grid(
+            *[_header_cell(title, sort) for title, _, _, sort in COLUMNS],
+            grid_template_columns=GRID_TEMPLATE,
+            width="100%",
+            padding_y="0.5rem",
+            border_bottom=f"2px solid {Color.BORDER}",
+        ),
+        rx.box(
+            rx.box(
+                rx.box(
+                    rx.foreach(ContractsState.rows, _row),
+                    position="absolute",
+                    top=f"{ContractsState.window_start * ROW_HEIGHT}px",
+                    left="0",
+                    right="0",
+                ),
+                position="relative",
+                height=f"{ContractsState.total * ROW_HEIGHT}px",
+            ),
+            id=SCROLL_CONTAINER_ID,
+            height=f"{ROW_HEIGHT * VISIBLE_ROWS}px",
+            overflow_y="auto",
+            width="100%",
+            opacity=rx.cond(ContractsState.is_loading, "0.6", "1"),
+            on_scroll=ContractsState.scroll_to(
+                rx.Var(f"document.getElementById('{SCROLL_CONTAINER_ID}').scrollTop")
+            ).throttle(100),
+        ),
+        rx.text(
+            rx.cond(
+                ContractsState.total_capped,
+                f"{COUNT_CAP:,}+ contratos: refina los filtros para ver el resto".replace(",", "."),
+                rx.fragment(ContractsState.total, " contratos"),
+            ),
+            color=Color.SECONDARY_CONTENT,
+            font_size="0.875rem",
+        ),
+        spacing="0",
+        width="100%",
+    )
@@ -26,7 +26,8 @@ def UserMenu():
         align_items="center",
     )
 
-def Header():
+@rx.memo
+def pacta_header() -> rx.Component:
     return rx.box(
         rx.hstack(
             # Remove spacer to align items to the left
@@ -49,3 +50,8 @@ def Header():
         box_shadow="md",
         z_index=1000,
     )
+
+
+def Header():
+    """Cabecera: un único componente memoizado que comparten todas las páginas."""
+    return pacta_header()
@@ -5,6 +5,14 @@ from ..styles.styles import Color
 
 
 def LayoutBase(children):
+    """Marco de las páginas (barra lateral, cabecera y contenido).
+
+    ``Sidebar`` y ``Header`` son componentes memoizados que se compilan una
+    vez en el módulo de componentes compartidos; cada página solo añade el
+    contenedor de su contenido. El marco completo no puede ser un ``rx.memo``:
+    en Reflex 0.8.1 no admite ``children`` y un componente pasado como prop
+    rompe la compilación de los componentes con estado de la página.
+    """
     return rx.box(
         Sidebar(),
         Header(),
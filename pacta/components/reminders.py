@@ -0,0 +1,22 @@
+import reflex as rx
+from pacta.components.alerts import alert, AlertType
+from pacta.state.reminders_state import RemindersState
+
+
+def _reminder(reminder: rx.Var, status: str):
+    return alert(
+        title=reminder["title"],
+        description=reminder["description"],
+        status=status,
+        on_close=RemindersState.dismiss(reminder["id"]),
+    )
+
+
+def Reminders():
+    """Avisos de vencimiento del usuario (pacta.utils.reminders) con el componente ``alert``."""
+    return rx.box(
+        rx.foreach(RemindersState.urgent, lambda reminder: _reminder(reminder, AlertType.ERROR)),
+        rx.foreach(RemindersState.upcoming, lambda reminder: _reminder(reminder, AlertType.WARNING)),
+        on_mount=RemindersState.load,
+        width="100%",
+    )
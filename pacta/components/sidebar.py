@@ -2,7 +2,8 @@ import reflex as rx
 from ..styles.styles import Color
 
 
-def Sidebar():
+@rx.memo
+def pacta_sidebar() -> rx.Component:
     return rx.box(
         rx.vstack(
             rx.heading(
@@ -45,3 +46,8 @@ def Sidebar():
         z_index="1000",
         border_right=f"1px solid {Color.BORDER}"
     )
+
+
+def Sidebar():
+    """Barra lateral: un único componente memoizado que comparten todas las páginas."""
+    return pacta_sidebar()
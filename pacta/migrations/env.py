@@ -0,0 +1,66 @@
+"""Entorno de Alembic para PACTA."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from pacta.models.user import Base
+# Registrar las tablas en Base.metadata
+import pacta.models.contract  # noqa: F401
+import pacta.models.document  # noqa: F401
+import pacta.models.reminder  # noqa: F401
+import pacta.models.aggregate  # noqa: F401
+from pacta.utils.database import engine
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names):
+    # Índice de búsqueda (FTS5 y sus tablas internas) gestionado con SQL propio
+    if type_ == "table" and name.startswith("contracts_fts"):
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Generar SQL sin conexión (``alembic upgrade head --sql``)."""
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplicar migraciones usando la conexión recibida o el motor de la aplicación."""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+
+def _run(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
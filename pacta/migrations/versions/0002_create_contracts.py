@@ -0,0 +1,48 @@
+"""Crear tabla de contratos
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-08-04
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "contracts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("reference", sa.String(50), nullable=False),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("counterparty", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("contract_type", sa.String(30), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("value", sa.Numeric(14, 2)),
+        sa.Column("currency", sa.String(3), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.UniqueConstraint("reference", name="uq_contracts_reference"),
+    )
+    op.create_index("ix_contracts_status_id", "contracts", ["status", "id"])
+    op.create_index("ix_contracts_status_end_date_id", "contracts", ["status", "end_date", "id"])
+    op.create_index("ix_contracts_type_status_id", "contracts", ["contract_type", "status", "id"])
+    op.create_index("ix_contracts_owner_status_id", "contracts", ["owner_id", "status", "id"])
+    op.create_index("ix_contracts_end_date_id", "contracts", ["end_date", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_contracts_end_date_id", table_name="contracts")
+    op.drop_index("ix_contracts_owner_status_id", table_name="contracts")
+    op.drop_index("ix_contracts_type_status_id", table_name="contracts")
+    op.drop_index("ix_contracts_status_end_date_id", table_name="contracts")
+    op.drop_index("ix_contracts_status_id", table_name="contracts")
+    op.drop_table("contracts")
@@ -0,0 +1,123 @@
+"""Índice de búsqueda de texto completo de contratos
+
+SQLite: tabla virtual FTS5 ``contracts_fts`` (rowid = id del contrato).
+PostgreSQL: tabla ``contracts_fts`` con columna ``tsv`` generada e índice GIN.
+En ambos casos los triggers la mantienen al día con ``contracts``; la columna
+``documents`` la rellena el pipeline de extracción de texto.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-08-11
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE contracts_fts USING fts5(
+        reference, title, counterparty, description, documents,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER contracts_fts_ai AFTER INSERT ON contracts BEGIN
+        INSERT INTO contracts_fts (rowid, reference, title, counterparty, description)
+        VALUES (new.id, new.reference, new.title, new.counterparty, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER contracts_fts_au AFTER UPDATE OF reference, title, counterparty, description ON contracts BEGIN
+        UPDATE contracts_fts
+        SET reference = new.reference, title = new.title,
+            counterparty = new.counterparty, description = new.description
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER contracts_fts_ad AFTER DELETE ON contracts BEGIN
+        DELETE FROM contracts_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO contracts_fts (rowid, reference, title, counterparty, description)
+    SELECT id, reference, title, counterparty, description FROM contracts
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS contracts_fts_ad",
+    "DROP TRIGGER IF EXISTS contracts_fts_au",
+    "DROP TRIGGER IF EXISTS contracts_fts_ai",
+    "DROP TABLE IF EXISTS contracts_fts",
+]
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE TABLE contracts_fts (
+        contract_id integer PRIMARY KEY REFERENCES contracts (id) ON DELETE CASCADE,
+        reference text,
+        title text,
+        counterparty text,
+        description text,
+        documents text,
+        tsv tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(reference, '') || ' ' || coalesce(counterparty, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(title, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(documents, '')), 'C')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX ix_contracts_fts_tsv ON contracts_fts USING gin (tsv)",
+    """
+    CREATE FUNCTION contracts_fts_sync() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO contracts_fts (contract_id, reference, title, counterparty, description)
+        VALUES (NEW.id, NEW.reference, NEW.title, NEW.counterparty, NEW.description)
+        ON CONFLICT (contract_id) DO UPDATE
+        SET reference = EXCLUDED.reference, title = EXCLUDED.title,
+            counterparty = EXCLUDED.counterparty, description = EXCLUDED.description;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER contracts_fts_sync
+    AFTER INSERT OR UPDATE OF reference, title, counterparty, description ON contracts
+    FOR EACH ROW EXECUTE FUNCTION contracts_fts_sync()
+    """,
+    """
+    INSERT INTO contracts_fts (contract_id, reference, title, counterparty, description)
+    SELECT id, reference, title, counterparty, description FROM contracts
+    """,
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS contracts_fts_sync ON contracts",
+    "DROP FUNCTION IF EXISTS contracts_fts_sync()",
+    "DROP TABLE IF EXISTS contracts_fts",
+]
+
+
+def _statements(upgrade: bool):
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        return SQLITE_UPGRADE if upgrade else SQLITE_DOWNGRADE
+    if dialect == "postgresql":
+        return POSTGRES_UPGRADE if upgrade else POSTGRES_DOWNGRADE
+    # Otros motores: la búsqueda recurre a LIKE (ver pacta.utils.search)
+    return []
+
+
+def upgrade():
+    for statement in _statements(True):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in _statements(False):
+        op.execute(statement)
@@ -0,0 +1,34 @@
+"""Crear tabla de documentos de contratos
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-08-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("contract_id", sa.Integer(), sa.ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("content_type", sa.String(100), nullable=False),
+        sa.Column("uploaded_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("contract_id", "sha256", name="uq_documents_contract_sha256"),
+    )
+    op.create_index("ix_documents_sha256", "documents", ["sha256"])
+
+
+def downgrade():
+    op.drop_index("ix_documents_sha256", table_name="documents")
+    op.drop_table("documents")
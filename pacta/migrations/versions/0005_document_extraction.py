@@ -0,0 +1,39 @@
+"""Estado de la extracción de texto de documentos
+
+Las columnas ``extraction_*`` son la cola persistente del pipeline de
+extracción: ``pending`` -> ``processing`` -> ``done`` / ``failed`` /
+``unsupported``.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-08-25
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("extraction_status", sa.String(20), nullable=False, server_default="pending"))
+        batch.add_column(sa.Column("extraction_attempts", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("extraction_claimed_at", sa.DateTime(timezone=True)))
+        batch.add_column(sa.Column("extraction_error", sa.String(500)))
+        batch.add_column(sa.Column("extracted_text", sa.Text()))
+        batch.add_column(sa.Column("extracted_at", sa.DateTime(timezone=True)))
+    op.create_index("ix_documents_extraction_status_id", "documents", ["extraction_status", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_documents_extraction_status_id", table_name="documents")
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_column("extracted_at")
+        batch.drop_column("extracted_text")
+        batch.drop_column("extraction_error")
+        batch.drop_column("extraction_claimed_at")
+        batch.drop_column("extraction_attempts")
+        batch.drop_column("extraction_status")
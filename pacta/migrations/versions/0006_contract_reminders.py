@@ -0,0 +1,43 @@
+"""Avisos de vencimiento de contratos
+
+Tabla ``contract_reminders`` (avisos disparados, reclamados por restricción
+única) e índice sobre ``contracts.updated_at`` para que el planificador lea
+solo los contratos modificados desde su última sincronización.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-09-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "contract_reminders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("contract_id", sa.Integer(), sa.ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("kind", sa.String(10), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("emailed_at", sa.DateTime(timezone=True)),
+        sa.Column("dismissed_at", sa.DateTime(timezone=True)),
+        sa.UniqueConstraint("contract_id", "kind", "end_date", name="uq_contract_reminders_claim"),
+    )
+    op.create_index("ix_contract_reminders_owner_open", "contract_reminders", ["owner_id", "dismissed_at", "id"])
+    op.create_index("ix_contract_reminders_end_date", "contract_reminders", ["end_date"])
+    op.create_index("ix_contracts_updated_at", "contracts", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_contracts_updated_at", table_name="contracts")
+    op.drop_index("ix_contract_reminders_end_date", table_name="contract_reminders")
+    op.drop_index("ix_contract_reminders_owner_open", table_name="contract_reminders")
+    op.drop_table("contract_reminders")
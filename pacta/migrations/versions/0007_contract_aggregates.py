@@ -0,0 +1,35 @@
+"""Agregados de contratos para la página de estadísticas
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-09-08
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "contract_aggregates",
+        sa.Column("dimension", sa.String(20), primary_key=True),
+        sa.Column("key", sa.String(200), primary_key=True),
+        sa.Column("currency", sa.String(3), primary_key=True),
+        sa.Column("contracts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("value_cents", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_contract_aggregates_dimension_contracts", "contract_aggregates", ["dimension", "contracts"]
+    )
+    # Calcular los agregados de los contratos existentes
+    from pacta.utils.statistics import rebuild
+    rebuild(op.get_bind())
+
+
+def downgrade():
+    op.drop_index("ix_contract_aggregates_dimension_contracts", table_name="contract_aggregates")
+    op.drop_table("contract_aggregates")
@@ -0,0 +1,36 @@
+"""Índices del listado de contratos para el resto de combinaciones
+
+Tipo o propietario sin estado (ordenados por id) y todas las combinaciones de
+filtros ordenadas por ``end_date``: sin ellos la consulta recorría el índice
+del filtro y ordenaba en una tabla temporal, y el cursor dejaba de ser un
+rango.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-09-15
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_contracts_type_id": ["contract_type", "id"],
+    "ix_contracts_type_end_date_id": ["contract_type", "end_date", "id"],
+    "ix_contracts_type_status_end_date_id": ["contract_type", "status", "end_date", "id"],
+    "ix_contracts_owner_id": ["owner_id", "id"],
+    "ix_contracts_owner_end_date_id": ["owner_id", "end_date", "id"],
+    "ix_contracts_owner_status_end_date_id": ["owner_id", "status", "end_date", "id"],
+}
+
+
+def upgrade():
+    for name, columns in INDEXES.items():
+        op.create_index(name, "contracts", columns)
+
+
+def downgrade():
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name="contracts")
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, Index, Integer, String
+
+from pacta.models.user import Base
+
+
+class ContractAggregateModel(Base):
+    """Recuentos e importes de contratos por dimensión (página /estadisticas).
+
+    Una fila por (dimensión, clave, moneda); la mantiene
+    ``pacta.utils.statistics`` en la misma transacción que los cambios de
+    contratos. Los importes se guardan en céntimos para que las sumas sean
+    exactas en cualquier motor.
+    """
+    __tablename__ = "contract_aggregates"
+
+    # status, type, counterparty, start_month, end_month o total
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(200), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    contracts = Column(Integer, nullable=False, default=0)
+    value_cents = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        # Las N contrapartes con más contratos sin ordenar toda la dimensión
+        Index("ix_contract_aggregates_dimension_contracts", "dimension", "contracts"),
+    )
@@ -0,0 +1,102 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+from decimal import Decimal
+
+from pacta.models.user import Base
+
+
+class ContractStatus:
+    DRAFT = "borrador"
+    ACTIVE = "vigente"
+    EXPIRED = "vencido"
+    TERMINATED = "rescindido"
+
+    ALL = (DRAFT, ACTIVE, EXPIRED, TERMINATED)
+
+
+class ContractType:
+    SERVICES = "servicios"
+    SALE = "compraventa"
+    LEASE = "arrendamiento"
+    EMPLOYMENT = "laboral"
+    NDA = "confidencialidad"
+    OTHER = "otro"
+
+    ALL = (SERVICES, SALE, LEASE, EMPLOYMENT, NDA, OTHER)
+
+
+class ContractModel(Base):
+    """Modelo SQLAlchemy para la tabla de contratos."""
+    __tablename__ = "contracts"
+
+    id = Column(Integer, primary_key=True)
+    reference = Column(String(50), nullable=False)
+    title = Column(String(200), nullable=False)
+    counterparty = Column(String(200), nullable=False)
+    description = Column(Text)
+    contract_type = Column(String(30), nullable=False, default=ContractType.OTHER)
+    status = Column(String(20), nullable=False, default=ContractStatus.DRAFT)
+    value = Column(Numeric(14, 2))
+    currency = Column(String(3), nullable=False, default="EUR")
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Un índice por combinación de filtros del listado y orden (id o
+    # end_date); todos terminan en la columna de orden + id para que la
+    # paginación por cursor sea un rango. Tipo y propietario a la vez usan el
+    # índice de uno de los dos y filtran el otro sobre él.
+    __table_args__ = (
+        UniqueConstraint("reference", name="uq_contracts_reference"),
+        Index("ix_contracts_status_id", "status", "id"),
+        Index("ix_contracts_status_end_date_id", "status", "end_date", "id"),
+        Index("ix_contracts_type_id", "contract_type", "id"),
+        Index("ix_contracts_type_end_date_id", "contract_type", "end_date", "id"),
+        Index("ix_contracts_type_status_id", "contract_type", "status", "id"),
+        Index("ix_contracts_type_status_end_date_id", "contract_type", "status", "end_date", "id"),
+        Index("ix_contracts_owner_id", "owner_id", "id"),
+        Index("ix_contracts_owner_end_date_id", "owner_id", "end_date", "id"),
+        Index("ix_contracts_owner_status_id", "owner_id", "status", "id"),
+        Index("ix_contracts_owner_status_end_date_id", "owner_id", "status", "end_date", "id"),
+        Index("ix_contracts_end_date_id", "end_date", "id"),
+        # Sincronización incremental del planificador de avisos
+        Index("ix_contracts_updated_at", "updated_at"),
+    )
+
+
+class ContractCreate(BaseModel):
+    """Modelo Pydantic para crear contratos."""
+    reference: str
+    title: str
+    counterparty: str
+    description: Optional[str] = None
+    contract_type: str = ContractType.OTHER
+    status: str = ContractStatus.DRAFT
+    value: Optional[Decimal] = None
+    currency: str = "EUR"
+    start_date: date
+    end_date: date
+    owner_id: int
+
+
+class Contract(BaseModel):
+    """Modelo Pydantic para contratos."""
+    id: int
+    reference: str
+    title: str
+    counterparty: str
+    contract_type: str
+    status: str
+    value: Optional[float]
+    currency: str
+    start_date: date
+    end_date: date
+    owner_id: int
+
+    class Config:
+        from_attributes = True
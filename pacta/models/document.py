@@ -0,0 +1,62 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from pydantic import BaseModel
+from typing import Optional
+
+from pacta.models.user import Base
+
+
+class ExtractionStatus:
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    UNSUPPORTED = "unsupported"
+
+
+class DocumentModel(Base):
+    """Documento adjunto a un contrato.
+
+    El contenido se guarda una sola vez por hash en ``DocumentStore``; varias
+    filas (de distintos contratos) pueden apuntar al mismo ``sha256``.
+    """
+    __tablename__ = "documents"
+
+    id = Column(Integer, primary_key=True)
+    contract_id = Column(Integer, ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(100), nullable=False)
+    uploaded_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Cola persistente de extracción de texto (ver pacta.utils.extraction)
+    extraction_status = Column(String(20), nullable=False, default=ExtractionStatus.PENDING,
+                               server_default=ExtractionStatus.PENDING)
+    extraction_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    extraction_claimed_at = Column(DateTime(timezone=True))
+    extraction_error = Column(String(500))
+    extracted_text = Column(Text)
+    extracted_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        UniqueConstraint("contract_id", "sha256", name="uq_documents_contract_sha256"),
+        Index("ix_documents_sha256", "sha256"),
+        Index("ix_documents_extraction_status_id", "extraction_status", "id"),
+    )
+
+
+class Document(BaseModel):
+    """Modelo Pydantic para documentos."""
+    id: int
+    contract_id: int
+    sha256: str
+    size: int
+    filename: str
+    content_type: str
+    uploaded_by: Optional[int]
+    extraction_status: str = ExtractionStatus.PENDING
+
+    class Config:
+        from_attributes = True
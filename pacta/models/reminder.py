@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from pacta.models.user import Base
+
+
+class ReminderModel(Base):
+    """Aviso de vencimiento de un contrato ya disparado.
+
+    La restricción única sobre (contrato, tipo, fecha de fin) es el mecanismo
+    de reclamación entre workers: solo el ``INSERT`` que gana la carrera
+    dispara el aviso. Si cambia la fecha de fin, los avisos de la fecha nueva
+    son filas distintas.
+    """
+    __tablename__ = "contract_reminders"
+
+    id = Column(Integer, primary_key=True)
+    contract_id = Column(Integer, ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Días de antelación: "30d", "7d", "1d", "0d"
+    kind = Column(String(10), nullable=False)
+    end_date = Column(Date, nullable=False)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    emailed_at = Column(DateTime(timezone=True))
+    dismissed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        UniqueConstraint("contract_id", "kind", "end_date", name="uq_contract_reminders_claim"),
+        Index("ix_contract_reminders_owner_open", "owner_id", "dismissed_at", "id"),
+        Index("ix_contract_reminders_end_date", "end_date"),
+    )
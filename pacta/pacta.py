@@ -2,11 +2,16 @@ import reflex as rx
 from .state.auth_state import AuthState
 from .pages.login import login
 from .pages.dashboard import dashboard as dashboard_page
+from .pages.contracts import contracts as contracts_page
+from .pages.statistics import statistics as statistics_page
+from .state.contracts_state import ContractsState
+from .state.statistics_state import StatisticsState
 from .utils.database import init_db
+from .utils.extraction import extraction_pipeline
+from .utils.metrics import instrument_states
+from .utils.reminders import reminder_scheduler
 from .styles.styles import global_styles, Color
-
-# Inicializar la base de datos al iniciar la aplicación
-init_db()
+from .api import api
 
 # Configurar las rutas de la aplicación
 def index():
@@ -23,6 +28,20 @@ def dashboard():
         login()
     )
 
+def contracts():
+    return rx.cond(
+        AuthState.is_authenticated,
+        contracts_page(),
+        login()
+    )
+
+def statistics():
+    return rx.cond(
+        AuthState.is_authenticated,
+        statistics_page(),
+        login()
+    )
+
 # Crear la aplicación
 app = rx.App(
     style=global_styles,
@@ -34,10 +53,34 @@ app = rx.App(
         has_background=True,
         radius="medium",
         accent_color="blue",
-    )
+    ),
+    # Rutas adicionales del backend (/metrics)
+    api_transformer=api,
 )
 
 # Añadir páginas con autenticación requerida para las rutas protegidas
-app.add_page(index, route="/", title="PACTA - Login")
-app.add_page(login, route="/login", title="PACTA - Login")
-app.add_page(dashboard, route="/dashboard", title="PACTA - Dashboard")
+# Todas las páginas restauran la sesión desde la cookie auth_token al cargar
+app.add_page(index, route="/", title="PACTA - Login", on_load=AuthState.load_token)
+app.add_page(login, route="/login", title="PACTA - Login", on_load=AuthState.load_token)
+app.add_page(dashboard, route="/dashboard", title="PACTA - Dashboard", on_load=AuthState.load_token)
+app.add_page(
+    contracts, route="/contratos", title="PACTA - Contratos",
+    on_load=[AuthState.load_token, ContractsState.load],
+)
+app.add_page(
+    statistics, route="/estadisticas", title="PACTA - Estadísticas",
+    on_load=[AuthState.load_token, StatisticsState.load],
+)
+
+# Esquema de la base de datos al arrancar el backend, no al importar: compilar
+# el frontend, la CLI o un import en tests no tocan la base de datos. Es
+# síncrona, así que termina antes de que empiecen las demás lifespan tasks y
+# de servir la primera petición.
+app.register_lifespan_task(init_db)
+# Extracción de texto de documentos en segundo plano (ver utils/extraction.py)
+app.register_lifespan_task(extraction_pipeline.run)
+# Avisos de vencimiento de contratos (ver utils/reminders.py)
+app.register_lifespan_task(reminder_scheduler.run)
+
+# Métricas por event handler de todos los estados (expuestas en /metrics)
+instrument_states()
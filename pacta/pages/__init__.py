@@ -3,8 +3,12 @@ Pages package for the PACTA application.
 """
 from .login import login
 from .dashboard import dashboard
+from .contracts import contracts
+from .statistics import statistics
 
 __all__ = [
     "login",
     "dashboard",
+    "contracts",
+    "statistics",
 ]
\ No newline at end of file
@@ -0,0 +1,103 @@
+import reflex as rx
+from pacta.state.contracts_state import ContractsState
+from pacta.state.extraction_state import ExtractionState
+from pacta.components.layout_base import LayoutBase
+from pacta.components.alerts import alert, AlertType
+from pacta.components.contracts_table import ContractsTable
+from pacta.components.reminders import Reminders
+from pacta.models.contract import ContractStatus, ContractType
+from pacta.styles.styles import Color
+
+
+def _filters():
+    return rx.hstack(
+        rx.select(
+            ["todos", *ContractStatus.ALL],
+            placeholder="Estado",
+            on_change=ContractsState.set_status_filter,
+        ),
+        rx.select(
+            ["todos", *ContractType.ALL],
+            placeholder="Tipo",
+            on_change=ContractsState.set_type_filter,
+        ),
+        rx.checkbox(
+            "Solo mis contratos",
+            checked=ContractsState.only_mine,
+            on_change=ContractsState.set_only_mine,
+        ),
+        spacing="3",
+        align="center",
+        wrap="wrap",
+    )
+
+
+def _search_result(result: rx.Var):
+    return rx.box(
+        rx.hstack(
+            rx.text(result["reference"], font_weight="600", color=Color.ACCENT),
+            rx.text(result["title"], color=Color.CONTENT),
+            rx.text(result["counterparty"], color=Color.SECONDARY_CONTENT),
+            spacing="3",
+        ),
+        # Fragmento ya escapado en pacta.utils.search.highlight
+        rx.html(result["snippet"], font_size="0.875rem", color=Color.SECONDARY_CONTENT),
+        padding_y="0.5rem",
+        border_bottom=f"1px solid {Color.BORDER}",
+        width="100%",
+    )
+
+
+def _search():
+    return rx.vstack(
+        rx.input(
+            placeholder="Buscar por referencia, contraparte o texto del contrato…",
+            on_change=ContractsState.set_search_query.debounce(250),
+            width="100%",
+        ),
+        rx.cond(
+            ContractsState.search_results,
+            rx.box(rx.foreach(ContractsState.search_results, _search_result), width="100%"),
+        ),
+        spacing="2",
+        width="100%",
+    )
+
+
+def _extraction_progress():
+    return rx.box(
+        rx.cond(
+            ExtractionState.backlog > 0,
+            rx.text(
+                "Extrayendo texto de ", ExtractionState.backlog, " documentos (",
+                ExtractionState.rate, " por segundo); aún no aparecen en la búsqueda.",
+                font_size="0.875rem",
+                color=Color.SECONDARY_CONTENT,
+            ),
+        ),
+        on_mount=ExtractionState.watch,
+        on_unmount=ExtractionState.stop,
+    )
+
+
+def contracts():
+    return LayoutBase(
+        rx.vstack(
+            rx.heading("Contratos", size="6", color=Color.PRIMARY_CONTENT),
+            Reminders(),
+            _search(),
+            _extraction_progress(),
+            _filters(),
+            rx.cond(
+                ContractsState.error,
+                alert(description=ContractsState.error, status=AlertType.ERROR, is_closable=False),
+            ),
+            ContractsTable(),
+            spacing="4",
+            width="100%",
+            padding="1.5rem",
+            background_color=Color.WHITE,
+            border_radius="0.5rem",
+            box_shadow="0 1px 3px rgba(0,0,0,0.1)",
+        )
+    )
@@ -1,7 +1,81 @@
 import reflex as rx
 from pacta.state.auth_state import AuthState
+from pacta.state.dashboard_state import DashboardState
 from pacta.components.layout_base import LayoutBase
+from pacta.components.reminders import Reminders
+from pacta.components.alerts import alert, AlertType
 from pacta.styles.styles import Color
+from pacta.utils.dashboard import DASHBOARD_EXPIRING_DAYS
+
+
+def _contract(item: rx.Var):
+    return rx.hstack(
+        rx.text(item["reference"], " · ", item["title"], color=Color.CONTENT,
+                overflow="hidden", text_overflow="ellipsis", white_space="nowrap"),
+        rx.spacer(),
+        rx.text(item["date"], color=Color.SECONDARY_CONTENT, white_space="nowrap"),
+        width="100%",
+        padding_y="0.25rem",
+        border_bottom=f"1px solid {Color.BORDER}",
+    )
+
+
+def _total(item: rx.Var):
+    return rx.hstack(
+        rx.text(item["key"], color=Color.CONTENT),
+        rx.spacer(),
+        rx.text(item["contracts"]),
+        rx.text(item["value"], " ", item["currency"], color=Color.SECONDARY_CONTENT),
+        width="100%",
+        padding_y="0.25rem",
+        border_bottom=f"1px solid {Color.BORDER}",
+    )
+
+
+def _widget(title: str, loaded, *children):
+    """Tarjeta de un widget: su skeleton hasta que llegan sus datos."""
+    return rx.skeleton(
+        rx.vstack(
+            rx.heading(title, size="3", color=Color.PRIMARY_CONTENT),
+            *children,
+            spacing="2",
+            padding="1rem",
+            border=f"1px solid {Color.BORDER}",
+            border_radius="0.5rem",
+            width="100%",
+            min_height="10rem",
+        ),
+        loading=~loaded,
+    )
+
+
+def _widgets():
+    return rx.grid(
+        _widget(
+            "Próximos vencimientos",
+            DashboardState.expiring_loaded,
+            rx.text(DashboardState.expiring_count, f" contratos vigentes vencen en {DASHBOARD_EXPIRING_DAYS} días",
+                    color=Color.SECONDARY_CONTENT),
+            rx.foreach(DashboardState.expiring, _contract),
+        ),
+        _widget(
+            "Pendientes",
+            DashboardState.pending_loaded,
+            rx.text(DashboardState.draft_count, " borradores por aprobar · ",
+                    DashboardState.reminder_count, " avisos sin revisar", color=Color.SECONDARY_CONTENT),
+            rx.foreach(DashboardState.drafts, _contract),
+        ),
+        _widget(
+            "Mis contratos",
+            DashboardState.totals_loaded,
+            rx.foreach(DashboardState.totals, _total),
+        ),
+        columns=rx.breakpoints(initial="1", md="3"),
+        spacing="4",
+        width="100%",
+        on_mount=DashboardState.load,
+    )
+
 
 def dashboard():
     return LayoutBase(
@@ -24,16 +98,18 @@ def dashboard():
                     _hover={"background_color": "#E63946"},
                 ),
                 rx.divider(border_color=Color.BORDER),
+                Reminders(),
                 rx.heading(
                     "Panel de Control", 
                     size="1",
                     color=Color.PRIMARY_CONTENT,
                     margin_bottom="1rem"
                 ),
-                rx.text(
-                    "Esta es tu página de dashboard. Aquí podrás gestionar tus datos de PACTA.",
-                    color=Color.SECONDARY_CONTENT
+                rx.cond(
+                    DashboardState.error,
+                    alert(description=DashboardState.error, status=AlertType.ERROR, is_closable=False),
                 ),
+                _widgets(),
                 spacing="4",
                 padding="2rem",
             ),
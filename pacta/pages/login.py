@@ -135,9 +135,6 @@ def login():
                             margin_top="1rem",
                         ),
                         rx.box(
-                            position="relative",
-                            width="100%",
-                        )[
                             rx.hstack(
                                 rx.icon(tag="lock", color=Color.ACCENT, size=20),
                                 rx.input(
@@ -171,7 +168,9 @@ def login():
                                 _hover={"border_color": Color.ACCENT_LIGHT},
                                 align_items="center",
                             ),
-                        ],
+                            position="relative",
+                            width="100%",
+                        ),
                         spacing="1",
                         width="100%",
                         align_items="start",
@@ -187,8 +186,7 @@ def login():
                             margin_left="0.5rem",
                         ),
                         on_change=AuthState.set_remember_me,
-                        size="md",
-                        color_scheme=Color.ACCENT[1:],  # Elimina el # del color
+                        size="2",
                         _hover={"border_color": Color.ACCENT},
                         margin_top="0.5rem",
                         border_color=Color.BORDER,
@@ -198,18 +196,14 @@ def login():
                     rx.button(
                         rx.cond(
                             AuthState.is_loading,
-                            rx.spinner(color="white", size="sm"),
+                            rx.spinner(color="white", size="1"),
                             "Iniciar sesión",
                         ),
                         type_="submit",
                         width="100%",
-                        size="lg",
-                        is_loading=AuthState.is_loading,
-                        is_disabled=rx.cond(
-                            (AuthState.username == "") | (AuthState.password == ""),
-                            True,
-                            False,
-                        ),
+                        size="3",
+                        loading=AuthState.is_loading,
+                        disabled=(AuthState.username == "") | (AuthState.password == ""),
                         background=Color.ACCENT,
                         color=Color.WHITE,
                         _hover={
@@ -227,6 +221,9 @@ def login():
                         font_family=Font.PRIMARY,
                     ),
                     
+                    # Token CSRF: handle_submit lo pasa a login como csrf_token
+                    rx.el.input(type="hidden", name="csrf_token", value=AuthState.csrf_token),
+
                     # Redirect is handled by the handle_submit method
                     rx.cond(
                         AuthState.is_authenticated,
@@ -238,7 +235,7 @@ def login():
                     width="100%",
                 ),
                 on_submit=AuthState.handle_submit,
-                width="100%",
+                on_mount=AuthState.issue_csrf_token,
                 **login_container_style,
             ),
             
@@ -0,0 +1,75 @@
+import reflex as rx
+from pacta.state.statistics_state import StatisticsState
+from pacta.components.layout_base import LayoutBase
+from pacta.components.alerts import alert, AlertType
+from pacta.styles.styles import Color
+
+
+def _row(item: rx.Var):
+    return rx.grid(
+        rx.text(item["key"], color=Color.CONTENT, overflow="hidden", text_overflow="ellipsis", white_space="nowrap"),
+        rx.text(item["contracts"], text_align="right"),
+        rx.text(item["value"], " ", item["currency"], text_align="right", color=Color.SECONDARY_CONTENT),
+        grid_template_columns="2fr 1fr 1.5fr",
+        gap="0.5rem",
+        padding_y="0.25rem",
+        border_bottom=f"1px solid {Color.BORDER}",
+        width="100%",
+    )
+
+
+def _cohort_row(item: rx.Var):
+    return rx.grid(
+        rx.text(item["key"], color=Color.CONTENT),
+        rx.text(item["renewed"], " / ", item["ended"], text_align="right"),
+        rx.text(item["rate"], text_align="right", color=Color.SECONDARY_CONTENT),
+        grid_template_columns="2fr 1fr 1.5fr",
+        gap="0.5rem",
+        padding_y="0.25rem",
+        border_bottom=f"1px solid {Color.BORDER}",
+        width="100%",
+    )
+
+
+def _card(title: str, items, row=_row):
+    return rx.vstack(
+        rx.heading(title, size="3", color=Color.PRIMARY_CONTENT),
+        rx.foreach(items, row),
+        spacing="1",
+        padding="1rem",
+        border=f"1px solid {Color.BORDER}",
+        border_radius="0.5rem",
+        width="100%",
+    )
+
+
+def statistics():
+    return LayoutBase(
+        rx.vstack(
+            rx.heading("Estadísticas", size="6", color=Color.PRIMARY_CONTENT),
+            rx.cond(
+                StatisticsState.error,
+                alert(description=StatisticsState.error, status=AlertType.ERROR, is_closable=False),
+            ),
+            rx.grid(
+                _card("Total", StatisticsState.totals),
+                _card("Por estado", StatisticsState.by_status),
+                _card("Por tipo", StatisticsState.by_type),
+                _card("Principales contrapartes", StatisticsState.top_counterparties),
+                _card("Firmados por mes", StatisticsState.started_by_month),
+                _card("Vencimientos por mes", StatisticsState.expiring_by_month),
+                _card("Valor a vencimiento por trimestre", StatisticsState.value_at_expiry),
+                _card("Renovaciones por trimestre de vencimiento", StatisticsState.renewal_cohorts, row=_cohort_row),
+                _card("Exposición vigente por contraparte", StatisticsState.exposure),
+                columns=rx.breakpoints(initial="1", md="2"),
+                spacing="4",
+                width="100%",
+            ),
+            spacing="4",
+            width="100%",
+            padding="1.5rem",
+            background_color=Color.WHITE,
+            border_radius="0.5rem",
+            box_shadow="0 1px 3px rgba(0,0,0,0.1)",
+        )
+    )
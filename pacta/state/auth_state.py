@@ -1,80 +1,34 @@
+import os
 from typing import Optional
 import reflex as rx
 from reflex import State
 from pacta.models.user import User, UserModel, UserCreate
-from pacta.utils.database import get_db, init_db
+from pacta.utils.database import run_db
+from pacta.utils.passwords import PasswordHasherBusy, dummy_password_hash, hash_password, verify_password
+from pacta.utils.rate_limit import create_rate_limiter, rate_limit
+from pacta.utils.csrf import csrf, csrf_protect
+from pacta.utils.tokens import create_access_token, decode_token, revoke_token
+from pacta.utils.user_cache import cached_user, get_user, invalidate_user
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-import bcrypt
-from datetime import datetime, timedelta
-import jwt
-from jwt import PyJWTError
+from datetime import timedelta
 from passlib.context import CryptContext
-from functools import wraps
-import time
-import os
-import secrets
 
 # Security Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 hora
-CSRF_TOKEN_EXPIRE_HOURS = 24  # 24 horas
-LOGIN_ATTEMPT_LIMIT = 5  # Número máximo de intentos de inicio de sesión
+LOGIN_ATTEMPT_LIMIT = int(os.getenv("LOGIN_ATTEMPT_LIMIT", "5"))  # Número máximo de intentos de inicio de sesión
 LOGIN_ATTEMPT_WINDOW = 900  # 15 minutos en segundos
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Almacenamiento en memoria para rate limiting
-login_attempts = {}
-csrf_tokens = set()
+# Rate limiting de login/registro (memoria o Redis según RATE_LIMIT_BACKEND)
+login_limiter = create_rate_limiter(LOGIN_ATTEMPT_LIMIT, LOGIN_ATTEMPT_WINDOW)
 
-def csrf_protect(fn):
-    """Decorator for CSRF protection on state handlers."""
-    @wraps(fn)
-    async def wrapper(self, *args, **kwargs):
-        # Skip CSRF check for GET requests
-        if self.router.method == "GET":
-            return await fn(self, *args, **kwargs)
-            
-        # Get CSRF token from headers
-        csrf_token = self.router.headers.get("X-CSRF-Token")
-        if not csrf_token or csrf_token not in csrf_tokens:
-            self.error = "Invalid or missing CSRF token"
-            return
-            
-        # Remove used token (one-time use)
-        csrf_tokens.discard(csrf_token)
-        return await fn(self, *args, **kwargs)
-    return wrapper
-
-def rate_limit(fn):
-    """Decorator for rate limiting."""
-    @wraps(fn)
-    async def wrapper(self, *args, **kwargs):
-        # Get client IP
-        client_ip = self.router.client_ip
-        
-        # Clean up old attempts
-        current_time = time.time()
-        if client_ip in login_attempts:
-            login_attempts[client_ip] = [
-                attempt_time for attempt_time in login_attempts[client_ip]
-                if current_time - attempt_time < LOGIN_ATTEMPT_WINDOW
-            ]
-        
-        # Check if rate limit exceeded
-        if len(login_attempts.get(client_ip, [])) >= LOGIN_ATTEMPT_LIMIT:
-            self.error = "Too many login attempts. Please try again later."
-            return
-            
-        # Record this attempt
-        if client_ip not in login_attempts:
-            login_attempts[client_ip] = []
-        login_attempts[client_ip].append(current_time)
-        
-        return await fn(self, *args, **kwargs)
-    return wrapper
+def _add_user(db: Session, user: UserModel) -> UserModel:
+    db.add(user)
+    db.flush()
+    db.refresh(user)
+    return user
 
 class AuthState(State):
     username: str = ""
@@ -88,30 +42,41 @@ class AuthState(State):
     token: Optional[str] = None
     show_password: bool = False
     redirect_to: str = ""  # New state variable to handle redirects
+    # Token CSRF vigente; el formulario lo devuelve en un campo oculto
+    csrf_token: str = ""
+    # Cookie del navegador con el token de acceso. Reflex la sincroniza desde
+    # el cliente, así que no puede ser HttpOnly.
+    auth_token: str = rx.Cookie(
+        "",
+        name="auth_token",
+        path="/",
+        max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        secure=False,  # Cambiar a True en producción con HTTPS
+        same_site="lax",
+    )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        init_db()
-        self.load_token()
-
-    def load_token(self):
-        """Cargar el token desde las cookies."""
+    async def load_token(self):
+        """Restaurar la sesión desde la cookie (on_load de las páginas)."""
+        if self.is_authenticated:
+            return
         try:
-            # In Reflex, cookies are available in the request object
-            request = self.get_request()
-            if not request:
-                return
-                
-            token = request.cookies.get("auth_token")
+            token = self.auth_token
             if token and token != "":
-                try:
-                    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+                # Claims cacheados por digest del token; None si es inválido o revocado
+                payload = await decode_token(token)
+                if payload:
                     self.username = payload.get("sub")
                     self.is_authenticated = True
                     self.remember_me = True
                     self.token = token
-                except PyJWTError:
+                    # Datos del usuario solo si ya están en caché (sin consulta)
+                    cached = cached_user(self.username)
+                    if cached:
+                        self.user = cached.to_user()
+                else:
+                    # Caducado o revocado: borrar también la cookie
                     self.clear_auth_state()
+                    self.auth_token = ""
         except Exception as e:
             print(f"Error loading token: {e}")
             self.clear_auth_state()
@@ -122,36 +87,22 @@ class AuthState(State):
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         """Crear un token de acceso."""
-        to_encode = data.copy()
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(minutes=15)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        return encoded_jwt
+        return create_access_token(data, expires_delta)
         
-    def generate_csrf_token(self) -> str:
-        """Generate a CSRF token and store it."""
-        token = secrets.token_urlsafe(32)
-        csrf_tokens.add(token)
-        # Schedule token expiration
-        rx.call_later(
-            CSRF_TOKEN_EXPIRE_HOURS * 3600,
-            lambda: csrf_tokens.discard(token)
-        )
-        return token
+    def issue_csrf_token(self):
+        """Emitir un token CSRF ligado a la sesión del cliente (on_mount del formulario)."""
+        self.csrf_token = csrf.issue(self.router.session.client_token)
 
-    def handle_submit(self, form_data: dict):
+    async def handle_submit(self, form_data: dict):
         """Handle form submission."""
         # Call login and handle the result
-        login_result = self.login()
+        login_result = await self.login(csrf_token=form_data.get("csrf_token"))
         if login_result:  # If login was successful
             self.is_authenticated = True
             # The UI will handle the redirect based on is_authenticated
 
     @csrf_protect
-    @rate_limit
+    @rate_limit(login_limiter, key=("ip", "username"))
     async def login(self):
         """Handle user login.
         Returns:
@@ -161,37 +112,23 @@ class AuthState(State):
         self.error = None
         
         try:
-            db = next(get_db())
-            user = db.query(UserModel).filter(UserModel.username == self.username).first()
+            user = await get_user(self.username)
+            # Con usuario inexistente se verifica contra un hash de relleno
+            # para que el tiempo de respuesta no revele qué usernames existen
+            password_hash = user.password_hash if user else await dummy_password_hash()
+            password_ok = await verify_password(self.password, password_hash)
             
-            if user and bcrypt.checkpw(self.password.encode('utf-8'), user.password_hash.encode('utf-8')):
+            if user and user.is_active and password_ok:
                 # Set user info (don't set is_authenticated here, let handle_submit do it)
-                self.user = User(
-                    id=user.id,
-                    username=user.username,
-                    email=user.email,
-                    is_active=user.is_active,
-                    created_at=user.created_at.isoformat() if user.created_at else None,
-                    updated_at=user.updated_at.isoformat() if user.updated_at else None
-                )
+                self.user = user.to_user()
                 
                 # Crear token
                 expire = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
                 token = self.create_access_token(data={"sub": self.username}, expires_delta=expire)
                 self.token = token
                 
-                # Guardar token en cookies usando la respuesta
-                response = self.get_response()
-                if response:
-                    response.set_cookie(
-                        key="auth_token",
-                        value=token,
-                        max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                        path="/",
-                        secure=False,  # Cambiar a True en producción con HTTPS
-                        httponly=True,
-                        samesite="lax"
-                    )
+                # Guardar token en la cookie
+                self.auth_token = token
                 
                 # Limpiar la contraseña después de un inicio de sesión exitoso
                 self.password = ""
@@ -203,6 +140,9 @@ class AuthState(State):
                 self.error = "Usuario o contraseña incorrectos"
                 return False
                 
+        except PasswordHasherBusy as e:
+            self.error = str(e)
+            return False
         except Exception as e:
             self.error = f"Error al iniciar sesión: {str(e)}"
             return ""
@@ -212,14 +152,13 @@ class AuthState(State):
 # Focus management should be handled by UI components
 
     @csrf_protect
-    @rate_limit
+    @rate_limit(login_limiter, key="ip")
     async def register(self):
         """Handle user registration."""
         self.is_loading = True
         self.error = None
         
         try:
-            db = next(get_db())
             user_data = UserCreate(
                 username=self.username,
                 email=self.email,
@@ -227,17 +166,16 @@ class AuthState(State):
             )
             
             # Hash the password
-            password_hash = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt())
+            password_hash = await hash_password(user_data.password)
             
             new_user = UserModel(
                 username=user_data.username,
                 email=user_data.email,
-                password_hash=password_hash.decode('utf-8')
+                password_hash=password_hash
             )
             
-            db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            new_user = await run_db(_add_user, new_user)
+            invalidate_user(username=new_user.username)
             
             self.is_authenticated = True
             self.user = User.from_orm(new_user)
@@ -247,20 +185,12 @@ class AuthState(State):
             token = self.create_access_token(data={"sub": self.username}, expires_delta=expire)
             self.token = token
             
-            # Guardar token en cookies usando la respuesta
-            response = self.get_response()
-            if response:
-                response.set_cookie(
-                    key="auth_token",
-                    value=token,
-                    max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                    path="/",
-                    secure=False,  # Cambiar a True en producción con HTTPS
-                    httponly=True,
-                    samesite="lax"
-                )
+            # Guardar token en la cookie
+            self.auth_token = token
         except IntegrityError:
             self.error = "Username or email already exists"
+        except PasswordHasherBusy as e:
+            self.error = str(e)
         except Exception as e:
             self.error = str(e)
         finally:
@@ -282,18 +212,15 @@ class AuthState(State):
         self.error = None
         return True  # Return True to indicate success to the frontend
 
-    def logout(self):
+    async def logout(self):
         """Handle user logout."""
+        # Revoke the token so it is rejected by every worker until it expires
+        # (si Redis falla, revoke_token lo registra y solo lo rechaza este worker)
+        if self.token:
+            await revoke_token(self.token)
+
         # Clear auth state
         self.clear_auth_state()
         
-        # Clear the auth token cookie by setting it to expire
-        response = self.get_response()
-        if response:
-            response.delete_cookie(
-                key="auth_token",
-                path="/",
-                secure=False,  # Cambiar a True en producción con HTTPS
-                httponly=True,
-                samesite="lax"
-            )
+        # Clear the auth token cookie
+        self.auth_token = ""
@@ -0,0 +1,159 @@
+from typing import Optional
+import reflex as rx
+from reflex import State
+from pacta.state.auth_state import AuthState
+from pacta.utils.contracts import COUNT_CAP, SORTS, ContractFilters, fetch_window, get_listing
+from pacta.utils.database import run_db
+from pacta.utils.search import search_contracts
+
+# Geometría de la tabla virtualizada (debe coincidir con components/contracts_table.py)
+ROW_HEIGHT = 40  # px
+VISIBLE_ROWS = 15
+# Filas que se envían al cliente por ventana y margen a cada lado de lo visible
+WINDOW_SIZE = 100
+OVERSCAN = 40
+# Se pide una ventana nueva al acercarse a menos de MARGIN filas de su borde
+MARGIN = 10
+
+SCROLL_CONTAINER_ID = "contracts-scroll"
+
+
+class ContractsState(State):
+    """Listado de /contratos como tabla virtualizada.
+
+    El cliente solo tiene ``WINDOW_SIZE`` filas a partir de ``window_start``; al
+    hacer scroll envía su ``scrollTop`` y el estado sustituye la ventana cuando
+    lo visible se acerca a su borde. Filtros y orden se aplican en la base de
+    datos, así que el tamaño del estado y de cada delta no depende del número
+    de resultados. El total se acota a ``COUNT_CAP`` filas para que la barra
+    de scroll quepa en el alto máximo que admiten los navegadores.
+    """
+    rows: list[dict] = []
+    window_start: int = 0
+    total: int = 0
+    # El resultado tiene más filas que las que caben en la barra de scroll
+    total_capped: bool = False
+    status_filter: str = ""
+    type_filter: str = ""
+    only_mine: bool = False
+    sort: str = "recent"
+    is_loading: bool = False
+    error: Optional[str] = None
+    search_query: str = ""
+    search_results: list[dict] = []
+
+    # Solo en el backend: cursor de cada fila de la ventana actual
+    _cursors: list[str] = []
+
+    async def _authenticated(self) -> bool:
+        """Si hay sesión; si no, vacía lo que se hubiera enviado al cliente.
+
+        El ``rx.cond`` de la página solo oculta la interfaz: cualquier cliente
+        del websocket puede lanzar los eventos.
+        """
+        auth = await self.get_state(AuthState)
+        if auth.is_authenticated:
+            return True
+        self.rows, self._cursors = [], []
+        self.window_start = self.total = 0
+        self.total_capped = False
+        self.search_results = []
+        return False
+
+    async def _filters(self) -> ContractFilters:
+        owner_id = None
+        if self.only_mine:
+            auth = await self.get_state(AuthState)
+            owner_id = auth.user.id if auth.user else -1
+        return ContractFilters(
+            status=self.status_filter or None,
+            contract_type=self.type_filter or None,
+            owner_id=owner_id,
+        )
+
+    async def _fetch(self, filters: ContractFilters, start: int, after=None, before=None):
+        page = await run_db(fetch_window, filters, self.sort, start, WINDOW_SIZE, after, before)
+        self.rows = page.rows
+        self._cursors = page.cursors
+        self.window_start = start
+
+    async def load(self):
+        """Primera ventana y recuento (on_load de /contratos y al cambiar filtros u orden).
+
+        El recuento sale de ``get_listing``, que lo guarda por filtros y orden
+        junto con las anclas que usan los saltos de ``scroll_to``.
+        """
+        if not await self._authenticated():
+            return
+        self.is_loading = True
+        self.error = None
+        try:
+            filters = await self._filters()
+            await self._fetch(filters, 0)
+            self.total = len(self.rows)
+            self.total_capped = False
+            # Las primeras filas llegan al cliente antes de contar el total
+            yield rx.call_script(f"document.getElementById('{SCROLL_CONTAINER_ID}')?.scrollTo(0, 0)")
+            if len(self.rows) == WINDOW_SIZE:
+                listing = await run_db(get_listing, filters, self.sort)
+                self.total = listing.total
+                self.total_capped = listing.capped
+        except Exception as e:
+            self.error = f"Error al cargar los contratos: {str(e)}"
+        finally:
+            self.is_loading = False
+
+    async def scroll_to(self, scroll_top: float):
+        """Mover la ventana si lo visible se acerca a uno de sus bordes."""
+        if not await self._authenticated():
+            return
+        first = max(0, int(scroll_top) // ROW_HEIGHT)
+        end = self.window_start + len(self.rows)
+        near_top = self.window_start > 0 and first < self.window_start + MARGIN
+        near_bottom = end < self.total and first + VISIBLE_ROWS > end - MARGIN
+        if not (near_top or near_bottom):
+            return
+
+        start = min(max(0, first - OVERSCAN), max(0, self.total - WINDOW_SIZE))
+        if start == self.window_start:
+            return
+        # Ventana contigua a la actual: seek desde el cursor de una de sus
+        # filas. Un salto con la barra de scroll continúa desde el ancla del
+        # listado más cercana (fetch_window).
+        after = before = None
+        if self.window_start <= start - 1 < end:
+            after = self._cursors[start - 1 - self.window_start]
+        elif self.window_start <= start + WINDOW_SIZE < end:
+            before = self._cursors[start + WINDOW_SIZE - self.window_start]
+        try:
+            await self._fetch(await self._filters(), start, after, before)
+        except Exception as e:
+            self.error = f"Error al cargar los contratos: {str(e)}"
+
+    def set_status_filter(self, value: str):
+        self.status_filter = "" if value == "todos" else value
+        return ContractsState.load
+
+    def set_type_filter(self, value: str):
+        self.type_filter = "" if value == "todos" else value
+        return ContractsState.load
+
+    def set_only_mine(self, value: bool):
+        self.only_mine = value
+        return ContractsState.load
+
+    def set_sort(self, value: str):
+        if value in SORTS and value != self.sort:
+            self.sort = value
+            return ContractsState.load
+
+    async def set_search_query(self, value: str):
+        """Búsqueda de texto completo mientras se escribe (type-ahead)."""
+        self.search_query = value
+        if not await self._authenticated():
+            return
+        try:
+            self.search_results = await run_db(search_contracts, value) if value.strip() else []
+        except Exception as e:
+            self.search_results = []
+            self.error = f"Error en la búsqueda: {str(e)}"
@@ -0,0 +1,72 @@
+from typing import Optional
+import reflex as rx
+from reflex import State
+from pacta.state.auth_state import AuthState
+from pacta.utils.dashboard import widget_data
+
+
+async def _load_widget(state, widget: str):
+    """Calcular un widget fuera del bloqueo del estado y publicarlo al terminar."""
+    async with state:
+        owner_id = state._owner_id
+    if owner_id is None:
+        return
+    try:
+        data, error = await widget_data(widget, owner_id), None
+    except Exception as e:
+        data, error = {}, e
+    async with state:
+        # La sesión cambió de usuario mientras se calculaba
+        if state._owner_id != owner_id:
+            return
+        if error is not None:
+            state.error = f"Error al cargar el panel: {str(error)}"
+        for name, value in data.items():
+            setattr(state, name, value)
+        # También si ha fallado: el widget deja el skeleton y queda el aviso de error
+        setattr(state, f"{widget}_loaded", True)
+
+
+class DashboardState(State):
+    """Widgets del dashboard (ver utils/dashboard.py).
+
+    ``load`` lanza un evento en segundo plano por widget: cada uno consulta
+    la base de datos (o la caché por usuario) sin retener el estado y envía
+    sus datos al cliente en cuanto termina, así que el widget más lento no
+    retrasa a los demás. Hasta entonces el widget muestra su skeleton.
+    """
+    expiring: list[dict] = []
+    expiring_count: int = 0
+    drafts: list[dict] = []
+    draft_count: int = 0
+    reminder_count: int = 0
+    totals: list[dict] = []
+    expiring_loaded: bool = False
+    pending_loaded: bool = False
+    totals_loaded: bool = False
+    error: Optional[str] = None
+    _owner_id: Optional[int] = None
+
+    async def load(self):
+        auth = await self.get_state(AuthState)
+        owner_id = auth.user.id if auth.user else None
+        if owner_id != self._owner_id:
+            # Otro usuario en la misma pestaña: no mostrar datos del anterior
+            self._owner_id = owner_id
+            self.expiring_loaded = self.pending_loaded = self.totals_loaded = False
+        self.error = None
+        if owner_id is None:
+            return
+        return [DashboardState.load_expiring, DashboardState.load_pending, DashboardState.load_totals]
+
+    @rx.event(background=True)
+    async def load_expiring(self):
+        await _load_widget(self, "expiring")
+
+    @rx.event(background=True)
+    async def load_pending(self):
+        await _load_widget(self, "pending")
+
+    @rx.event(background=True)
+    async def load_totals(self):
+        await _load_widget(self, "totals")
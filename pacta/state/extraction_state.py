@@ -0,0 +1,54 @@
+import asyncio
+
+import reflex as rx
+from reflex import State
+from pacta.utils.database import run_db
+from pacta.utils.extraction import extraction_backlog, extraction_pipeline
+
+# Cada cuánto se refresca el progreso mientras haya documentos en cola
+PROGRESS_INTERVAL = 2.0  # segundos
+
+
+class ExtractionState(State):
+    """Progreso de la extracción de texto de documentos.
+
+    ``watch`` es un evento en segundo plano: consulta la cola cada
+    ``PROGRESS_INTERVAL`` segundos y envía los contadores al cliente sin
+    bloquear el resto de eventos. Termina al vaciarse la cola o al desmontarse
+    el indicador.
+    """
+    pending: int = 0
+    processing: int = 0
+    failed: int = 0
+    rate: float = 0.0
+    watching: bool = False
+
+    @rx.var
+    def backlog(self) -> int:
+        return self.pending + self.processing
+
+    @rx.event(background=True)
+    async def watch(self):
+        async with self:
+            if self.watching:
+                return
+            self.watching = True
+        try:
+            while True:
+                counts = await run_db(extraction_backlog)
+                async with self:
+                    if not self.watching:
+                        break
+                    self.pending = counts["pending"]
+                    self.processing = counts["processing"]
+                    self.failed = counts["failed"]
+                    self.rate = round(extraction_pipeline.rate(), 1)
+                    if not self.backlog:
+                        break
+                await asyncio.sleep(PROGRESS_INTERVAL)
+        finally:
+            async with self:
+                self.watching = False
+
+    def stop(self):
+        self.watching = False
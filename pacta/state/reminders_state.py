@@ -0,0 +1,32 @@
+import reflex as rx
+from reflex import State
+from pacta.state.auth_state import AuthState
+from pacta.utils.dashboard import invalidate_dashboard
+from pacta.utils.database import run_db
+from pacta.utils.reminders import dismiss_reminder, open_reminders
+
+
+class RemindersState(State):
+    """Avisos de vencimiento sin descartar del usuario actual."""
+    # Vencen hoy o mañana / más adelante
+    urgent: list[dict] = []
+    upcoming: list[dict] = []
+
+    async def _user_id(self):
+        auth = await self.get_state(AuthState)
+        return auth.user.id if auth.user else None
+
+    async def load(self):
+        user_id = await self._user_id()
+        reminders = await run_db(open_reminders, user_id) if user_id is not None else []
+        self.urgent = [r for r in reminders if r["days"] <= 1]
+        self.upcoming = [r for r in reminders if r["days"] > 1]
+
+    async def dismiss(self, reminder_id: int):
+        user_id = await self._user_id()
+        if user_id is None:
+            return
+        await run_db(dismiss_reminder, user_id, reminder_id)
+        invalidate_dashboard(user_id)
+        self.urgent = [r for r in self.urgent if r["id"] != reminder_id]
+        self.upcoming = [r for r in self.upcoming if r["id"] != reminder_id]
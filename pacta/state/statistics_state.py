@@ -0,0 +1,85 @@
+import asyncio
+from typing import Optional
+import reflex as rx
+from reflex import State
+from pacta.state.auth_state import AuthState
+from pacta.utils.database import run_db
+from pacta.utils.statistics import load_statistics
+
+
+# Variables con datos de contratos
+_DATA = (
+    "totals", "by_status", "by_type", "top_counterparties", "started_by_month", "expiring_by_month",
+    "value_at_expiry", "renewal_cohorts", "exposure",
+)
+
+
+class StatisticsState(State):
+    """Datos de /estadisticas, leídos de ``contract_aggregates`` (ver utils/statistics.py).
+
+    Cada lista tiene como mucho unas decenas de filas, sea cual sea el número
+    de contratos. La analítica de cartera (vencimientos por trimestre,
+    renovaciones y exposición) se calcula sobre la instantánea columnar de
+    utils/analytics.py en un evento en segundo plano, en un hilo para no
+    bloquear el event loop ni retrasar las tarjetas de agregados.
+    """
+    totals: list[dict] = []
+    by_status: list[dict] = []
+    by_type: list[dict] = []
+    top_counterparties: list[dict] = []
+    started_by_month: list[dict] = []
+    expiring_by_month: list[dict] = []
+    value_at_expiry: list[dict] = []
+    renewal_cohorts: list[dict] = []
+    exposure: list[dict] = []
+    is_loading: bool = False
+    error: Optional[str] = None
+
+    async def _authenticated(self) -> bool:
+        """Si hay sesión; si no, vacía los datos (la página solo oculta la interfaz)."""
+        auth = await self.get_state(AuthState)
+        if auth.is_authenticated:
+            return True
+        for name in _DATA:
+            setattr(self, name, [])
+        return False
+
+    async def load(self):
+        if not await self._authenticated():
+            return
+        self.is_loading = True
+        self.error = None
+        try:
+            stats = await run_db(load_statistics)
+            self.totals = stats["totals"]
+            self.by_status = stats["by_status"]
+            self.by_type = stats["by_type"]
+            self.top_counterparties = stats["top_counterparties"]
+            self.started_by_month = stats["started_by_month"]
+            self.expiring_by_month = stats["expiring_by_month"]
+        except Exception as e:
+            self.error = f"Error al cargar las estadísticas: {str(e)}"
+            return
+        finally:
+            self.is_loading = False
+        # Las tarjetas de agregados se envían ya; la analítica llega después
+        return StatisticsState.load_analytics
+
+    @rx.event(background=True)
+    async def load_analytics(self):
+        # NumPy (utils/analytics.py) se carga con la primera visita, no al arrancar
+        from pacta.utils.analytics import portfolio
+
+        async with self:
+            if not await self._authenticated():
+                return
+        try:
+            analytics = await asyncio.to_thread(portfolio)
+        except Exception as e:
+            async with self:
+                self.error = f"Error al cargar la analítica de cartera: {str(e)}"
+            return
+        async with self:
+            self.value_at_expiry = analytics["value_at_expiry"]
+            self.renewal_cohorts = analytics["renewal_cohorts"]
+            self.exposure = analytics["exposure"]
@@ -0,0 +1,422 @@
+"""
+Analítica de la cartera de contratos sobre una instantánea columnar.
+
+``ContractSnapshot`` guarda en memoria las columnas que necesita la analítica
+como arrays de NumPy, una posición por contrato y ordenadas por ``id``:
+
+- ``ids`` y ``cents`` (importe en céntimos) en int64, ``start``/``end`` en
+  días desde 1970 (int32);
+- estado, tipo, contraparte y moneda codificados como enteros contra un
+  diccionario por columna (``statuses``, ``types``, ``counterparties``,
+  ``currencies``).
+
+Las columnas ocupan 40 bytes por contrato y el índice de renovaciones, una vez
+calculado, otros 16; el diccionario de contrapartes, unos 120 bytes por
+contraparte distinta (la cadena y sus entradas en la lista y el índice). Con
+contrapartes casi únicas, como en ``benchmarks/contract_analytics.py``, son
+unos 150 bytes por contrato (~150 MB con 1M) en cada worker; ``nbytes`` da la
+cifra real de la instantánea. La primera lectura carga la tabla por lotes;
+después ``refresh`` solo lee los contratos con ``id`` o ``updated_at``
+posteriores a la lectura anterior (clave primaria e
+``ix_contracts_updated_at``, como el planificador de avisos), actualiza los que
+ya tiene en su posición y añade los nuevos. Las bajas no dejan rastro en
+``updated_at``: si el número de contratos no coincide con ``COUNT(*)`` se
+recarga todo. Los cambios por SQL directo que no tocan ``updated_at`` se ven en
+la siguiente recarga completa, como mucho cada ``ANALYTICS_RELOAD_SECONDS``.
+
+Las métricas se calculan con operaciones vectorizadas (máscaras,
+``np.bincount`` sobre claves combinadas y ``np.searchsorted``), sin recorrer
+los contratos en Python:
+
+- ``value_at_expiry``: importe de los contratos vigentes que vencen en cada uno
+  de los próximos ``ANALYTICS_QUARTERS`` trimestres, por moneda;
+- ``renewal_cohorts``: por trimestre de vencimiento, contratos terminados y
+  cuántos se renovaron, es decir, tienen otro contrato con la misma contraparte
+  y tipo que empieza entre ``RENEWAL_BEFORE_DAYS`` días antes y
+  ``RENEWAL_AFTER_DAYS`` días después de su fin;
+- ``counterparty_exposure``: importe de los contratos vigentes no vencidos por
+  contraparte y moneda, las ``TOP_COUNTERPARTIES`` de mayor exposición.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import BigInteger, Date, Integer, cast, func, literal, select
+from sqlalchemy.engine import Engine
+
+from pacta.models.contract import ContractModel, ContractStatus, ContractType
+from pacta.utils.statistics import TOP_COUNTERPARTIES
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "30"))
+ANALYTICS_RELOAD_SECONDS = float(os.getenv("ANALYTICS_RELOAD_SECONDS", "3600"))
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "50000"))
+ANALYTICS_QUARTERS = int(os.getenv("ANALYTICS_QUARTERS", "4"))
+ANALYTICS_COHORTS = int(os.getenv("ANALYTICS_COHORTS", "8"))
+RENEWAL_BEFORE_DAYS = int(os.getenv("RENEWAL_BEFORE_DAYS", "30"))
+RENEWAL_AFTER_DAYS = int(os.getenv("RENEWAL_AFTER_DAYS", "60"))
+
+# Solape de la sincronización por updated_at (CURRENT_TIMESTAMP tiene resolución de segundos)
+_SYNC_OVERLAP = timedelta(seconds=1)
+_EPOCH = date(1970, 1, 1)
+
+logger = logging.getLogger(__name__)
+
+_c = ContractModel.__table__
+# Días juliano del 1970-01-01
+_JULIAN_EPOCH = 2440587.5
+
+
+def _epoch_days(conn, column):
+    """``column`` en días desde 1970 calculado en la base de datos (sin crear ``date`` en Python)."""
+    if conn.dialect.name == "postgresql":
+        return cast(column - literal(_EPOCH, Date), Integer)
+    return cast(func.julianday(column) - _JULIAN_EPOCH, Integer)
+
+
+def _select(conn):
+    return select(
+        _c.c.id,
+        _c.c.status,
+        _c.c.contract_type,
+        _c.c.counterparty,
+        _c.c.currency,
+        cast(func.round(func.coalesce(_c.c.value, 0) * 100), BigInteger).label("cents"),
+        _epoch_days(conn, _c.c.start_date).label("start"),
+        _epoch_days(conn, _c.c.end_date).label("end"),
+        _c.c.updated_at,
+    )
+
+
+# Nombre del array -> dtype
+_COLUMNS = {
+    "ids": np.int64,
+    "status": np.int32,
+    "contract_type": np.int32,
+    "counterparty": np.int32,
+    "currency": np.int32,
+    "cents": np.int64,
+    "start": np.int32,
+    "end": np.int32,
+}
+
+
+def days(day: date) -> int:
+    """Días desde 1970-01-01, la unidad de ``start``/``end``."""
+    return (day - _EPOCH).days
+
+
+def _quarters(day_numbers) -> np.ndarray:
+    """Trimestre (contado desde 1970-T1) de cada día."""
+    months = np.asarray(day_numbers).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months // 3
+
+
+def _quarter_start(quarter: int) -> int:
+    """Primer día (desde 1970) del trimestre."""
+    return int(np.datetime64(quarter * 3, "M").astype("datetime64[D]").astype(np.int64))
+
+
+def quarter_label(quarter: int) -> str:
+    return f"{1970 + quarter // 4}-T{quarter % 4 + 1}"
+
+
+def _money(value_cents) -> str:
+    return f"{value_cents / 100:,.2f}"
+
+
+class Codes:
+    """Diccionario valor <-> código entero de una columna categórica."""
+
+    def __init__(self, values=()):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de la lista, el índice y las cadenas (compartidas por los dos)."""
+        return sys.getsizeof(self.values) + sys.getsizeof(self.index) + sum(map(sys.getsizeof, self.values))
+
+    def code(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values) -> np.ndarray:
+        for value in set(values).difference(self.index):
+            self.code(value)
+        return np.fromiter(map(self.index.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+class ContractSnapshot:
+    """Columnas de los contratos en arrays de NumPy con refresco incremental."""
+
+    def __init__(self, engine: Optional[Engine] = None, batch_size: int = ANALYTICS_BATCH_SIZE):
+        # None: el motor de pacta.utils.database, que se importa al usarse
+        self._engine = engine
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self._clear()
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from pacta.utils.database import engine
+            self._engine = engine
+        return self._engine
+
+    def _clear(self):
+        self.statuses = Codes(ContractStatus.ALL)
+        self.types = Codes(ContractType.ALL)
+        self.counterparties = Codes()
+        self.currencies = Codes()
+        for name, dtype in _COLUMNS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+        # Estructuras derivadas de las columnas, válidas hasta el próximo cambio
+        self._derived = {}
+        self._last_id = 0
+        self._watermark = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de las columnas, los diccionarios y las estructuras derivadas."""
+        columns = sum(getattr(self, name).nbytes for name in _COLUMNS)
+        codes = sum(codes.nbytes for codes in (self.statuses, self.types, self.counterparties, self.currencies))
+        derived = sum(array.nbytes for value in self._derived.values() for array in value)
+        return columns + codes + derived
+
+    def _arrays(self, rows) -> Dict[str, np.ndarray]:
+        if not rows:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        ids, status, contract_type, counterparty, currency, cents, start, end, _ = zip(*rows)
+        return {
+            "ids": np.array(ids, dtype=np.int64),
+            "status": self.statuses.encode(status),
+            "contract_type": self.types.encode(contract_type),
+            "counterparty": self.counterparties.encode(counterparty),
+            "currency": self.currencies.encode(currency),
+            "cents": np.array(cents, dtype=np.int64),
+            "start": np.array(start, dtype=np.int32),
+            "end": np.array(end, dtype=np.int32),
+        }
+
+    def load(self) -> int:
+        """Cargar la tabla entera; devuelve el número de contratos."""
+        self._clear()
+        parts = []
+        with self.engine.connect() as conn:
+            # Marca de agua antes de leer: lo que cambie durante la lectura lo
+            # recoge el siguiente refresco
+            # (o la hora del servidor si no hay ninguna modificación todavía)
+            watermark = conn.execute(select(func.coalesce(func.max(_c.c.updated_at), func.now()))).scalar()
+            result = conn.execution_options(yield_per=self.batch_size).execute(_select(conn).order_by(_c.c.id))
+            for rows in result.partitions():
+                parts.append(self._arrays(rows))
+        for name, dtype in _COLUMNS.items():
+            setattr(self, name, np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype=dtype))
+        self._last_id = int(self.ids[-1]) if len(self.ids) else 0
+        self._watermark = watermark
+        self.loaded_at = self.refreshed_at = time.monotonic()
+        return len(self)
+
+    def derived(self, name: str, build):
+        """``build(self)``, calculado una vez por versión de la instantánea."""
+        if name not in self._derived:
+            self._derived[name] = build(self)
+        return self._derived[name]
+
+    def _merge(self, batch: Dict[str, np.ndarray]):
+        self._derived = {}
+        # Un contrato puede llegar por las dos consultas: basta una vez
+        _, first = np.unique(batch["ids"], return_index=True)
+        batch = {name: array[first] for name, array in batch.items()}
+        ids = batch["ids"]
+        positions = np.searchsorted(self.ids, ids)
+        existing = positions < len(self.ids)
+        existing[existing] = self.ids[positions[existing]] == ids[existing]
+        for name in _COLUMNS:
+            getattr(self, name)[positions[existing]] = batch[name][existing]
+        new = ~existing
+        if not new.any():
+            return
+        merged = {name: np.concatenate([getattr(self, name), batch[name][new]]) for name in _COLUMNS}
+        if len(self.ids) and ids[new].min() < self.ids[-1]:
+            order = np.argsort(merged["ids"], kind="stable")
+            merged = {name: array[order] for name, array in merged.items()}
+        for name, array in merged.items():
+            setattr(self, name, array)
+
+    def refresh(self) -> int:
+        """Aplicar los contratos nuevos o modificados; devuelve cuántos se han leído.
+
+        Carga la tabla entera la primera vez, cada ``ANALYTICS_RELOAD_SECONDS``
+        y cuando el número de contratos no cuadra (bajas).
+        """
+        now = time.monotonic()
+        if self.loaded_at is None or now - self.loaded_at >= ANALYTICS_RELOAD_SECONDS:
+            return self.load()
+        with self.engine.connect() as conn:
+            created = conn.execute(_select(conn).where(_c.c.id > self._last_id).order_by(_c.c.id)).all()
+            updated = conn.execute(
+                _select(conn).where(_c.c.updated_at >= self._watermark - _SYNC_OVERLAP)
+            ).all()
+            total = conn.execute(select(func.count()).select_from(_c)).scalar()
+        rows = created + updated
+        if rows:
+            self._merge(self._arrays(rows))
+        if created:
+            self._last_id = max(self._last_id, created[-1].id)
+        watermarks = [row.updated_at for row in updated if row.updated_at is not None]
+        if watermarks:
+            self._watermark = max(self._watermark, *watermarks)
+        if total != len(self):
+            logger.info("Instantánea de contratos desfasada (%s frente a %s): recarga completa", len(self), total)
+            return self.load()
+        self.refreshed_at = now
+        return len(rows)
+
+    def refresh_if_stale(self, max_age: float = ANALYTICS_REFRESH_SECONDS):
+        if self.refreshed_at is None or time.monotonic() - self.refreshed_at >= max_age:
+            self.refresh()
+
+
+def value_at_expiry(snapshot: ContractSnapshot, today: date, quarters: int = ANALYTICS_QUARTERS) -> List[dict]:
+    """Importe de los contratos vigentes por trimestre de vencimiento y moneda."""
+    s = snapshot
+    first = int(_quarters(days(today)))
+    mask = (
+        (s.status == s.statuses.index[ContractStatus.ACTIVE])
+        & (s.end >= days(today)) & (s.end < _quarter_start(first + quarters))
+    )
+    currencies = max(len(s.currencies), 1)
+    key = (_quarters(s.end[mask]) - first) * currencies + s.currency[mask]
+    counts = np.bincount(key, minlength=quarters * currencies)
+    values = np.rint(np.bincount(key, weights=s.cents[mask], minlength=quarters * currencies)).astype(np.int64)
+    rows = [
+        {"key": quarter_label(first + k // currencies), "currency": s.currencies.values[k % currencies],
+         "contracts": int(counts[k]), "value": _money(int(values[k]))}
+        for k in np.flatnonzero(counts)
+    ]
+    return sorted(rows, key=lambda row: (row["key"], row["currency"]))
+
+
+# Desplazamiento de ``start`` para guardarlo sin signo en los 32 bits bajos
+_START_OFFSET = 1 << 31
+
+
+def _renewal_group(s: ContractSnapshot, mask) -> np.ndarray:
+    """Grupo de renovación (contraparte y tipo) de los contratos de ``mask``."""
+    return s.counterparty[mask].astype(np.int64) * len(s.types) + s.contract_type[mask]
+
+
+def _renewal_index(s: ContractSnapshot):
+    """Claves ``grupo << 32 | inicio`` ordenadas de los contratos no borradores, y sus ids.
+
+    Buscar el primer contrato de un grupo que empieza en la ventana de
+    renovación es entonces un ``searchsorted``.
+    """
+    valid = s.status != s.statuses.index[ContractStatus.DRAFT]
+    keys = (_renewal_group(s, valid) << 32) | (s.start[valid].astype(np.int64) + _START_OFFSET)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], s.ids[valid][order]
+
+
+def renewal_cohorts(
+    snapshot: ContractSnapshot,
+    today: date,
+    quarters: int = ANALYTICS_COHORTS,
+    before: int = RENEWAL_BEFORE_DAYS,
+    after: int = RENEWAL_AFTER_DAYS,
+) -> List[dict]:
+    """Tasa de renovación de los contratos terminados en los últimos ``quarters`` trimestres."""
+    s = snapshot
+    sorted_keys, sorted_ids = s.derived("renewals", _renewal_index)
+    draft = s.statuses.index[ContractStatus.DRAFT]
+    today_days = days(today)
+    first = int(_quarters(today_days)) - quarters + 1
+    ended = (s.status != draft) & (s.end >= _quarter_start(first)) & (s.end < today_days)
+    ids_e, end_e = s.ids[ended], s.end[ended].astype(np.int64)
+    group_e = _renewal_group(s, ended)
+    cohort_e = _quarters(end_e) - first
+
+    n = len(sorted_keys)
+    found = np.searchsorted(sorted_keys, (group_e << 32) | (end_e - before + _START_OFFSET))
+    # El propio contrato no cuenta como su renovación
+    at = np.minimum(found, n - 1)
+    found = found + ((found < n) & (sorted_ids[at] == ids_e))
+    at = np.minimum(found, n - 1)
+    candidate = sorted_keys[at]
+    renewed = (
+        (found < n)
+        & ((candidate >> 32) == group_e)
+        & ((candidate & 0xFFFFFFFF) - _START_OFFSET <= end_e + after)
+    )
+
+    ended_counts = np.bincount(cohort_e, minlength=quarters)
+    renewed_counts = np.bincount(cohort_e, weights=renewed, minlength=quarters).astype(np.int64)
+    return [
+        {"key": quarter_label(first + q), "ended": int(ended_counts[q]),
+         "renewed": int(renewed_counts[q]),
+         "rate": f"{renewed_counts[q] / ended_counts[q] * 100:.1f} %" if ended_counts[q] else "-"}
+        for q in range(quarters)
+    ]
+
+
+def counterparty_exposure(snapshot: ContractSnapshot, today: date, limit: int = TOP_COUNTERPARTIES) -> List[dict]:
+    """Contrapartes con mayor importe vigente, por moneda."""
+    s = snapshot
+    mask = (s.status == s.statuses.index[ContractStatus.ACTIVE]) & (s.end >= days(today))
+    currencies = max(len(s.currencies), 1)
+    key = s.counterparty[mask].astype(np.int64) * currencies + s.currency[mask]
+    size = len(s.counterparties) * currencies
+    counts = np.bincount(key, minlength=size)
+    values = np.rint(np.bincount(key, weights=s.cents[mask], minlength=size)).astype(np.int64)
+    present = np.flatnonzero(counts)
+    if len(present) > limit:
+        present = present[np.argpartition(-values[present], limit)[:limit]]
+    rows = [
+        {"key": s.counterparties.values[k // currencies], "currency": s.currencies.values[k % currencies],
+         "contracts": int(counts[k]), "value_cents": int(values[k])}
+        for k in present
+    ]
+    rows.sort(key=lambda row: (-row["value_cents"], row["key"], row["currency"]))
+    for row in rows:
+        row["value"] = _money(row.pop("value_cents"))
+    return rows
+
+
+def portfolio(today: date = None, snapshot: Optional[ContractSnapshot] = None) -> dict:
+    """Métricas de /estadisticas sobre la instantánea, refrescada si hace falta.
+
+    Lee la base de datos y calcula con NumPy: llamar desde un hilo
+    (``asyncio.to_thread``), no desde el event loop.
+    """
+    today = today or date.today()
+    if snapshot is None:
+        snapshot = contract_snapshot
+    with snapshot.lock:
+        snapshot.refresh_if_stale()
+        return {
+            "value_at_expiry": value_at_expiry(snapshot, today),
+            "renewal_cohorts": renewal_cohorts(snapshot, today),
+            "exposure": counterparty_exposure(snapshot, today),
+        }
+
+
+contract_snapshot = ContractSnapshot()
@@ -0,0 +1,334 @@
+"""
+Listado de contratos con paginación por cursor (keyset / seek).
+
+En lugar de ``OFFSET n`` —que obliga a la base de datos a recorrer y descartar
+``n`` filas, así que la página 5.000 cuesta 5.000 veces la primera— cada página
+continúa desde la última fila vista: ``WHERE (end_date, id) > (:fecha, :id)
+ORDER BY end_date, id LIMIT :n``. Con un índice que empiece por los filtros de
+igualdad y termine en la columna de orden + ``id`` (ver ``ContractModel``) la
+consulta es un rango del índice y su coste no depende de la página.
+
+El cursor es una cadena opaca ``"<valor>~<id>"`` que el estado guarda tal cual.
+``list_contracts`` no calcula el total de filas: un ``COUNT(*)`` sobre millones
+de contratos costaría más que la propia página.
+
+``fetch_window`` sirve a la tabla virtualizada: ventanas de filas por posición
+sobre ``list_contracts``, continuando por cursor cuando la ventana es contigua
+a la anterior. Para los saltos con la barra de scroll, ``get_listing`` recorre
+una vez el índice del listado (como mucho ``COUNT_CAP`` filas) y guarda el
+total y un ancla (el cursor) cada ``ANCHOR_EVERY`` filas: el salto continúa
+desde el ancla anterior y salta menos de ``ANCHOR_EVERY`` filas con
+``OFFSET``. El resultado se guarda por (filtros, orden) durante
+``CONTRACTS_LISTING_TTL`` segundos y se invalida al confirmar cambios de
+contratos hechos con el ORM en este worker.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select, tuple_
+from sqlalchemy.orm import Session, object_session
+
+from pacta.models.contract import ContractModel
+
+PAGE_SIZE = 50
+# Filas que caben en la barra de scroll de la tabla virtualizada: 200.000
+# filas de 40 px son 8M px, por debajo del alto máximo de un elemento en los
+# navegadores (unos 17M px en Firefox). Más allá hay que refinar los filtros.
+COUNT_CAP = 200_000
+# Filas entre anclas: un salto lee como mucho ANCHOR_EVERY - 1 filas de más
+ANCHOR_EVERY = 1000
+CONTRACTS_LISTING_TTL = float(os.getenv("CONTRACTS_LISTING_TTL", "60"))  # 0 desactiva la caché
+CONTRACTS_LISTING_CACHE_SIZE = int(os.getenv("CONTRACTS_LISTING_CACHE_SIZE", "1000"))
+
+# orden -> (columna de orden o None si solo es el id, descendente)
+SORTS = {
+    "recent": (None, True),
+    "end_date": (ContractModel.end_date, False),
+}
+
+LIST_COLUMNS = (
+    ContractModel.id,
+    ContractModel.reference,
+    ContractModel.title,
+    ContractModel.counterparty,
+    ContractModel.contract_type,
+    ContractModel.status,
+    ContractModel.value,
+    ContractModel.currency,
+    ContractModel.end_date,
+)
+
+
+@dataclass(frozen=True)
+class ContractFilters:
+    """Filtros de igualdad del listado (None = sin filtrar)."""
+    status: Optional[str] = None
+    contract_type: Optional[str] = None
+    owner_id: Optional[int] = None
+
+
+@dataclass
+class ContractPage:
+    rows: List[dict] = field(default_factory=list)
+    # cursor de cada fila, para continuar desde cualquiera de ellas
+    cursors: List[str] = field(default_factory=list)
+    first_cursor: Optional[str] = None
+    last_cursor: Optional[str] = None
+    has_prev: bool = False
+    has_next: bool = False
+
+
+def _cursor(value: Optional[date], row_id: int) -> str:
+    return f"{'' if value is None else value.isoformat()}~{row_id}"
+
+
+def encode_cursor(sort: str, row) -> str:
+    column, _ = SORTS[sort]
+    return _cursor(None if column is None else row[column.key], row["id"])
+
+
+def decode_cursor(sort: str, cursor: str):
+    value, _, row_id = cursor.rpartition("~")
+    column, _ = SORTS[sort]
+    return (None if column is None else date.fromisoformat(value)), int(row_id)
+
+
+def _row(row) -> dict:
+    return {
+        "id": row.id,
+        "reference": row.reference,
+        "title": row.title,
+        "counterparty": row.counterparty,
+        "contract_type": row.contract_type,
+        "status": row.status,
+        "value": float(row.value) if row.value is not None else None,
+        "currency": row.currency,
+        "end_date": row.end_date,
+    }
+
+
+def build_query(filters: ContractFilters, sort: str, cursor: Optional[str] = None, forward: bool = True):
+    """``SELECT`` de una página en el sentido indicado (sin ``LIMIT``)."""
+    column, descending = SORTS[sort]
+    ascending = forward != descending
+    query = select(*LIST_COLUMNS)
+    if filters.status:
+        query = query.where(ContractModel.status == filters.status)
+    if filters.contract_type:
+        query = query.where(ContractModel.contract_type == filters.contract_type)
+    if filters.owner_id is not None:
+        query = query.where(ContractModel.owner_id == filters.owner_id)
+
+    if cursor:
+        value, last_id = decode_cursor(sort, cursor)
+        if column is None:
+            query = query.where(ContractModel.id > last_id if ascending else ContractModel.id < last_id)
+        else:
+            key = tuple_(column, ContractModel.id)
+            bound = tuple_(value, last_id)
+            query = query.where(key > bound if ascending else key < bound)
+
+    keys = [ContractModel.id] if column is None else [column, ContractModel.id]
+    return query.order_by(*(k.asc() if ascending else k.desc() for k in keys))
+
+
+def list_contracts(
+    db: Session,
+    filters: ContractFilters = ContractFilters(),
+    sort: str = "recent",
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    last: bool = False,
+    limit: int = PAGE_SIZE,
+    offset: int = 0,
+) -> ContractPage:
+    """Obtener una página de contratos.
+
+    Args:
+        after: cursor de la última fila de la página actual (página siguiente)
+        before: cursor de la primera fila de la página actual (página anterior)
+        last: devolver la última página
+        offset: filas a saltar tras ``after`` (solo hacia delante; pensado
+            para distancias cortas, como desde un ancla de ``get_listing``)
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Orden no soportado: {sort}")
+    forward = before is None and not last
+    query = build_query(filters, sort, after if forward else before, forward).limit(limit + 1)
+    if forward and offset:
+        query = query.offset(offset)
+    rows = [_row(r) for r in db.execute(query)]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if not forward:
+        rows.reverse()
+
+    page = ContractPage(rows=rows, cursors=[encode_cursor(sort, row) for row in rows])
+    if rows:
+        page.first_cursor = page.cursors[0]
+        page.last_cursor = page.cursors[-1]
+    if forward:
+        page.has_prev, page.has_next = after is not None or offset > 0, more
+    else:
+        page.has_prev, page.has_next = more, before is not None
+    for row in rows:
+        row["end_date"] = row["end_date"].isoformat()
+    return page
+
+
+@dataclass(frozen=True)
+class ContractListing:
+    """Total (acotado a ``cap``) de un listado y cursor de cada ``ANCHOR_EVERY`` filas."""
+    total: int
+    # anchors[k] es el cursor de la fila (k + 1) * ANCHOR_EVERY - 1
+    anchors: Tuple[str, ...]
+    cap: int = COUNT_CAP
+
+    @property
+    def capped(self) -> bool:
+        return self.total >= self.cap
+
+    def seek(self, start: int) -> Tuple[Optional[str], int]:
+        """Cursor desde el que continuar y filas a saltar para llegar a la fila ``start``."""
+        k = min(start // ANCHOR_EVERY, len(self.anchors))
+        if k == 0:
+            return None, start
+        return self.anchors[k - 1], start - k * ANCHOR_EVERY
+
+
+def scan_listing(db: Session, filters: ContractFilters, sort: str, cap: int = COUNT_CAP) -> ContractListing:
+    """Contar el listado y tomar sus anclas saltando ``ANCHOR_EVERY`` filas cada vez.
+
+    Cada ancla es un seek desde la anterior con ``OFFSET ANCHOR_EVERY - 1
+    LIMIT 1``: el índice se recorre una sola vez y sin traer las claves a
+    Python.
+    """
+    column, _ = SORTS[sort]
+    keys = [ContractModel.id] if column is None else [column, ContractModel.id]
+    anchors = []
+    after = None
+    while (len(anchors) + 1) * ANCHOR_EVERY <= cap:
+        query = build_query(filters, sort, after).with_only_columns(*keys).offset(ANCHOR_EVERY - 1).limit(1)
+        key = db.execute(query).first()
+        if key is None:
+            break
+        after = _cursor(None if column is None else key[0], key[-1])
+        anchors.append(after)
+    seen = len(anchors) * ANCHOR_EVERY
+    rest = build_query(filters, sort, after).with_only_columns(ContractModel.id).order_by(None)
+    rest = rest.limit(min(ANCHOR_EVERY, cap - seen)).subquery()
+    return ContractListing(seen + db.execute(select(func.count()).select_from(rest)).scalar_one(), tuple(anchors), cap)
+
+
+class ListingCache:
+    """Caché TTL de ``ContractListing`` por (filtros, orden)."""
+
+    def __init__(self, ttl: float = CONTRACTS_LISTING_TTL, max_size: int = CONTRACTS_LISTING_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, filters: ContractFilters, sort: str) -> Optional[ContractListing]:
+        with self._lock:
+            entry = self._entries.get((filters, sort))
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, filters: ContractFilters, sort: str, listing: ContractListing, generation: int):
+        """Guardar ``listing`` salvo que los contratos hayan cambiado desde ``generation``."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._generation != generation:
+                return
+            # Al llenarse se vacía, como la caché del dashboard
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[filters, sort] = (listing, time.monotonic() + self.ttl)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+listing_cache = ListingCache()
+
+
+def get_listing(db: Session, filters: ContractFilters, sort: str) -> ContractListing:
+    """Total y anclas del listado, de la caché o recorriendo el índice."""
+    listing = listing_cache.get(filters, sort)
+    if listing is None:
+        generation = listing_cache.generation()
+        listing = scan_listing(db, filters, sort)
+        listing_cache.put(filters, sort, listing, generation)
+    return listing
+
+
+def fetch_window(
+    db: Session,
+    filters: ContractFilters,
+    sort: str,
+    start: int,
+    limit: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> ContractPage:
+    """Filas ``[start, start + limit)`` del listado.
+
+    Args:
+        after: cursor de la fila ``start - 1`` si se conoce (seek hacia delante)
+        before: cursor de la fila ``start + limit`` si se conoce (seek hacia atrás)
+
+    Sin cursor se continúa desde el ancla de ``get_listing`` anterior a ``start``.
+    """
+    offset = 0
+    if after is None and before is None and start:
+        after, offset = get_listing(db, filters, sort).seek(start)
+    return list_contracts(db, filters, sort, after=after, before=before, limit=limit, offset=offset)
+
+
+# Altas, bajas y cambios de las columnas del listado desplazan las posiciones:
+# se marcan en la sesión y la caché se invalida al confirmarla
+_LISTING_COLUMNS = ("status", "contract_type", "owner_id", "end_date")
+
+
+@event.listens_for(ContractModel, "after_insert")
+@event.listens_for(ContractModel, "after_delete")
+def _track_listing_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["contracts_listing_changed"] = True
+
+
+@event.listens_for(ContractModel, "after_update")
+def _track_listing_update(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if any(getattr(attrs, name).history.has_changes() for name in _LISTING_COLUMNS):
+        _track_listing_change(mapper, connection, target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_listings(session):
+    if session.info.pop("contracts_listing_changed", False):
+        listing_cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_listing_change(session, previous_transaction):
+    session.info.pop("contracts_listing_changed", None)
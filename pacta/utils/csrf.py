@@ -0,0 +1,162 @@
+"""
+Tokens CSRF firmados con HMAC.
+
+Un token es ``kid.emitido.nonce.firma``, donde la firma es un HMAC-SHA256 del
+resto del token y del identificador de sesión. Es autocontenido: no hace falta
+guardarlo ni programar su caducidad, y cualquier worker con la misma clave
+puede validarlo. ``CSRF_SECRET_KEYS`` admite varias claves separadas por comas
+para rotarlas: la primera firma y todas verifican.
+
+El uso único es opcional (``CSRF_ONE_TIME``) y se controla con un filtro de
+reutilización por cubos de tiempo que guarda 8 bytes por token consumido (en
+arrays ordenados) y descarta cubos enteros cuando sus tokens ya han caducado.
+
+Los handlers protegidos reciben el token como argumento del evento
+(``csrf_token``), normalmente desde un campo oculto del formulario; tras cada
+verificación se emite uno nuevo en el estado.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from functools import wraps
+from typing import Optional
+
+CSRF_TOKEN_EXPIRE_HOURS = int(os.getenv("CSRF_TOKEN_EXPIRE_HOURS", "24"))
+CSRF_ONE_TIME = os.getenv("CSRF_ONE_TIME", "true").lower() in ("1", "true", "yes")
+CSRF_REPLAY_BUCKETS = 24
+CSRF_REPLAY_SHARDS = 256
+
+
+def _load_keys():
+    keys = os.getenv("CSRF_SECRET_KEYS") or os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
+    return [k.strip().encode("utf-8") for k in keys.split(",") if k.strip()]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class ReplayFilter:
+    """Registro de tokens ya usados, agrupado por hora de emisión.
+
+    Cada cubo reparte los identificadores de 64 bits en ``CSRF_REPLAY_SHARDS``
+    ``array('Q')`` ordenados según su byte alto: 8 bytes por token y cada
+    inserción solo desplaza una fracción pequeña del cubo.
+    """
+
+    def __init__(self, max_age: float, buckets: int = CSRF_REPLAY_BUCKETS):
+        self.max_age = max_age
+        self.width = max_age / buckets
+        self._buckets = {}
+
+    def _expire(self, now: float):
+        oldest = int((now - self.max_age) // self.width)
+        for bucket in [b for b in self._buckets if b < oldest]:
+            del self._buckets[bucket]
+
+    def check_and_add(self, token_id: int, issued_at: float, now: float = None) -> bool:
+        """Devuelve False si el token ya se había usado; en caso contrario lo registra."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        bucket = int(issued_at // self.width)
+        shards = self._buckets.get(bucket)
+        if shards is None:
+            shards = self._buckets[bucket] = [array("Q") for _ in range(CSRF_REPLAY_SHARDS)]
+        shard = shards[token_id * CSRF_REPLAY_SHARDS >> 64]
+        i = bisect_left(shard, token_id)
+        if i < len(shard) and shard[i] == token_id:
+            return False
+        shard.insert(i, token_id)
+        return True
+
+    def __len__(self):
+        return sum(len(shard) for shards in self._buckets.values() for shard in shards)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria real de los cubos: identificadores, reserva y cabecera de cada array."""
+        return sum(sys.getsizeof(shard) for shards in self._buckets.values() for shard in shards)
+
+
+class CsrfProtector:
+    """Emisión y verificación de tokens CSRF sin estado."""
+
+    def __init__(
+        self,
+        keys=None,
+        max_age: float = CSRF_TOKEN_EXPIRE_HOURS * 3600,
+        one_time: bool = CSRF_ONE_TIME,
+    ):
+        keys = keys or _load_keys()
+        self._keys = {hashlib.sha256(k).hexdigest()[:8]: k for k in keys}
+        self._current_kid = hashlib.sha256(keys[0]).hexdigest()[:8]
+        self.max_age = max_age
+        self.replay_filter = ReplayFilter(max_age) if one_time else None
+
+    @staticmethod
+    def _sign(key: bytes, body: str, session_id: str) -> bytes:
+        return hmac.new(key, f"{body}|{session_id}".encode("utf-8"), hashlib.sha256).digest()[:16]
+
+    def issue(self, session_id: str, now: float = None) -> str:
+        """Emitir un token ligado a ``session_id``."""
+        issued = int(time.time() if now is None else now)
+        body = f"{self._current_kid}.{issued:x}.{secrets.token_urlsafe(9)}"
+        return f"{body}.{_b64(self._sign(self._keys[self._current_kid], body, session_id))}"
+
+    def verify(self, token: Optional[str], session_id: str, now: float = None) -> bool:
+        """Comprobar firma, sesión y caducidad; con uso único, consumir el token."""
+        if not token or not isinstance(token, str):
+            return False
+        try:
+            body, signature = token.rsplit(".", 1)
+            kid, issued_hex, _ = body.split(".", 2)
+            issued = int(issued_hex, 16)
+        except ValueError:
+            return False
+        key = self._keys.get(kid)
+        if key is None:
+            return False
+
+        expected = _b64(self._sign(key, body, session_id))
+        # En bytes: compare_digest rechaza str con caracteres no ASCII
+        if not hmac.compare_digest(expected.encode("ascii"), signature.encode("utf-8")):
+            return False
+
+        now = time.time() if now is None else now
+        if not (issued <= now + 60 and now - issued < self.max_age):
+            return False
+
+        if self.replay_filter is not None:
+            token_id = int.from_bytes(hashlib.blake2b(signature.encode("ascii"), digest_size=8).digest(), "big")
+            return self.replay_filter.check_and_add(token_id, issued, now)
+        return True
+
+
+csrf = CsrfProtector()
+
+
+def csrf_protect(fn):
+    """Decorador de protección CSRF para event handlers de estado.
+
+    El token llega como argumento ``csrf_token`` del evento y debe estar
+    firmado para el ``client_token`` de la sesión. Con un token inválido se
+    fija ``error`` y el handler devuelve False sin ejecutarse. Tras verificar
+    se emite un token nuevo en ``state.csrf_token``, ya que el anterior queda
+    consumido con ``CSRF_ONE_TIME``.
+    """
+    @wraps(fn)
+    async def wrapper(self, *args, csrf_token: Optional[str] = None, **kwargs):
+        session_id = self.router.session.client_token
+        valid = csrf.verify(csrf_token, session_id)
+        self.csrf_token = csrf.issue(session_id)
+        if not valid:
+            self.error = "Invalid or missing CSRF token"
+            return False
+        return await fn(self, *args, **kwargs)
+    return wrapper
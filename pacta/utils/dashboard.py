@@ -0,0 +1,200 @@
+"""
+Datos de los widgets del dashboard con caché por usuario.
+
+Cada widget se calcula con su propia consulta acotada al usuario, de modo que
+el estado pueda lanzarlos como eventos en segundo plano independientes y
+mostrar cada uno en cuanto termina:
+
+- ``expiring``: contratos vigentes que vencen en los próximos
+  ``DASHBOARD_EXPIRING_DAYS`` días;
+- ``pending``: borradores pendientes de aprobar y avisos sin descartar;
+- ``totals``: número de contratos e importe por estado.
+
+Los resultados se guardan por (usuario, widget) durante ``DASHBOARD_CACHE_TTL``
+segundos. Los cambios de contratos hechos con el ORM invalidan las entradas de
+su propietario al confirmar la sesión; los avisos, que se escriben con SQL
+Core, llaman a ``invalidate_dashboard``. Una lectura que empezó antes de una
+invalidación no guarda su resultado (contador de generación por usuario).
+
+Como la caché de usuarios, es local a cada worker: el TTL acota cuánto tarda
+otro worker en ver un cambio.
+"""
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import BigInteger, cast, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.models.reminder import ReminderModel
+from pacta.utils.database import run_db
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))  # 0 desactiva la caché
+DASHBOARD_CACHE_MAX_SIZE = int(os.getenv("DASHBOARD_CACHE_MAX_SIZE", "30000"))
+DASHBOARD_EXPIRING_DAYS = int(os.getenv("DASHBOARD_EXPIRING_DAYS", "30"))
+# Filas de las listas de cada widget
+DASHBOARD_LIST_SIZE = 5
+
+_c = ContractModel.__table__
+
+
+def _contract_rows(rows) -> list:
+    return [
+        {"id": row.id, "reference": row.reference, "title": row.title, "counterparty": row.counterparty,
+         "date": f"{row.day:%d/%m/%Y}"}
+        for row in rows
+    ]
+
+
+def load_expiring(db: Session, owner_id: int, today: date) -> dict:
+    window = (
+        _c.c.owner_id == owner_id,
+        _c.c.status == ContractStatus.ACTIVE,
+        _c.c.end_date.between(today, today + timedelta(days=DASHBOARD_EXPIRING_DAYS)),
+    )
+    rows = db.execute(
+        select(_c.c.id, _c.c.reference, _c.c.title, _c.c.counterparty, _c.c.end_date.label("day"))
+        .where(*window).order_by(_c.c.end_date, _c.c.id).limit(DASHBOARD_LIST_SIZE)
+    )
+    return {
+        "expiring": _contract_rows(rows),
+        "expiring_count": db.execute(select(func.count()).select_from(_c).where(*window)).scalar(),
+    }
+
+
+def load_pending(db: Session, owner_id: int, today: date) -> dict:
+    drafts = (_c.c.owner_id == owner_id, _c.c.status == ContractStatus.DRAFT)
+    rows = db.execute(
+        select(_c.c.id, _c.c.reference, _c.c.title, _c.c.counterparty, _c.c.start_date.label("day"))
+        .where(*drafts).order_by(_c.c.id.desc()).limit(DASHBOARD_LIST_SIZE)
+    )
+    return {
+        "drafts": _contract_rows(rows),
+        "draft_count": db.execute(select(func.count()).select_from(_c).where(*drafts)).scalar(),
+        "reminder_count": db.execute(
+            select(func.count()).select_from(ReminderModel)
+            .where(ReminderModel.owner_id == owner_id, ReminderModel.dismissed_at.is_(None))
+        ).scalar(),
+    }
+
+
+def load_totals(db: Session, owner_id: int, today: date) -> dict:
+    amount = func.sum(cast(func.round(func.coalesce(_c.c.value, 0) * 100), BigInteger))
+    rows = db.execute(
+        select(_c.c.status, _c.c.currency, func.count().label("contracts"), amount.label("value_cents"))
+        .where(_c.c.owner_id == owner_id)
+        .group_by(_c.c.status, _c.c.currency)
+        .order_by(_c.c.status, _c.c.currency)
+    )
+    return {
+        "totals": [
+            {"key": row.status, "currency": row.currency, "contracts": row.contracts,
+             "value": f"{(row.value_cents or 0) / 100:,.2f}"}
+            for row in rows
+        ],
+    }
+
+
+WIDGETS = {
+    "expiring": load_expiring,
+    "pending": load_pending,
+    "totals": load_totals,
+}
+
+
+class DashboardCache:
+    """Caché TTL de los datos de cada widget por usuario."""
+
+    def __init__(self, ttl: float = DASHBOARD_CACHE_TTL, max_size: int = DASHBOARD_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def generation(self, owner_id: int) -> int:
+        with self._lock:
+            return self._generations.get(owner_id, 0)
+
+    def get(self, owner_id: int, widget: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get((owner_id, widget))
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, owner_id: int, widget: str, data: dict, generation: int):
+        """Guardar ``data`` salvo que el usuario se haya invalidado desde ``generation``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(owner_id, 0) != generation:
+                return
+            # Al llenarse se vacía: más barato que llevar un LRU y el TTL es corto
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[owner_id, widget] = (data, time.monotonic() + self.ttl)
+
+    def invalidate(self, owner_id: int):
+        with self._lock:
+            self._generations[owner_id] = self._generations.get(owner_id, 0) + 1
+            for widget in WIDGETS:
+                self._entries.pop((owner_id, widget), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+dashboard_cache = DashboardCache()
+
+
+async def widget_data(widget: str, owner_id: int, today: date = None) -> dict:
+    """Datos de ``widget`` para el usuario, de la caché o de la base de datos."""
+    data = dashboard_cache.get(owner_id, widget)
+    if data is not None:
+        return data
+    generation = dashboard_cache.generation(owner_id)
+    data = await run_db(WIDGETS[widget], owner_id, today or date.today())
+    dashboard_cache.put(owner_id, widget, data, generation)
+    return data
+
+
+def invalidate_dashboard(owner_id: int):
+    """Hook de invalidación para escrituras que no pasan por el ORM."""
+    dashboard_cache.invalidate(owner_id)
+
+
+@event.listens_for(ContractModel, "after_insert")
+@event.listens_for(ContractModel, "after_update")
+@event.listens_for(ContractModel, "after_delete")
+def _track_owner(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    owners = session.info.setdefault("dashboard_owners", set())
+    owners.add(target.owner_id)
+    # Si el contrato cambió de propietario, el anterior también queda obsoleto
+    owners.update(inspect(target).attrs.owner_id.history.deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_owners(session):
+    for owner_id in session.info.pop("dashboard_owners", ()):
+        invalidate_dashboard(owner_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_owners(session, previous_transaction):
+    session.info.pop("dashboard_owners", None)
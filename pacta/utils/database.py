@@ -1,48 +1,418 @@
-from sqlalchemy import create_engine
+import asyncio
+import bisect
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import NoSuchModuleError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from pacta.models.user import Base, UserModel
 from sqlalchemy.orm import Session
-import bcrypt
+from pacta.utils.passwords import hash_password_sync
+from pacta.utils.query_stats import instrument_queries
+
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+load_dotenv()
+
+# Configuración de la base de datos (ver example.env)
+SQLALCHEMY_DATABASE_URL = os.getenv("DB_URL") or "sqlite:///./pacta.db"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Hilos para ejecutar sesiones síncronas cuando no hay driver async disponible
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))
+# Sesiones abiertas más tiempo que esto generan un aviso en el log, al cerrarse
+# o, si siguen abiertas, en el siguiente ``session_stats.snapshot()``
+DB_SESSION_WARN_SECONDS = float(os.getenv("DB_SESSION_WARN_SECONDS", "5"))
+
+logger = logging.getLogger(__name__)
+
+# PRAGMAs aplicados a cada conexión SQLite nueva
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # lectores concurrentes con un escritor
+    "synchronous": "NORMAL",  # seguro con WAL, evita un fsync por commit
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),  # negativo = KiB
+}
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def _engine_options(url, pool_size, max_overflow, pool_recycle, pool_pre_ping):
+    options = {"pool_recycle": pool_recycle, "pool_pre_ping": pool_pre_ping}
+    is_sqlite = url.get_backend_name() == "sqlite"
+
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+    if is_sqlite and url.database in (None, "", ":memory:"):
+        # Una base de datos en memoria solo existe dentro de su conexión
+        options["poolclass"] = StaticPool
+    else:
+        options.update(pool_size=pool_size, max_overflow=max_overflow)
+    return options
+
+def create_db_engine(
+    url: str = SQLALCHEMY_DATABASE_URL,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW,
+    pool_recycle: int = DB_POOL_RECYCLE,
+    pool_pre_ping: bool = DB_POOL_PRE_PING,
+    tune_sqlite: bool = True,
+    **kwargs,
+):
+    """Crear un motor SQLAlchemy con pool configurado.
+
+    Para SQLite se aplican los PRAGMAs de ``SQLITE_PRAGMAS`` en cada conexión
+    (WAL, synchronous=NORMAL, busy_timeout, mmap_size y cache_size).
+    """
+    url = make_url(url)
+    options = _engine_options(url, pool_size, max_overflow, pool_recycle, pool_pre_ping)
+    options.update(kwargs)
+    new_engine = create_engine(url, **options)
+    if url.get_backend_name() == "sqlite" and tune_sqlite:
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+def async_database_url(url: str = SQLALCHEMY_DATABASE_URL):
+    """Traducir una URL síncrona a su driver async (aiosqlite / asyncpg), o None."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # Otro motor abriría otra base de datos en memoria distinta
+        return None
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    return None
+
+def create_async_db_engine(
+    url: str = SQLALCHEMY_DATABASE_URL,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW,
+    pool_recycle: int = DB_POOL_RECYCLE,
+    pool_pre_ping: bool = DB_POOL_PRE_PING,
+    tune_sqlite: bool = True,
+    **kwargs,
+):
+    """Crear el motor async equivalente a ``create_db_engine``.
+
+    Devuelve None si el driver async no está instalado; en ese caso ``run_db``
+    ejecuta sesiones síncronas en un pool de hilos acotado.
+    """
+    async_url = async_database_url(url)
+    if async_url is None:
+        return None
+    options = _engine_options(async_url, pool_size, max_overflow, pool_recycle, pool_pre_ping)
+    options.update(kwargs)
+    try:
+        new_engine = create_async_engine(async_url, **options)
+    except (ImportError, NoSuchModuleError):
+        return None
+    if async_url.get_backend_name() == "sqlite" and tune_sqlite:
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+class SessionStats:
+    """Contadores de sesiones y de conexiones prestadas por el pool.
+
+    Las sesiones abiertas se registran con su hora de apertura, de modo que
+    ``snapshot`` (lo llama ``/metrics`` en cada lectura) detecta también las
+    que siguen abiertas pasado ``warn_after``, que nunca llegarían a cerrarse
+    si se han perdido. Cada sesión cuenta una sola vez como larga.
+    """
+
+    # Límites superiores (segundos) de los cubos del histograma de préstamo
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+    def __init__(self, warn_after: float = DB_SESSION_WARN_SECONDS):
+        self.warn_after = warn_after
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # id -> hora de apertura de las sesiones abiertas
+            self._open = {}
+            # Sesiones abiertas ya avisadas como largas
+            self._reported = set()
+            self.sessions_total = 0
+            self.long_lived_sessions = 0
+            self.checked_out = 0
+            self.checkouts_total = 0
+            self.checkout_seconds_sum = 0.0
+            self.checkout_buckets = [0] * len(self.BUCKETS)
+
+    @property
+    def open_sessions(self) -> int:
+        return len(self._open)
+
+    def session_opened(self) -> int:
+        """Registrar una sesión; devuelve el identificador para ``session_closed``."""
+        session_id = next(self._ids)
+        with self._lock:
+            self._open[session_id] = time.perf_counter()
+            self.sessions_total += 1
+        return session_id
+
+    def session_closed(self, session_id: int):
+        with self._lock:
+            opened_at = self._open.pop(session_id, None)
+            if opened_at is None:
+                return
+            lifetime = time.perf_counter() - opened_at
+            reported = session_id in self._reported
+            self._reported.discard(session_id)
+            warn = lifetime > self.warn_after and not reported
+            if warn:
+                self.long_lived_sessions += 1
+        if warn:
+            logger.warning("Sesión de base de datos abierta durante %.2fs", lifetime)
+
+    def check_open_sessions(self) -> list:
+        """Edades (segundos) de las sesiones abiertas más de ``warn_after``; avisa de las nuevas."""
+        now = time.perf_counter()
+        with self._lock:
+            stale = {session_id: now - opened_at for session_id, opened_at in self._open.items()
+                     if now - opened_at > self.warn_after}
+            new = [age for session_id, age in stale.items() if session_id not in self._reported]
+            self._reported.update(stale)
+            self.long_lived_sessions += len(new)
+        for age in new:
+            logger.warning("Sesión de base de datos abierta desde hace %.2fs sin cerrarse", age)
+        return sorted(stale.values(), reverse=True)
+
+    def connection_checked_out(self):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts_total += 1
+
+    def connection_checked_in(self, duration: float):
+        with self._lock:
+            self.checked_out -= 1
+            self.checkout_seconds_sum += duration
+            self.checkout_buckets[bisect.bisect_left(self.BUCKETS, duration)] += 1
+
+    def snapshot(self) -> dict:
+        stale = self.check_open_sessions()
+        with self._lock:
+            return {
+                "open_sessions": len(self._open),
+                "stale_sessions": len(stale),
+                "oldest_session_seconds": stale[0] if stale else 0.0,
+                "sessions_total": self.sessions_total,
+                "long_lived_sessions": self.long_lived_sessions,
+                "checked_out": self.checked_out,
+                "checkouts_total": self.checkouts_total,
+                "checkout_seconds_sum": self.checkout_seconds_sum,
+                "checkout_buckets": dict(zip(self.BUCKETS, self.checkout_buckets)),
+            }
+
+session_stats = SessionStats()
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./pacta.db"
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+    session_stats.connection_checked_out()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        session_stats.connection_checked_in(time.perf_counter() - checked_out_at)
+
+def instrument_engine(target):
+    """Registrar los eventos del pool que alimentan ``session_stats``."""
+    event.listen(target, "checkout", _on_checkout)
+    event.listen(target, "checkin", _on_checkin)
+
+engine = create_db_engine()
+instrument_engine(engine)
+instrument_queries(engine)
+# expire_on_commit=False: los objetos siguen siendo legibles al cerrar la unidad de trabajo
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = create_async_db_engine()
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+    instrument_queries(async_engine.sync_engine)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="pacta-db")
+
+# Alembic se importa en las funciones que lo usan: solo hace falta al arrancar
+# el backend (``init_db``) y en la CLI, no en cada import de este módulo.
+def alembic_config(connection=None) -> "Config":
+    """Configuración de Alembic apuntando a las migraciones del paquete."""
+    from alembic.config import Config
+
+    cfg = Config()
+    cfg.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        cfg.attributes["connection"] = connection
+    return cfg
+
+def schema_revision():
+    """Devuelve (revisión actual, revisión head) con una sola consulta a la base de datos."""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    with engine.connect() as conn:
+        current = MigrationContext.configure(conn).get_current_revision()
+    return current, head
 
 def init_db():
-    """Inicializar la base de datos y crear usuario administrador si no existe."""
-    # Crear las tablas si no existen
-    Base.metadata.create_all(bind=engine)
-    
-    # Verificar si ya existe un admin y crearlo si no existe
+    """Preparar el esquema de la base de datos una única vez al arrancar.
+
+    Si el esquema ya está en la última revisión solo se consulta la tabla
+    ``alembic_version``; en caso contrario se aplican las migraciones pendientes.
+    El usuario administrador se crea explícitamente con ``python -m pacta.cli create-admin``.
+    """
+    current, head = schema_revision()
+    if current == head:
+        return
+
+    from alembic import command
+
+    with engine.begin() as conn:
+        cfg = alembic_config(conn)
+        if current is None and inspect(conn).has_table(UserModel.__tablename__):
+            # Base de datos creada con create_all antes de usar migraciones
+            command.stamp(cfg, "0001")
+        command.upgrade(cfg, "head")
+
+def create_admin(username: str = "admin", email: str = "admin@pacta.app", password: str = "admin123") -> bool:
+    """Crear el usuario administrador si no existe.
+
+    Returns:
+        bool: True si se creó el usuario, False si ya existía
+    """
+    with session_scope() as db:
+        admin = db.query(UserModel).filter_by(username=username).first()
+        if admin:
+            return False
+
+        admin_user = UserModel(
+            username=username,
+            email=email,
+            password_hash=hash_password_sync(password)
+        )
+
+        db.add(admin_user)
+        return True
+
+@contextmanager
+def session_scope(commit: bool = True):
+    """Unidad de trabajo: confirma al salir, revierte ante una excepción y siempre cierra.
+
+    Ejemplo:
+        with session_scope() as db:
+            db.add(obj)
+    """
     db = SessionLocal()
+    session_id = session_stats.session_opened()
     try:
-        admin = db.query(UserModel).filter_by(username="admin").first()
-        if not admin:
-            # Crear usuario admin
-            password = "admin123"  # Cambia esto por una contraseña más segura en producción
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-            
-            admin_user = UserModel(
-                username="admin",
-                email="admin@pacta.app",
-                password_hash=password_hash.decode('utf-8')
-            )
-            
-            db.add(admin_user)
+        yield db
+        if commit:
             db.commit()
-            print("Usuario administrador creado exitosamente!")
-    except Exception as e:
-        print(f"Error al crear el usuario administrador: {str(e)}")
+    except BaseException:
+        db.rollback()
+        raise
     finally:
         db.close()
+        session_stats.session_closed(session_id)
+
+def with_session(fn):
+    """Decorador que ejecuta ``fn(db, *args, **kwargs)`` dentro de ``session_scope``."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with session_scope() as db:
+            return fn(db, *args, **kwargs)
+    return wrapper
 
 def get_db():
-    """Obtener una sesión de la base de datos."""
-    db = SessionLocal()
+    """Obtener una sesión de la base de datos.
+
+    Pensado para inyección de dependencias (FastAPI); en el resto del código
+    usar ``session_scope`` o ``run_db``, que garantizan el cierre.
+    """
+    with session_scope(commit=False) as db:
+        yield db
+
+@asynccontextmanager
+async def async_session_scope(commit: bool = True):
+    """Equivalente async de ``session_scope`` (requiere aiosqlite o asyncpg)."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("No hay driver async disponible para " + engine.url.render_as_string())
+    db = AsyncSessionLocal()
+    session_id = session_stats.session_opened()
     try:
         yield db
+        if commit:
+            await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
     finally:
-        db.close()
+        await db.close()
+        session_stats.session_closed(session_id)
+
+@asynccontextmanager
+async def get_async_db():
+    """Obtener una ``AsyncSession`` (requiere aiosqlite o asyncpg)."""
+    async with async_session_scope(commit=False) as db:
+        yield db
+
+def _run_sync_session(fn, args, kwargs):
+    with session_scope() as db:
+        return fn(db, *args, **kwargs)
+
+async def run_db(fn, *args, **kwargs):
+    """Ejecutar ``fn(db, *args, **kwargs)`` como unidad de trabajo sin bloquear el event loop.
+
+    Con driver async se usa ``AsyncSession.run_sync``: la E/S se delega al
+    driver y el event loop sigue atendiendo otros eventos. Sin él, ``fn`` se
+    ejecuta con una sesión síncrona en un pool de hilos acotado. La sesión se
+    confirma si ``fn`` termina sin errores y se revierte en caso contrario.
+    """
+    if AsyncSessionLocal is not None:
+        async with async_session_scope() as db:
+            return await db.run_sync(fn, *args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_db_executor, ctx.run, _run_sync_session, fn, args, kwargs)
+
+def checked_out_connections() -> int:
+    """Conexiones prestadas actualmente por los pools síncrono y async."""
+    pools = [engine.pool]
+    if async_engine is not None:
+        pools.append(async_engine.sync_engine.pool)
+    # StaticPool (SQLite en memoria) no lleva la cuenta
+    return sum(pool.checkedout() for pool in pools if hasattr(pool, "checkedout"))
@@ -0,0 +1,138 @@
+"""
+Almacén de documentos direccionado por contenido.
+
+Las subidas se escriben en disco por bloques mientras se calcula su SHA-256, sin
+tener nunca el fichero entero en memoria: los trozos que llegan de la petición
+se acumulan hasta ``DOCUMENT_CHUNK_SIZE`` y cada bloque se hashea y se escribe
+en un hilo para no bloquear el event loop. Al terminar, el fichero temporal se
+mueve de forma atómica a ``<raíz>/ab/cd/abcd…`` (dos niveles de 256
+directorios); si ese hash ya existe se descarta el temporal, así que los
+ficheros idénticos se guardan una sola vez.
+
+Las descargas se sirven con ``FileResponse`` desde ``pacta.api``: admite
+peticiones ``Range`` y, con un servidor que implemente
+``http.response.pathsend`` (Granian), el envío lo hace el propio servidor con
+``sendfile`` sin copiar el contenido al proceso Python.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterable
+
+DOCUMENTS_DIR = os.getenv("DOCUMENTS_DIR", "./documents")
+DOCUMENT_CHUNK_SIZE = int(os.getenv("DOCUMENT_CHUNK_SIZE", str(1024 * 1024)))
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", str(5 * 1024 ** 3)))
+
+
+class DocumentTooLarge(Exception):
+    """La subida supera ``DOCUMENT_MAX_BYTES``."""
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    size: int
+    path: Path
+    # False si el contenido ya estaba en el almacén
+    created: bool
+
+
+class _BlobWriter:
+    """Fichero temporal que se hashea a medida que se escribe."""
+
+    def __init__(self, tmp_dir: Path):
+        fd, name = tempfile.mkstemp(dir=tmp_dir, prefix="upload-")
+        self.file = os.fdopen(fd, "wb")
+        self.path = Path(name)
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk):
+        self.hash.update(chunk)
+        self.file.write(chunk)
+        self.size += len(chunk)
+
+    def finish(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    def discard(self):
+        if not self.file.closed:
+            self.file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class DocumentStore:
+    """Ficheros guardados por SHA-256 bajo un directorio raíz."""
+
+    def __init__(
+        self,
+        root=DOCUMENTS_DIR,
+        chunk_size: int = DOCUMENT_CHUNK_SIZE,
+        max_bytes: int = DOCUMENT_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        # Temporales en el mismo sistema de ficheros: el rename es atómico
+        self.tmp_dir = self.root / "tmp"
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.path_for(sha256).is_file()
+
+    def _commit(self, writer: _BlobWriter) -> StoredBlob:
+        writer.finish()
+        sha256 = writer.hash.hexdigest()
+        target = self.path_for(sha256)
+        if target.exists():
+            writer.discard()
+            return StoredBlob(sha256, writer.size, target, created=False)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(writer.path, target)
+        return StoredBlob(sha256, writer.size, target, created=True)
+
+    async def save(self, chunks: AsyncIterable[bytes]) -> StoredBlob:
+        """Guardar el contenido de ``chunks`` (p. ej. ``request.stream()``)."""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        writer = await asyncio.to_thread(_BlobWriter, self.tmp_dir)
+        buffer = bytearray()
+        received = 0
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise DocumentTooLarge(f"El documento supera {self.max_bytes} bytes")
+                buffer += chunk
+                if len(buffer) >= self.chunk_size:
+                    block, buffer = buffer, bytearray()
+                    await asyncio.to_thread(writer.write, block)
+            if buffer:
+                await asyncio.to_thread(writer.write, buffer)
+            return await asyncio.to_thread(self._commit, writer)
+        except BaseException:
+            await asyncio.to_thread(writer.discard)
+            raise
+
+    def save_file(self, source) -> StoredBlob:
+        """Versión síncrona para un fichero abierto en binario (CLI, importaciones)."""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        writer = _BlobWriter(self.tmp_dir)
+        try:
+            while chunk := source.read(self.chunk_size):
+                if writer.size + len(chunk) > self.max_bytes:
+                    raise DocumentTooLarge(f"El documento supera {self.max_bytes} bytes")
+                writer.write(chunk)
+            return self._commit(writer)
+        except BaseException:
+            writer.discard()
+            raise
+
+
+document_store = DocumentStore()
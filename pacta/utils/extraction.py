@@ -0,0 +1,309 @@
+"""
+Pipeline de extracción de texto de los documentos de contratos.
+
+La cola es la propia tabla ``documents`` (columnas ``extraction_*``, migración
+0005): cada documento nuevo entra como ``pending``. En cada vuelta el pipeline
+
+1. marca como ``failed`` los documentos que se quedaron en ``processing`` más
+   de ``EXTRACTION_STALE_SECONDS`` tras agotar sus intentos, y vuelve a tomar
+   los que aún tienen intentos: así se reanuda tras un reinicio o la muerte
+   de un worker;
+2. reclama hasta ``EXTRACTION_BATCH_SIZE`` documentos con un ``UPDATE``
+   condicional por fila, de modo que varios workers del backend pueden
+   ejecutar el pipeline a la vez sin procesar dos veces el mismo documento;
+3. reutiliza el texto de otro documento con el mismo SHA-256 ya extraído y
+   envía el resto a un pool de procesos (``pacta.utils.extractors``), con
+   límite de memoria por proceso y tiempo máximo por fichero;
+4. guarda los resultados del lote en una transacción: un ``executemany`` sobre
+   ``documents`` y otro que recalcula la columna ``documents`` del índice de
+   búsqueda de los contratos afectados.
+
+Se usa ``multiprocessing.Pool`` y no ``ProcessPoolExecutor`` porque permite
+terminar los procesos de un lote que no responde (``terminate``) y reciclarlos
+cada ``EXTRACTION_TASKS_PER_CHILD`` ficheros para acotar fugas de memoria.
+
+El pipeline corre como lifespan task de la app (``pacta.pacta``) y se despierta
+al subir un documento; ``python -m pacta.cli extract-documents`` vacía la cola
+desde la línea de comandos.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.engine import Engine
+
+from pacta.models.document import DocumentModel, ExtractionStatus
+from pacta.utils import search
+from pacta.utils.documents import DocumentStore, document_store
+from pacta.utils.extractors import extract_document, init_worker
+
+EXTRACTION_ENABLED = os.getenv("EXTRACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+EXTRACTION_BATCH_SIZE = int(os.getenv("EXTRACTION_BATCH_SIZE", "16"))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "60"))  # segundos por fichero
+EXTRACTION_MEMORY_MB = int(os.getenv("EXTRACTION_MEMORY_MB", "1024"))  # por proceso, 0 = sin límite
+EXTRACTION_MAX_ATTEMPTS = int(os.getenv("EXTRACTION_MAX_ATTEMPTS", "3"))
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", "2000000"))
+EXTRACTION_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_TASKS_PER_CHILD", "100"))
+EXTRACTION_POLL_SECONDS = float(os.getenv("EXTRACTION_POLL_SECONDS", "10"))
+EXTRACTION_STALE_SECONDS = float(os.getenv("EXTRACTION_STALE_SECONDS", "300"))
+
+# Margen sobre EXTRACTION_TIMEOUT antes de dar por colgado un proceso del pool
+_HARD_TIMEOUT_GRACE = 10.0
+
+logger = logging.getLogger(__name__)
+
+_t = DocumentModel.__table__
+_SAVE_RESULT = (
+    update(_t)
+    .where(and_(_t.c.id == bindparam("document_id"), _t.c.extraction_status == ExtractionStatus.PROCESSING))
+    .values(
+        extraction_status=bindparam("status"),
+        extracted_text=bindparam("text"),
+        extraction_error=bindparam("error"),
+        extracted_at=bindparam("finished_at"),
+        extraction_claimed_at=None,
+    )
+)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def claim_documents(conn, limit: int = EXTRACTION_BATCH_SIZE, max_attempts: int = EXTRACTION_MAX_ATTEMPTS,
+                    stale_after: float = EXTRACTION_STALE_SECONDS) -> List[dict]:
+    """Reclamar documentos pendientes (o abandonados) y devolverlos como dicts."""
+    now = _now()
+    stale = and_(
+        _t.c.extraction_status == ExtractionStatus.PROCESSING,
+        _t.c.extraction_claimed_at < now - timedelta(seconds=stale_after),
+    )
+    conn.execute(
+        update(_t)
+        .where(and_(stale, _t.c.extraction_attempts >= max_attempts))
+        .values(extraction_status=ExtractionStatus.FAILED, extraction_claimed_at=None,
+                extraction_error="Abandonado tras agotar los intentos")
+    )
+    claimable = and_(
+        or_(_t.c.extraction_status == ExtractionStatus.PENDING, stale),
+        _t.c.extraction_attempts < max_attempts,
+    )
+    candidates = conn.execute(
+        select(_t.c.id, _t.c.contract_id, _t.c.sha256, _t.c.filename, _t.c.content_type,
+               _t.c.extraction_attempts)
+        .where(claimable).order_by(_t.c.id).limit(limit)
+    ).all()
+    claimed = []
+    for row in candidates:
+        # Otro worker puede haberlo reclamado entre el SELECT y el UPDATE
+        result = conn.execute(
+            update(_t).where(and_(_t.c.id == row.id, claimable))
+            .values(extraction_status=ExtractionStatus.PROCESSING, extraction_claimed_at=now,
+                    extraction_attempts=_t.c.extraction_attempts + 1)
+        )
+        if result.rowcount == 1:
+            claimed.append({**row._mapping, "extraction_attempts": row.extraction_attempts + 1})
+    return claimed
+
+
+def known_texts(conn, sha256s) -> dict:
+    """Texto ya extraído de otros documentos con el mismo contenido, por SHA-256."""
+    if not sha256s:
+        return {}
+    rows = conn.execute(
+        select(_t.c.sha256, func.min(_t.c.extracted_text))
+        .where(and_(_t.c.sha256.in_(set(sha256s)), _t.c.extraction_status == ExtractionStatus.DONE))
+        .group_by(_t.c.sha256)
+    )
+    return dict(rows.all())
+
+
+def save_results(conn, documents: List[dict], results: List[tuple],
+                 max_attempts: int = EXTRACTION_MAX_ATTEMPTS) -> None:
+    """Guardar los resultados de un lote y actualizar el índice de búsqueda."""
+    by_id = {document["id"]: document for document in documents}
+    now = _now()
+    params = []
+    for document_id, status, text, error in results:
+        document = by_id[document_id]
+        # Los fallos con intentos restantes vuelven a la cola
+        if status == ExtractionStatus.FAILED and document["extraction_attempts"] < max_attempts:
+            status = ExtractionStatus.PENDING
+        params.append({"document_id": document_id, "status": status, "text": text,
+                       "error": error, "finished_at": now})
+    conn.execute(_SAVE_RESULT, params)
+    search.update_documents_text(conn, (by_id[p["document_id"]]["contract_id"]
+                                        for p in params if p["status"] == ExtractionStatus.DONE))
+
+
+def extraction_backlog(db) -> dict:
+    """Documentos por extraer, en curso y fallidos (para la interfaz)."""
+    counts = dict(db.execute(
+        select(_t.c.extraction_status, func.count())
+        .where(_t.c.extraction_status.in_(
+            (ExtractionStatus.PENDING, ExtractionStatus.PROCESSING, ExtractionStatus.FAILED)
+        ))
+        .group_by(_t.c.extraction_status)
+    ).all())
+    return {status: counts.get(status, 0) for status in
+            (ExtractionStatus.PENDING, ExtractionStatus.PROCESSING, ExtractionStatus.FAILED)}
+
+
+class ExtractionPipeline:
+    """Consume la cola de ``documents`` con un pool de procesos."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        store: DocumentStore = document_store,
+        workers: int = EXTRACTION_WORKERS,
+        batch_size: int = EXTRACTION_BATCH_SIZE,
+        timeout: float = EXTRACTION_TIMEOUT,
+        memory_mb: int = EXTRACTION_MEMORY_MB,
+        max_chars: int = EXTRACTION_MAX_CHARS,
+    ):
+        # None: el motor de pacta.utils.database, que se importa al usarse
+        self._engine = engine
+        self.store = store
+        self.workers = workers
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.memory_limit = memory_mb * 1024 * 1024
+        self.max_chars = max_chars
+        self._pool = None
+        self._wake: Optional[asyncio.Event] = None
+        # Instantes de los últimos documentos procesados, para el ritmo
+        self._finished = deque(maxlen=1000)
+        self.processed = 0
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from pacta.utils.database import engine
+            self._engine = engine
+        return self._engine
+
+    def wake(self):
+        """Avisar de que hay documentos nuevos (desde el event loop)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def rate(self, window: float = 60.0) -> float:
+        """Documentos por segundo procesados por este proceso en la última ``window``."""
+        since = time.monotonic() - window
+        return sum(1 for finished in self._finished if finished >= since) / window
+
+    def _start_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.workers, initializer=init_worker, initargs=(self.memory_limit,),
+                maxtasksperchild=EXTRACTION_TASKS_PER_CHILD,
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _claim(self):
+        with self.engine.begin() as conn:
+            documents = claim_documents(conn, self.batch_size)
+            texts = known_texts(conn, [document["sha256"] for document in documents])
+        return documents, texts
+
+    def _save(self, documents, results):
+        with self.engine.begin() as conn:
+            save_results(conn, documents, results)
+
+    async def _extract(self, document: dict):
+        """Extraer un documento en el pool sin bloquear el event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def done(result):
+            loop.call_soon_threadsafe(future.set_result, result)
+
+        def failed(error):
+            loop.call_soon_threadsafe(
+                future.set_result, (document["id"], ExtractionStatus.FAILED, None, repr(error)[:500])
+            )
+
+        self._start_pool().apply_async(
+            extract_document,
+            (document["id"], str(self.store.path_for(document["sha256"])), document["filename"],
+             document["content_type"], self.timeout, self.max_chars),
+            callback=done, error_callback=failed,
+        )
+        try:
+            return await asyncio.wait_for(future, self.timeout + _HARD_TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            # El temporizador del proceso no saltó (bucle en C) o el proceso murió
+            return document["id"], "hung", None, f"Sin respuesta en {self.timeout + _HARD_TIMEOUT_GRACE:g} s"
+
+    async def process_batch(self) -> int:
+        """Reclamar y procesar un lote; devuelve el número de documentos."""
+        documents, texts = await asyncio.to_thread(self._claim)
+        if not documents:
+            return 0
+        results, pending = [], []
+        for document in documents:
+            if document["sha256"] in texts:
+                results.append((document["id"], ExtractionStatus.DONE, texts[document["sha256"]], None))
+            else:
+                pending.append(document)
+        extracted = await asyncio.gather(*(self._extract(document) for document in pending))
+        if any(status == "hung" for _, status, _, _ in extracted):
+            # Los procesos colgados siguen ocupando el pool: se sustituye entero
+            await asyncio.to_thread(self.close)
+        results += [
+            (document_id, ExtractionStatus.FAILED if status == "hung" else status, text, error)
+            for document_id, status, text, error in extracted
+        ]
+        await asyncio.to_thread(self._save, documents, results)
+
+        finished = time.monotonic()
+        self._finished.extend([finished] * len(results))
+        self.processed += len(results)
+        for document_id, status, _, error in results:
+            if status == ExtractionStatus.FAILED:
+                logger.warning("Extracción fallida del documento %s: %s", document_id, error)
+        return len(results)
+
+    async def drain(self) -> int:
+        """Procesar lotes hasta vaciar la cola; devuelve el total procesado."""
+        total = 0
+        while processed := await self.process_batch():
+            total += processed
+        return total
+
+    async def run(self):
+        """Bucle de la lifespan task: vaciar la cola y esperar documentos nuevos."""
+        if not EXTRACTION_ENABLED:
+            return
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await self.drain()
+                except Exception:
+                    logger.exception("Error en el pipeline de extracción")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), EXTRACTION_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            self._wake = None
+            await asyncio.to_thread(self.close)
+
+
+extraction_pipeline = ExtractionPipeline()
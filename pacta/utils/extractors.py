@@ -0,0 +1,137 @@
+"""
+Extracción de texto de documentos (PDF, DOCX y texto plano).
+
+Estas funciones se ejecutan en los procesos del pool de
+``pacta.utils.extraction`` y solo dependen de la biblioteca estándar y, para
+PDF, de ``pypdf`` (importado al usarse). Cada proceso arranca con un límite de
+memoria (``RLIMIT_AS``) y cada fichero con un temporizador: un PDF que
+explota en memoria o en tiempo falla con ``MemoryError`` o ``ExtractionTimeout``
+sin afectar al proceso principal.
+"""
+import re
+import signal
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+PDF, DOCX, TEXT = "pdf", "docx", "text"
+
+_EXTENSIONS = {".pdf": PDF, ".docx": DOCX, ".txt": TEXT, ".md": TEXT, ".csv": TEXT}
+_CONTENT_TYPES = {
+    "application/pdf": PDF,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": DOCX,
+}
+_WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Un document.xml descomprimido mayor que esto se rechaza (bombas zip)
+DOCX_MAX_XML_BYTES = 256 * 1024 * 1024
+_SPACES = re.compile(r"\s+")
+
+
+class ExtractionTimeout(Exception):
+    """La extracción de un fichero superó su tiempo máximo."""
+
+
+class UnsupportedDocument(Exception):
+    """Tipo de documento del que no se sabe extraer texto."""
+
+
+def document_kind(filename: str, content_type: str = None) -> str:
+    kind = _EXTENSIONS.get(Path(filename or "").suffix.lower()) or _CONTENT_TYPES.get(content_type or "")
+    if kind is None and (content_type or "").startswith("text/"):
+        kind = TEXT
+    if kind is None:
+        raise UnsupportedDocument(f"Tipo no soportado: {filename} ({content_type})")
+    return kind
+
+
+def _pdf_text(path, max_chars: int):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise UnsupportedDocument("PDF cifrado")
+    size = 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        size += len(text)
+        yield text
+        if size >= max_chars:
+            return
+
+
+def _docx_text(path, max_chars: int):
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("word/document.xml")
+        if info.file_size > DOCX_MAX_XML_BYTES:
+            raise ValueError(f"document.xml demasiado grande ({info.file_size} bytes)")
+        size = 0
+        # iterparse: el árbol se libera párrafo a párrafo
+        with archive.open(info) as xml:
+            for _, element in ElementTree.iterparse(xml):
+                if element.tag == f"{_WORD}t" and element.text:
+                    size += len(element.text)
+                    yield element.text
+                elif element.tag == f"{_WORD}tab":
+                    yield " "
+                elif element.tag == f"{_WORD}p":
+                    yield "\n"
+                    element.clear()
+                    if size >= max_chars:
+                        return
+
+
+def _plain_text(path, max_chars: int):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield f.read(max_chars)
+
+
+_EXTRACTORS = {PDF: _pdf_text, DOCX: _docx_text, TEXT: _plain_text}
+
+
+def extract_text(path, kind: str, max_chars: int) -> str:
+    """Texto de ``path`` con los espacios normalizados, como mucho ``max_chars`` caracteres."""
+    text = _SPACES.sub(" ", "".join(_EXTRACTORS[kind](path, max_chars)))
+    return text.strip()[:max_chars]
+
+
+def init_worker(memory_limit: int):
+    """Inicializador de cada proceso del pool."""
+    # Ctrl+C lo gestiona el proceso principal, que termina el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        import resource
+    except ImportError:  # Windows: sin límite de memoria por proceso
+        return
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout
+
+
+def extract_document(document_id: int, path: str, filename: str, content_type: str,
+                     timeout: float, max_chars: int):
+    """Tarea del pool: ``(document_id, estado, texto, error)``.
+
+    ``estado`` es ``done``, ``failed`` o ``unsupported``; nunca lanza excepciones
+    para que un fichero defectuoso no interrumpa el lote.
+    """
+    timer = hasattr(signal, "setitimer")
+    if timer:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text = extract_text(path, document_kind(filename, content_type), max_chars)
+        return document_id, "done", text, None
+    except UnsupportedDocument as e:
+        return document_id, "unsupported", None, str(e)
+    except ExtractionTimeout:
+        return document_id, "failed", None, f"Tiempo agotado ({timeout:g} s)"
+    except MemoryError:
+        return document_id, "failed", None, "Límite de memoria superado"
+    except Exception as e:
+        return document_id, "failed", None, f"{type(e).__name__}: {e}"[:500]
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
@@ -0,0 +1,199 @@
+"""
+Métricas de los event handlers de estado en formato de texto Prometheus.
+
+``instrument_states()`` recorre todas las subclases de ``rx.State`` y envuelve
+cada event handler para registrar llamadas, errores, un histograma de latencia
+y otro del tamaño del delta (número de vars modificadas). El envoltorio
+conserva el tipo de la función (síncrona, corrutina o generador) porque Reflex
+decide cómo procesar el evento según ese tipo.
+
+Cada llamada abre además un ámbito de ``query_stats`` con el nombre del
+handler, de modo que las consultas SQL se atribuyen al handler que las lanzó.
+
+``render_prometheus()`` genera la respuesta del endpoint ``/metrics``.
+"""
+import bisect
+import copy
+import inspect
+import time
+from functools import wraps
+
+from pacta.utils import query_stats
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DELTA_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Histograma acumulativo con límites fijos."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class HandlerStats:
+    __slots__ = ("calls", "errors", "latency", "delta")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.delta = Histogram(DELTA_BUCKETS)
+
+
+handler_stats = {}
+# Fuentes adicionales: funciones que devuelven líneas de texto Prometheus
+collectors = []
+
+
+def _dirty_count(state) -> int:
+    dirty = getattr(state, "dirty_vars", None)
+    return len(dirty) if dirty is not None else 0
+
+
+def instrument_handler(name: str, fn):
+    """Envolver ``fn`` registrando sus métricas bajo ``name``."""
+    if getattr(fn, "__pacta_instrumented__", False):
+        return fn
+    stats = handler_stats.setdefault(name, HandlerStats())
+    clock = time.perf_counter
+    begin = query_stats.begin
+
+    def finish(state, start, failed, scope_token):
+        query_stats.end(scope_token)
+        stats.calls += 1
+        if failed:
+            stats.errors += 1
+        stats.latency.observe(clock() - start)
+        stats.delta.observe(_dirty_count(state))
+
+    if inspect.isasyncgenfunction(fn):
+        @wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            start, failed, scope_token = clock(), True, begin(name)
+            try:
+                async for update in fn(self, *args, **kwargs):
+                    yield update
+                failed = False
+            finally:
+                finish(self, start, failed, scope_token)
+    elif inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            start, failed, scope_token = clock(), True, begin(name)
+            try:
+                result = await fn(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                finish(self, start, failed, scope_token)
+    elif inspect.isgeneratorfunction(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            start, failed, scope_token = clock(), True, begin(name)
+            try:
+                yield from fn(self, *args, **kwargs)
+                failed = False
+            finally:
+                finish(self, start, failed, scope_token)
+    else:
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            start, failed, scope_token = clock(), True, begin(name)
+            try:
+                result = fn(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                finish(self, start, failed, scope_token)
+
+    wrapper.__pacta_instrumented__ = True
+    return wrapper
+
+
+def instrument_states(root=None):
+    """Instrumentar los event handlers de ``root`` y de todas sus subclases."""
+    if root is None:
+        import reflex as rx
+
+        root = rx.State
+
+    pending = [root]
+    while pending:
+        state_cls = pending.pop()
+        pending.extend(state_cls.get_substates())
+        for name, handler in list(state_cls.event_handlers.items()):
+            label = f"{state_cls.get_full_name()}.{name}"
+            # Copia en lugar de dataclasses.replace: subclases como
+            # EventHandlerSetVar tienen un __init__ que no acepta ``fn``
+            wrapped = copy.copy(handler)
+            object.__setattr__(wrapped, "fn", instrument_handler(label, handler.fn))
+            state_cls.event_handlers[name] = wrapped
+            setattr(state_cls, name, wrapped)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _histogram_lines(metric: str, label: str, histogram: Histogram):
+    for bound, total in histogram.cumulative():
+        yield f'{metric}_bucket{{{label},le="{_format_bound(bound)}"}} {total}'
+    yield f"{metric}_sum{{{label}}} {histogram.sum}"
+    yield f"{metric}_count{{{label}}} {histogram.count}"
+
+
+def render_prometheus() -> str:
+    """Todas las métricas en formato de exposición de texto de Prometheus."""
+    lines = [
+        "# HELP pacta_handler_calls_total Llamadas a event handlers.",
+        "# TYPE pacta_handler_calls_total counter",
+    ]
+    items = sorted(handler_stats.items())
+    for name, stats in items:
+        lines.append(f'pacta_handler_calls_total{{handler="{_escape(name)}"}} {stats.calls}')
+
+    lines += [
+        "# HELP pacta_handler_errors_total Event handlers que terminaron con excepción.",
+        "# TYPE pacta_handler_errors_total counter",
+    ]
+    for name, stats in items:
+        lines.append(f'pacta_handler_errors_total{{handler="{_escape(name)}"}} {stats.errors}')
+
+    lines += [
+        "# HELP pacta_handler_latency_seconds Duración de los event handlers.",
+        "# TYPE pacta_handler_latency_seconds histogram",
+    ]
+    for name, stats in items:
+        lines.extend(_histogram_lines("pacta_handler_latency_seconds", f'handler="{_escape(name)}"', stats.latency))
+
+    lines += [
+        "# HELP pacta_handler_delta_vars Vars de estado modificadas por llamada.",
+        "# TYPE pacta_handler_delta_vars histogram",
+    ]
+    for name, stats in items:
+        lines.extend(_histogram_lines("pacta_handler_delta_vars", f'handler="{_escape(name)}"', stats.delta))
+
+    for collect in collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
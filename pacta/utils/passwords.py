@@ -0,0 +1,106 @@
+"""
+Hashing y verificación de contraseñas fuera del event loop.
+
+bcrypt consume ~200 ms de CPU por operación; ejecutarlo dentro de un handler
+``async`` bloquea todas las sesiones websocket del worker. Las operaciones se
+envían a un pool de hilos dedicado (bcrypt libera el GIL) con un límite de
+trabajos pendientes: si la cola está llena se rechaza la petición con
+``PasswordHasherBusy`` en lugar de acumular latencia.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import bcrypt
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+
+class PasswordHasherBusy(Exception):
+    """El pool de hashing está saturado; el cliente debe reintentar."""
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+class PasswordHasher:
+    """Pool acotado para operaciones bcrypt."""
+
+    def __init__(
+        self,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pacta-bcrypt"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _submit(self, fn, *args) -> Future:
+        # Los trabajos en ejecución y en cola comparten el mismo cupo
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Servidor ocupado, inténtalo de nuevo en unos segundos")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def hash(self, password: str) -> str:
+        """Genera el hash bcrypt de una contraseña sin bloquear el event loop."""
+        return await asyncio.wrap_future(self._submit(_hash, password, self.rounds))
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Comprueba una contraseña contra su hash sin bloquear el event loop."""
+        return await asyncio.wrap_future(self._submit(_verify, password, password_hash))
+
+    def hash_sync(self, password: str) -> str:
+        """Versión síncrona para código fuera del event loop (arranque, CLI)."""
+        return self._submit(_hash, password, self.rounds).result()
+
+    def verify_sync(self, password: str, password_hash: str) -> bool:
+        """Versión síncrona de ``verify``."""
+        return self._submit(_verify, password, password_hash).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+hasher = PasswordHasher()
+_dummy_hash = None
+
+
+async def hash_password(password: str) -> str:
+    return await hasher.hash(password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await hasher.verify(password, password_hash)
+
+
+def hash_password_sync(password: str) -> str:
+    return hasher.hash_sync(password)
+
+
+async def dummy_password_hash() -> str:
+    """Hash de relleno con el mismo coste que los reales.
+
+    Verificar contra él cuando el usuario no existe hace que la respuesta tarde
+    lo mismo que con un usuario real y no revele qué usernames existen.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hasher.hash("pacta-dummy-password")
+    return _dummy_hash
@@ -0,0 +1,188 @@
+"""
+Alta masiva de usuarios desde CSV o JSONL.
+
+El fichero se procesa por lotes de ``batch_size`` filas, de modo que la memoria
+no depende del tamaño de la entrada:
+
+1. cada fila se valida con ``UserCreate``;
+2. se descartan los duplicados dentro del lote y los usernames/emails que ya
+   existen en la base de datos (una consulta ``IN`` por lote), antes de gastar
+   CPU en bcrypt;
+3. las contraseñas restantes se hashean en un pool de procesos (bcrypt en
+   todos los núcleos, sin competir por el GIL con el proceso principal);
+4. las filas se insertan con un único ``executemany`` por lote y transacción.
+   Si otro proceso inserta el mismo usuario entre la comprobación y el
+   ``INSERT``, el lote se reintenta fila a fila con savepoints y solo la fila
+   en conflicto se descarta.
+
+Los problemas (filas inválidas y conflictos) se notifican a ``on_problem`` a
+medida que aparecen, sin acumularlos. Las inserciones se hacen con SQL Core, así
+que no pasan por los listeners del ORM: las entradas negativas de la caché de
+usuarios de los workers caducan tras ``USER_CACHE_NEGATIVE_TTL``.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from pacta.models.user import UserCreate, UserModel
+from pacta.utils.passwords import BCRYPT_ROUNDS, _hash
+
+PROVISION_BATCH_SIZE = int(os.getenv("PROVISION_BATCH_SIZE", "1000"))
+PROVISION_WORKERS = int(os.getenv("PROVISION_WORKERS", os.cpu_count() or 2))
+
+
+@dataclass
+class ProvisionReport:
+    """Contadores de una ejecución de ``provision_users``."""
+    read: int = 0
+    inserted: int = 0
+    invalid: int = 0
+    conflicts: int = 0
+
+
+def read_rows(path, fmt: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """Leer ``(línea, fila)`` de un CSV con cabecera o de un JSONL, en streaming."""
+    path = Path(path)
+    fmt = fmt or ("jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "csv")
+    if fmt == "csv":
+        with path.open(newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif fmt == "jsonl":
+        with path.open(encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {"__error__": f"JSON inválido: {e.msg}"}
+                yield line_no, row
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def _validate(row: dict) -> UserCreate:
+    if not isinstance(row, dict):
+        raise ValueError("Se esperaba un objeto JSON")
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+    return UserCreate(**row)
+
+
+def _existing(conn, users) -> Tuple[set, set]:
+    """Usernames y emails del lote que ya están en la base de datos."""
+    usernames = [u.username for _, u in users]
+    emails = [u.email for _, u in users]
+    rows = conn.execute(
+        select(UserModel.username, UserModel.email).where(
+            or_(UserModel.username.in_(usernames), UserModel.email.in_(emails))
+        )
+    )
+    taken_usernames, taken_emails = set(), set()
+    for username, email in rows:
+        taken_usernames.add(username)
+        taken_emails.add(email)
+    return taken_usernames, taken_emails
+
+
+def _insert_batch(engine: Engine, rows, on_problem) -> int:
+    """Insertar ``rows`` en una transacción; ante un conflicto, fila a fila."""
+    values = [values for _, values in rows]
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(UserModel), values)
+        return len(values)
+    except IntegrityError:
+        pass
+
+    inserted = 0
+    with engine.begin() as conn:
+        for line_no, values in rows:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(UserModel), values)
+                inserted += 1
+            except IntegrityError:
+                on_problem(line_no, values["username"], "conflicto: username o email ya existe")
+    return inserted
+
+
+def provision_users(
+    rows: Iterable[Tuple[int, dict]],
+    engine: Engine,
+    batch_size: int = PROVISION_BATCH_SIZE,
+    workers: int = PROVISION_WORKERS,
+    rounds: int = BCRYPT_ROUNDS,
+    on_problem: Optional[Callable[[int, str, str], None]] = None,
+    on_batch: Optional[Callable[[ProvisionReport], None]] = None,
+) -> ProvisionReport:
+    """Dar de alta los usuarios de ``rows`` (pares ``(línea, dict)``).
+
+    Returns:
+        ProvisionReport: filas leídas, insertadas, inválidas y en conflicto
+    """
+    report = ProvisionReport()
+
+    def problem(line_no, username, reason):
+        if reason.startswith("conflicto"):
+            report.conflicts += 1
+        else:
+            report.invalid += 1
+        if on_problem is not None:
+            on_problem(line_no, username, reason)
+
+    rows = iter(rows)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while batch := list(islice(rows, batch_size)):
+            report.read += len(batch)
+
+            valid = []
+            seen_usernames, seen_emails = set(), set()
+            for line_no, row in batch:
+                try:
+                    user = _validate(row)
+                except (ValidationError, ValueError, TypeError) as e:
+                    reason = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+                    problem(line_no, row.get("username", "") if isinstance(row, dict) else "", f"inválido: {reason}")
+                    continue
+                if user.username in seen_usernames or user.email in seen_emails:
+                    problem(line_no, user.username, "conflicto: duplicado en el fichero")
+                    continue
+                seen_usernames.add(user.username)
+                seen_emails.add(user.email)
+                valid.append((line_no, user))
+
+            if valid:
+                with engine.connect() as conn:
+                    taken_usernames, taken_emails = _existing(conn, valid)
+                pending = []
+                for line_no, user in valid:
+                    if user.username in taken_usernames or user.email in taken_emails:
+                        problem(line_no, user.username, "conflicto: username o email ya existe")
+                    else:
+                        pending.append((line_no, user))
+
+                chunksize = max(1, len(pending) // (workers * 4))
+                hashes = pool.map(_hash, (u.password for _, u in pending), repeat(rounds), chunksize=chunksize)
+                to_insert = [
+                    (line_no, {"username": u.username, "email": u.email, "password_hash": h, "is_active": True})
+                    for (line_no, u), h in zip(pending, hashes)
+                ]
+                if to_insert:
+                    report.inserted += _insert_batch(engine, to_insert, problem)
+
+            if on_batch is not None:
+                on_batch(report)
+    return report
@@ -0,0 +1,182 @@
+"""
+Instrumentación de las consultas SQL por event handler.
+
+Los eventos ``before/after_cursor_execute`` del motor atribuyen cada consulta
+al ámbito activo (``query_scope``), que el envoltorio de métricas abre para
+cada event handler. Con ello se obtiene:
+
+- número y tiempo de consultas por handler (``query_totals``),
+- un log de consultas lentas (``SLOW_QUERY_MS``) con los parámetros ocultos,
+- un detector de N+1: la misma sentencia repetida ``N_PLUS_ONE_THRESHOLD``
+  veces dentro de un mismo handler genera un aviso fuera de producción,
+- presupuestos opcionales: ``query_budget(n)`` lanza ``QueryBudgetExceeded``
+  en cuanto se supera ``n`` consultas, pensado para tests.
+
+Los ámbitos viven en un ``ContextVar``; ``run_db`` copia el contexto al pool de
+hilos y ``AsyncSession.run_sync`` lo comparte, así que las consultas se
+atribuyen igual con ambos backends.
+"""
+import contextvars
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+# Presupuesto global por handler (0 = sin límite)
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "0"))
+WARN_N_PLUS_ONE = os.getenv("PACTA_ENV", "dev") != "prod"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Un handler ejecutó más consultas de las permitidas."""
+
+
+class QueryScope:
+    """Consultas ejecutadas dentro de un handler (o de un bloque de test)."""
+
+    __slots__ = ("name", "budget", "parent", "count", "seconds", "shapes", "warned")
+
+    def __init__(self, name: str, budget: Optional[int] = None, parent=None):
+        self.name = name
+        self.budget = budget
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = {}
+        self.warned = set()
+
+    def record(self, shape: str, seconds: float):
+        scope = self
+        while scope is not None:
+            scope._record(shape, seconds)
+            scope = scope.parent
+
+    def _record(self, shape: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        repeats = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = repeats
+        if WARN_N_PLUS_ONE and repeats == N_PLUS_ONE_THRESHOLD and shape not in self.warned:
+            self.warned.add(shape)
+            logger.warning(
+                "Posible N+1 en %s: la misma consulta se ejecutó %d veces: %s",
+                self.name, repeats, shape,
+            )
+        if self.budget and self.count > self.budget:
+            raise QueryBudgetExceeded(
+                f"{self.name} ejecutó {self.count} consultas (presupuesto {self.budget})"
+            )
+
+
+_current = contextvars.ContextVar("pacta_query_scope", default=None)
+# handler -> [consultas, segundos]
+query_totals = {}
+
+
+def begin(name: str, budget: Optional[int] = None):
+    """Abrir un ámbito; devuelve el token para ``end``."""
+    return _current.set(QueryScope(name, budget or QUERY_BUDGET or None, _current.get()))
+
+
+def end(token) -> QueryScope:
+    """Cerrar el ámbito abierto por ``begin`` y acumular sus totales."""
+    scope = _current.get()
+    _current.reset(token)
+    if scope.count:
+        totals = query_totals.setdefault(scope.name, [0, 0.0])
+        totals[0] += scope.count
+        totals[1] += scope.seconds
+    return scope
+
+
+@contextmanager
+def query_scope(name: str, budget: Optional[int] = None):
+    token = begin(name, budget)
+    scope = _current.get()
+    try:
+        yield scope
+    finally:
+        end(token)
+
+
+def query_budget(max_queries: int, name: str = "query_budget"):
+    """Fallar si el bloque ejecuta más de ``max_queries`` consultas.
+
+    Ejemplo:
+        with query_budget(2):
+            await state.login()
+    """
+    return query_scope(name, max_queries)
+
+
+def current_scope() -> Optional[QueryScope]:
+    return _current.get()
+
+
+@lru_cache(maxsize=2048)
+def _shape(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def redact(parameters):
+    """Sustituir los valores ligados por ``?`` conservando su estructura."""
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} filas>"
+        return ["?"] * len(parameters)
+    return "?"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("pacta_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["pacta_query_start"].pop()
+    scope = _current.get()
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s: %s parámetros=%s",
+            elapsed * 1000, scope.name if scope else "-", _shape(statement), redact(parameters),
+        )
+    if scope is not None:
+        scope.record(_shape(statement), elapsed)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute no se llama si la consulta falla
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("pacta_query_start"):
+        conn.info["pacta_query_start"].pop()
+
+
+def instrument_queries(target):
+    """Registrar los eventos de consulta en un motor síncrono."""
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+def prometheus_lines():
+    # metrics importa este módulo: importación diferida para no crear un ciclo
+    from pacta.utils.metrics import _escape
+
+    yield "# TYPE pacta_handler_queries_total counter"
+    for name, (count, _) in sorted(query_totals.items()):
+        yield f'pacta_handler_queries_total{{handler="{_escape(name)}"}} {count}'
+    yield "# TYPE pacta_handler_query_seconds_total counter"
+    for name, (_, seconds) in sorted(query_totals.items()):
+        yield f'pacta_handler_query_seconds_total{{handler="{_escape(name)}"}} {seconds}'
@@ -0,0 +1,196 @@
+"""
+Limitación de intentos por ventana deslizante aproximada.
+
+Cada clave guarda solo dos contadores (ventana actual y anterior); el número
+de intentos en la última ventana se estima como
+``anterior * (1 - fracción transcurrida) + actual``. Hay dos implementaciones:
+
+- ``MemoryRateLimiter``: por proceso, con número máximo de claves; las
+  inactivas se eliminan por orden de último intento, de modo que la memoria
+  queda acotada.
+- ``RedisRateLimiter``: compartido entre workers, con un script Lua atómico.
+"""
+import abc
+import logging
+import os
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Iterable, Union
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | redis
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class RateLimiter(abc.ABC):
+    """Interfaz común de los limitadores."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+
+    @abc.abstractmethod
+    async def hit(self, key: str) -> bool:
+        """Registrar un intento para ``key``; devuelve False si se supera el límite."""
+
+    @abc.abstractmethod
+    async def reset(self, key: str):
+        """Olvidar los intentos de ``key`` (p. ej. tras un login correcto)."""
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Limitador en memoria con número de claves acotado.
+
+    Las claves se mantienen ordenadas por su último intento, así que las
+    inactivas quedan siempre al principio: el barrido y el desalojo solo
+    recorren las claves que eliminan.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        super().__init__(limit, window)
+        self.max_keys = max_keys
+        # clave -> (índice de ventana, intentos ventana anterior, intentos ventana actual)
+        self._counters = OrderedDict()
+
+    def _sweep(self, current_window: int):
+        """Eliminar las claves sin intentos en las dos últimas ventanas."""
+        counters = self._counters
+        while counters:
+            key, (w, _, _) = next(iter(counters.items()))
+            if w >= current_window - 1:
+                break
+            del counters[key]
+
+    def check(self, key: str, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        current_window = int(now // self.window)
+        elapsed = (now % self.window) / self.window
+        self._sweep(current_window)
+
+        entry = self._counters.get(key)
+        if entry is None:
+            if len(self._counters) >= self.max_keys:
+                # Desalojar la clave con la actividad más antigua
+                self._counters.popitem(last=False)
+            prev = curr = 0
+        else:
+            self._counters.move_to_end(key)
+            w, prev, curr = entry
+            if w != current_window:
+                prev = curr if w == current_window - 1 else 0
+                curr = 0
+
+        if prev * (1 - elapsed) + curr >= self.limit:
+            self._counters[key] = (current_window, prev, curr)
+            return False
+        self._counters[key] = (current_window, prev, curr + 1)
+        return True
+
+    async def hit(self, key: str) -> bool:
+        return self.check(key)
+
+    async def reset(self, key: str):
+        self._counters.pop(key, None)
+
+    def __len__(self):
+        return len(self._counters)
+
+
+# KEYS: ventana actual, ventana anterior. ARGV: límite, fracción transcurrida, ttl
+_SLIDING_WINDOW_LUA = """
+local curr = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+if prev * (1 - tonumber(ARGV[2])) + curr >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """Limitador compartido entre workers sobre Redis."""
+
+    def __init__(self, client, limit: int, window: float, prefix: str = "pacta:rl:"):
+        super().__init__(limit, window)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_SLIDING_WINDOW_LUA)
+
+    def _keys(self, key: str, current_window: int):
+        # Hash tag {key}: ambas claves caen en el mismo slot de Redis Cluster
+        base = f"{self.prefix}{{{key}}}:"
+        return [f"{base}{current_window}", f"{base}{current_window - 1}"]
+
+    async def hit(self, key: str) -> bool:
+        now = time.time()
+        current_window = int(now // self.window)
+        elapsed = (now % self.window) / self.window
+        try:
+            allowed = await self._script(
+                keys=self._keys(key, current_window),
+                args=[self.limit, elapsed, int(self.window * 2) + 1],
+            )
+        except Exception as e:
+            # Si Redis no está disponible no se bloquea el acceso
+            logger.warning("Rate limiter Redis no disponible: %s", e)
+            return True
+        return bool(allowed)
+
+    async def reset(self, key: str):
+        current_window = int(time.time() // self.window)
+        try:
+            await self.client.delete(*self._keys(key, current_window))
+        except Exception as e:
+            logger.warning("Rate limiter Redis no disponible: %s", e)
+
+
+def create_rate_limiter(limit: int, window: float, backend: str = RATE_LIMIT_BACKEND) -> RateLimiter:
+    """Crear el limitador configurado por ``RATE_LIMIT_BACKEND``."""
+    if backend == "redis":
+        import redis.asyncio as redis
+
+        return RedisRateLimiter(redis.from_url(REDIS_URL), limit, window)
+    return MemoryRateLimiter(limit, window)
+
+
+def _limit_keys(state, key: Union[str, Iterable[str]]):
+    parts = (key,) if isinstance(key, str) else tuple(key)
+    for part in parts:
+        if part == "ip":
+            yield f"ip:{state.router.session.client_ip}"
+        elif part == "username":
+            yield f"user:{(state.username or '').strip().lower()}"
+        elif part == "ip+username":
+            yield f"ipuser:{state.router.session.client_ip}:{(state.username or '').strip().lower()}"
+        else:
+            raise ValueError(f"Clave de rate limiting desconocida: {part}")
+
+
+def rate_limit(
+    limiter: RateLimiter,
+    key: Union[str, Iterable[str]] = "ip",
+    message: str = "Too many login attempts. Please try again later.",
+):
+    """Decorador de rate limiting para handlers de estado.
+
+    Args:
+        limiter: Limitador a consultar
+        key: "ip", "username", "ip+username" o una tupla de ellas; cada clave
+            se limita de forma independiente
+        message: Error mostrado cuando se supera el límite
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            for limit_key in _limit_keys(self, key):
+                if not await limiter.hit(limit_key):
+                    self.error = message
+                    return
+            return await fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
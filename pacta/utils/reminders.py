@@ -0,0 +1,456 @@
+"""
+Avisos de vencimiento de contratos.
+
+El planificador no recorre la tabla de contratos periódicamente:
+
+- carga solo la ventana de los próximos ``REMINDER_WINDOW_DAYS`` días: los
+  contratos vigentes cuya ``end_date`` genera algún aviso dentro de la
+  ventana, un rango sobre ``ix_contracts_status_end_date_id``;
+- guarda los avisos en un heap ordenado por fecha y duerme hasta el primero;
+- se entera de los cambios por los eventos del ORM de este proceso (al
+  confirmar la sesión) y, para los de otros workers o de SQL directo, con una
+  consulta cada ``REMINDER_SYNC_SECONDS`` de los contratos con ``id`` o
+  ``updated_at`` posteriores a la última sincronización (clave primaria e
+  ``ix_contracts_updated_at``), releyendo los últimos
+  ``REMINDER_SYNC_OVERLAP_SECONDS`` para no perder lo que confirman las
+  transacciones largas;
+- al agotar la ventana carga la siguiente.
+
+Las entradas del heap no se borran al cambiar un contrato: quedan obsoletas si
+la fecha de fin ya no coincide con la programada y se descartan al salir.
+
+Cada worker del backend tiene su propio planificador. El aviso se reclama
+insertando su fila en ``contract_reminders``, con restricción única sobre
+(contrato, tipo, fecha de fin): aunque varios workers lo tengan en su heap
+solo se dispara una vez. Antes de reclamarlo se relee el contrato por clave
+primaria, así que un cambio hecho en otro worker nunca produce un aviso
+equivocado, como mucho uno que llega en la siguiente sincronización.
+
+Los avisos se muestran con el componente ``alert`` (``components/reminders.py``)
+y, con ``REMINDER_SMTP_HOST``, también se envían por correo al propietario del
+contrato (por ejemplo a un sumidero SMTP local como Mailpit).
+"""
+import asyncio
+import heapq
+import logging
+import math
+import os
+import smtplib
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.models.reminder import ReminderModel
+from pacta.models.user import UserModel
+
+REMINDER_ENABLED = os.getenv("REMINDER_ENABLED", "true").lower() in ("1", "true", "yes")
+# Días de antelación de cada aviso, de mayor a menor
+REMINDER_DAYS = tuple(sorted({int(d) for d in os.getenv("REMINDER_DAYS", "30,7,1,0").split(",") if d.strip()},
+                             reverse=True))
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "8"))  # hora UTC a la que se dispara cada aviso
+REMINDER_WINDOW_DAYS = int(os.getenv("REMINDER_WINDOW_DAYS", "7"))
+REMINDER_SYNC_SECONDS = float(os.getenv("REMINDER_SYNC_SECONDS", "60"))
+# Cuánto se relee en cada sincronización: debe cubrir la transacción más larga
+# que crea o modifica contratos
+REMINDER_SYNC_OVERLAP_SECONDS = float(os.getenv("REMINDER_SYNC_OVERLAP_SECONDS", "300"))
+REMINDER_SMTP_HOST = os.getenv("REMINDER_SMTP_HOST", "")
+REMINDER_SMTP_PORT = int(os.getenv("REMINDER_SMTP_PORT", "25"))
+REMINDER_SMTP_FROM = os.getenv("REMINDER_SMTP_FROM", "pacta@localhost")
+
+# Solo los contratos vigentes generan avisos
+ACTIVE_STATUSES = (ContractStatus.ACTIVE,)
+
+logger = logging.getLogger(__name__)
+
+_c = ContractModel.__table__
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite devuelve las fechas sin zona horaria (guardadas en UTC)
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def kind_for(days: int) -> str:
+    return f"{days}d"
+
+
+def due_at(end_date: date, days: int, hour: int = REMINDER_HOUR) -> datetime:
+    """Momento en que se dispara el aviso de ``days`` días antes de ``end_date``."""
+    return datetime.combine(end_date - timedelta(days=days), dtime(hour), tzinfo=timezone.utc)
+
+
+@dataclass(order=True, frozen=True)
+class Due:
+    at: datetime
+    contract_id: int
+    days: int
+    end_date: date
+
+    @property
+    def key(self):
+        return self.contract_id, kind_for(self.days), self.end_date
+
+
+def claim_reminders(conn, batch: List[Due], statuses=ACTIVE_STATUSES) -> List[dict]:
+    """Reclamar los avisos de ``batch`` que siguen siendo válidos; devuelve los disparados."""
+    current = {
+        row.id: row for row in conn.execute(
+            select(_c.c.id, _c.c.reference, _c.c.title, _c.c.status, _c.c.end_date, _c.c.owner_id, UserModel.email)
+            .join(UserModel, UserModel.id == _c.c.owner_id)
+            .where(_c.c.id.in_({due.contract_id for due in batch}))
+        )
+    }
+    fired = []
+    for due in batch:
+        row = current.get(due.contract_id)
+        if row is None or row.status not in statuses or row.end_date != due.end_date:
+            continue
+        try:
+            with conn.begin_nested():
+                reminder_id = conn.execute(insert(ReminderModel).values(
+                    contract_id=due.contract_id, owner_id=row.owner_id, kind=kind_for(due.days),
+                    end_date=due.end_date, due_at=due.at,
+                )).inserted_primary_key[0]
+        except IntegrityError:
+            # Ya lo disparó otro worker
+            continue
+        fired.append({
+            "id": reminder_id, "contract_id": row.id, "reference": row.reference, "title": row.title,
+            "end_date": row.end_date, "days": due.days, "owner_id": row.owner_id, "email": row.email,
+        })
+    return fired
+
+
+def _expiry(days: int, end_date: date) -> str:
+    when = "hoy" if days == 0 else "mañana" if days == 1 else f"en {days} días"
+    return f"vence {when} ({end_date:%d/%m/%Y})"
+
+
+def reminder_text(reminder: dict) -> str:
+    return f"{reminder['reference']} · {reminder['title']} {_expiry(reminder['days'], reminder['end_date'])}."
+
+
+def send_emails(reminders: List[dict], host: str = REMINDER_SMTP_HOST, port: int = REMINDER_SMTP_PORT,
+                sender: str = REMINDER_SMTP_FROM) -> List[int]:
+    """Enviar los avisos por SMTP en una sola conexión; devuelve los ids enviados."""
+    sent = []
+    with smtplib.SMTP(host, port, timeout=10) as smtp:
+        for reminder in reminders:
+            message = EmailMessage()
+            message["From"] = sender
+            message["To"] = reminder["email"]
+            message["Subject"] = f"PACTA: vencimiento de {reminder['reference']}"
+            message.set_content(reminder_text(reminder))
+            try:
+                smtp.send_message(message)
+                sent.append(reminder["id"])
+            except smtplib.SMTPException:
+                logger.exception("No se pudo enviar el aviso %s a %s", reminder["id"], reminder["email"])
+    return sent
+
+
+def open_reminders(db: Session, owner_id: int, limit: int = 20) -> List[dict]:
+    """Avisos sin descartar de un usuario, los que vencen antes primero."""
+    rows = db.execute(
+        select(ReminderModel.id, ReminderModel.kind, ReminderModel.end_date, _c.c.reference, _c.c.title)
+        .join(_c, _c.c.id == ReminderModel.contract_id)
+        .where(ReminderModel.owner_id == owner_id, ReminderModel.dismissed_at.is_(None))
+        .order_by(ReminderModel.end_date, ReminderModel.id)
+        .limit(limit)
+    )
+    reminders = []
+    for row in rows:
+        days = int(row.kind.rstrip("d"))
+        reminders.append({
+            "id": row.id,
+            "title": f"{row.reference} · {row.title}",
+            "description": f"El contrato {_expiry(days, row.end_date)}.",
+            "days": days,
+        })
+    return reminders
+
+
+def dismiss_reminder(db: Session, owner_id: int, reminder_id: int) -> None:
+    db.execute(
+        update(ReminderModel)
+        .where(ReminderModel.id == reminder_id, ReminderModel.owner_id == owner_id)
+        .values(dismissed_at=_now())
+    )
+
+
+class ReminderScheduler:
+    """Heap de los avisos de la ventana actual con recarga incremental."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        days=REMINDER_DAYS,
+        window_days: int = REMINDER_WINDOW_DAYS,
+        sync_seconds: float = REMINDER_SYNC_SECONDS,
+        sync_overlap: float = REMINDER_SYNC_OVERLAP_SECONDS,
+        statuses=ACTIVE_STATUSES,
+    ):
+        # None: el motor de pacta.utils.database, que se importa al usarse
+        self._engine = engine
+        self.days = tuple(sorted(days, reverse=True))
+        self.window = timedelta(days=window_days)
+        self.sync_seconds = sync_seconds
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.statuses = statuses
+        self.window_end: Optional[datetime] = None
+        self._heap: List[Due] = []
+        self._queued = set()
+        # Fecha de fin programada de cada contrato de la ventana
+        self._scheduled = {}
+        # Avisos ya disparados (por este u otro worker) de la ventana
+        self._sent = set()
+        # Último id leído en cada una de las sincronizaciones que cubre el
+        # solape; la primera es desde la que se releen las altas
+        self._last_ids = deque([0], maxlen=math.ceil(sync_overlap / sync_seconds) + 1 if sync_seconds > 0 else 1)
+        self._watermark: Optional[datetime] = None
+        # Cambios del ORM pendientes de aplicar; solo se registran mientras corre
+        self._changes = deque()
+        self.tracking = False
+        self._loop = None
+        self._wake: Optional[asyncio.Event] = None
+        self.fired = 0
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from pacta.utils.database import engine
+            self._engine = engine
+        return self._engine
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _horizon(self) -> date:
+        """Última fecha de fin que puede generar un aviso dentro de la ventana."""
+        return self.window_end.date() + timedelta(days=max(self.days))
+
+    def _push(self, due: Due):
+        if due not in self._queued and due.key not in self._sent:
+            self._queued.add(due)
+            heapq.heappush(self._heap, due)
+
+    def _schedule(self, contract_id: int, end_date: date, status: Optional[str], now: datetime):
+        if status not in self.statuses or end_date is None or not now.date() <= end_date <= self._horizon():
+            self._scheduled.pop(contract_id, None)
+            return
+        self._scheduled[contract_id] = end_date
+        passed = [days for days in self.days if due_at(end_date, days) <= now]
+        if passed:
+            # Tras una parada solo se recupera el aviso más reciente de los vencidos
+            self._push(Due(now, contract_id, min(passed), end_date))
+        for days in self.days:
+            at = due_at(end_date, days)
+            if now < at <= self.window_end:
+                self._push(Due(at, contract_id, days, end_date))
+
+    # Lecturas de la base de datos: se ejecutan en un hilo y devuelven datos;
+    # el heap solo se modifica desde el bucle del planificador.
+
+    def read_window(self, now: datetime):
+        window_end = now + self.window
+        horizon = window_end.date() + timedelta(days=max(self.days))
+        with self.engine.connect() as conn:
+            # Marcas de agua antes de leer la ventana: lo que cambie durante la
+            # lectura lo recoge la siguiente sincronización
+            last_id = conn.execute(select(func.max(_c.c.id))).scalar() or 0
+            watermark = conn.execute(select(func.max(_c.c.updated_at))).scalar()
+            contracts = conn.execute(
+                select(_c.c.id, _c.c.end_date, _c.c.status)
+                .where(_c.c.status.in_(self.statuses), _c.c.end_date.between(now.date(), horizon))
+            ).all()
+            sent = conn.execute(
+                select(ReminderModel.contract_id, ReminderModel.kind, ReminderModel.end_date)
+                .where(ReminderModel.end_date.between(now.date(), horizon))
+            ).all()
+        return window_end, contracts, sent, last_id, watermark
+
+    def apply_window(self, data, now: datetime):
+        self.window_end, contracts, sent, last_id, watermark = data
+        self._last_ids.clear()
+        self._last_ids.append(last_id)
+        self._watermark = _utc(watermark) or now
+        self._heap, self._queued, self._scheduled = [], set(), {}
+        self._sent = {tuple(row) for row in sent}
+        for contract_id, end_date, status in contracts:
+            self._schedule(contract_id, end_date, status, now)
+
+    def read_changes(self):
+        """Contratos nuevos o modificados desde la última sincronización.
+
+        Un contrato se ve al confirmarse su transacción, pero su ``id`` y su
+        ``updated_at`` se asignan antes: en PostgreSQL ``now()`` es la hora de
+        inicio de la transacción. Una transacción larga puede confirmar filas
+        con un ``id`` o un ``updated_at`` anteriores a lo ya leído, así que
+        cada sincronización relee los ``sync_overlap`` segundos anteriores a la
+        marca de agua y las altas desde el último ``id`` de las
+        sincronizaciones de ese intervalo. Reaplicar un contrato no cambia el
+        heap. Lo que confirme una transacción más larga que el solape lo
+        recoge la siguiente recarga de la ventana.
+        """
+        columns = (_c.c.id, _c.c.end_date, _c.c.status, _c.c.updated_at)
+        with self.engine.connect() as conn:
+            created = conn.execute(select(*columns).where(_c.c.id > self._last_ids[0]).order_by(_c.c.id)).all()
+            updated = conn.execute(
+                select(*columns).where(_c.c.updated_at >= self._watermark - self.sync_overlap)
+            ).all()
+        return created, updated
+
+    def apply_changes(self, data, now: datetime):
+        created, updated = data
+        for row in (*created, *updated):
+            self._schedule(row.id, row.end_date, row.status, now)
+            updated_at = _utc(row.updated_at)
+            if updated_at is not None and updated_at > self._watermark:
+                self._watermark = updated_at
+        self._last_ids.append(max(self._last_ids[-1], created[-1].id) if created else self._last_ids[-1])
+
+    def reload(self, now: datetime):
+        self.apply_window(self.read_window(now), now)
+
+    def sync(self, now: datetime):
+        self.apply_changes(self.read_changes(), now)
+
+    def notify(self, changes: Iterable[tuple]):
+        """Cambios ``(id, end_date, status)`` confirmados por el ORM (desde cualquier hilo)."""
+        if not self.tracking:
+            return
+        self._changes.extend(changes)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def apply_notified(self, now: datetime):
+        while self._changes:
+            self._schedule(*self._changes.popleft(), now)
+
+    def pop_due(self, now: datetime) -> List[Due]:
+        """Sacar del heap los avisos vencidos que siguen siendo válidos."""
+        batch, keys = [], set()
+        while self._heap and self._heap[0].at <= now:
+            due = heapq.heappop(self._heap)
+            self._queued.discard(due)
+            if self._scheduled.get(due.contract_id) == due.end_date and due.key not in self._sent | keys:
+                batch.append(due)
+                keys.add(due.key)
+        return batch
+
+    def next_due(self) -> Optional[datetime]:
+        return self._heap[0].at if self._heap else None
+
+    def fire(self, batch: List[Due]) -> List[dict]:
+        """Reclamar y registrar los avisos de ``batch`` (bloqueante)."""
+        if not batch:
+            return []
+        with self.engine.begin() as conn:
+            fired = claim_reminders(conn, batch, self.statuses)
+        # También los que ganó otro worker: ya no hay que volver a intentarlos
+        self._sent.update(due.key for due in batch)
+        self.fired += len(fired)
+        if fired:
+            # Importación diferida, como la del motor: dashboard importa pacta.utils.database
+            from pacta.utils.dashboard import invalidate_dashboard
+            for owner_id in {reminder["owner_id"] for reminder in fired}:
+                invalidate_dashboard(owner_id)
+        if fired and REMINDER_SMTP_HOST:
+            self._email(fired)
+        return fired
+
+    def _email(self, fired: List[dict]):
+        try:
+            sent = send_emails(fired)
+        except OSError:
+            logger.exception("Servidor SMTP de avisos no disponible (%s:%s)", REMINDER_SMTP_HOST, REMINDER_SMTP_PORT)
+            return
+        if sent:
+            with self.engine.begin() as conn:
+                conn.execute(update(ReminderModel).where(ReminderModel.id.in_(sent)).values(emailed_at=_now()))
+
+    async def run(self):
+        """Bucle de la lifespan task: dormir hasta el siguiente aviso, sincronización o ventana."""
+        if not REMINDER_ENABLED:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.tracking = True
+        next_sync = 0.0
+        try:
+            while True:
+                now = _now()
+                try:
+                    if self.window_end is None or now >= self.window_end:
+                        self.apply_window(await asyncio.to_thread(self.read_window, now), now)
+                        next_sync = time.monotonic() + self.sync_seconds
+                    elif time.monotonic() >= next_sync:
+                        self.apply_changes(await asyncio.to_thread(self.read_changes), now)
+                        next_sync = time.monotonic() + self.sync_seconds
+                    self.apply_notified(now)
+                    batch = self.pop_due(now)
+                    if batch:
+                        fired = await asyncio.to_thread(self.fire, batch)
+                        logger.info("Avisos de vencimiento disparados: %s", len(fired))
+                except Exception:
+                    logger.exception("Error en el planificador de avisos")
+                    next_sync = time.monotonic() + self.sync_seconds
+
+                wake_at = min(filter(None, (self.next_due(), self.window_end)), default=now + self.window)
+                timeout = min((wake_at - _now()).total_seconds(), next_sync - time.monotonic())
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(timeout, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            self.tracking = False
+            self._loop = self._wake = None
+            self._changes.clear()
+
+
+reminder_scheduler = ReminderScheduler()
+
+
+# Cambios de contratos hechos con el ORM en este proceso: se acumulan en la
+# sesión y se publican al confirmarla
+@event.listens_for(ContractModel, "after_insert")
+@event.listens_for(ContractModel, "after_update")
+def _track_contract(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.end_date.history.has_changes() or state.attrs.status.history.has_changes():
+        object_session(target).info.setdefault("reminder_changes", []).append(
+            (target.id, target.end_date, target.status)
+        )
+
+
+@event.listens_for(ContractModel, "after_delete")
+def _track_deleted_contract(mapper, connection, target):
+    object_session(target).info.setdefault("reminder_changes", []).append((target.id, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_contract_changes(session):
+    changes = session.info.pop("reminder_changes", None)
+    if changes:
+        reminder_scheduler.notify(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_contract_changes(session, previous_transaction):
+    session.info.pop("reminder_changes", None)
@@ -0,0 +1,187 @@
+"""
+Búsqueda de texto completo sobre contratos.
+
+El índice ``contracts_fts`` (migración 0003) se mantiene con triggers en la
+propia base de datos, así que cualquier alta, cambio o borrado de un contrato
+—por el ORM, por SQL directo o por el alta masiva— queda indexado en la misma
+transacción. Solo se reindexa cuando cambian referencia, título, contraparte o
+descripción, no al cambiar el estado o las fechas.
+
+- SQLite: tabla FTS5 con tokenizador ``unicode61`` sin diacríticos e índices
+  de prefijo de 2-4 caracteres para el type-ahead; ranking ``bm25`` con más
+  peso para referencia y contraparte; ``snippet()`` para los fragmentos.
+- PostgreSQL: ``tsvector`` generado con pesos A/B/C, índice GIN,
+  ``ts_rank`` y ``ts_headline``.
+- Otros motores: ``LIKE`` sobre las columnas del contrato, sin ranking.
+
+La columna ``documents`` del índice contiene el texto extraído de los
+documentos del contrato; no la mantienen los triggers sino el pipeline de
+``pacta.utils.extraction`` (``update_documents_text``) y ``reindex``.
+
+El texto del usuario nunca se pasa como sintaxis de consulta: se parte en
+palabras y cada una se busca como término literal; la última admite prefijo.
+"""
+import html
+import re
+from typing import Iterable, List
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from pacta.models.contract import ContractModel
+
+SEARCH_LIMIT = 20
+SNIPPET_WORDS = 12
+
+# Delimitadores de coincidencia en los fragmentos; se convierten en <mark>
+# después de escapar el HTML
+_MARK_START, _MARK_END = "\x02", "\x03"
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SEARCH = text(f"""
+    SELECT c.id, c.reference, c.title, c.counterparty, c.status, c.end_date,
+           snippet(contracts_fts, -1, char(2), char(3), '…', {SNIPPET_WORDS}) AS snippet
+    FROM contracts_fts
+    JOIN contracts c ON c.id = contracts_fts.rowid
+    WHERE contracts_fts MATCH :query
+    ORDER BY bm25(contracts_fts, 10.0, 4.0, 6.0, 1.0, 1.0)
+    LIMIT :limit
+""")
+
+# ts_headline es caro: solo para las filas que sobreviven al LIMIT
+_POSTGRES_SEARCH = text(f"""
+    SELECT c.id, c.reference, c.title, c.counterparty, c.status, c.end_date,
+           ts_headline('simple', concat_ws(' ', f.title, f.counterparty, f.description, f.documents),
+                       to_tsquery('simple', :query), :headline) AS snippet
+    FROM (
+        SELECT contract_id, ts_rank(tsv, to_tsquery('simple', :query)) AS rank
+        FROM contracts_fts
+        WHERE tsv @@ to_tsquery('simple', :query)
+        ORDER BY rank DESC
+        LIMIT :limit
+    ) r
+    JOIN contracts_fts f ON f.contract_id = r.contract_id
+    JOIN contracts c ON c.id = r.contract_id
+    ORDER BY r.rank DESC
+""")
+_HEADLINE_OPTIONS = f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_WORDS * 2}, MinWords={SNIPPET_WORDS // 2}"
+
+
+def terms(query: str) -> List[str]:
+    """Palabras de la búsqueda, sin operadores ni comillas."""
+    return _TERM.findall(query)
+
+
+def fts5_query(words: List[str], prefix: bool = True) -> str:
+    """Consulta FTS5: cada palabra como cadena literal; la última con prefijo."""
+    parts = [f'"{word}"' for word in words]
+    if prefix and parts:
+        parts[-1] += "*"
+    return " ".join(parts)
+
+
+def tsquery(words: List[str], prefix: bool = True) -> str:
+    """Consulta ``to_tsquery``: términos unidos con ``&``; el último con ``:*``."""
+    parts = [word.lower() for word in words]
+    if prefix and parts:
+        parts[-1] += ":*"
+    return " & ".join(parts)
+
+
+def highlight(snippet: str) -> str:
+    """Fragmento listo para ``rx.html``: texto escapado y coincidencias en ``<mark>``."""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _result(row) -> dict:
+    return {
+        "id": row.id,
+        "reference": row.reference,
+        "title": row.title,
+        "counterparty": row.counterparty,
+        "status": row.status,
+        "end_date": str(row.end_date),
+        "snippet": highlight(row.snippet),
+    }
+
+
+def search_contracts(db: Session, query: str, limit: int = SEARCH_LIMIT, prefix: bool = True) -> List[dict]:
+    """Contratos que contienen todas las palabras de ``query``, los más relevantes primero."""
+    words = terms(query)
+    if not words:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        rows = db.execute(_SQLITE_SEARCH, {"query": fts5_query(words, prefix), "limit": limit})
+    elif dialect == "postgresql":
+        rows = db.execute(
+            _POSTGRES_SEARCH,
+            {"query": tsquery(words, prefix), "limit": limit, "headline": _HEADLINE_OPTIONS},
+        )
+    else:
+        return _like_search(db, words, limit)
+    return [_result(row) for row in rows]
+
+
+def _like_search(db: Session, words: List[str], limit: int) -> List[dict]:
+    columns = (ContractModel.reference, ContractModel.title, ContractModel.counterparty, ContractModel.description)
+    query = select(
+        ContractModel.id, ContractModel.reference, ContractModel.title, ContractModel.counterparty,
+        ContractModel.status, ContractModel.end_date, ContractModel.title.label("snippet"),
+    )
+    for word in words:
+        query = query.where(or_(*(column.ilike(f"%{word}%") for column in columns)))
+    return [_result(row) for row in db.execute(query.limit(limit))]
+
+
+# Texto de todos los documentos extraídos de un contrato
+_DOCUMENTS_TEXT = {
+    "sqlite": """(SELECT group_concat(d.extracted_text, char(10)) FROM documents d
+        WHERE d.contract_id = {contract} AND d.extraction_status = 'done')""",
+    "postgresql": """(SELECT string_agg(d.extracted_text, E'\\n' ORDER BY d.id) FROM documents d
+        WHERE d.contract_id = {contract} AND d.extraction_status = 'done')""",
+}
+_UPDATE_DOCUMENTS = {
+    "sqlite": text(f"UPDATE contracts_fts SET documents = {_DOCUMENTS_TEXT['sqlite'].format(contract=':contract_id')} "
+                   "WHERE rowid = :contract_id"),
+    "postgresql": text(f"UPDATE contracts_fts SET documents = {_DOCUMENTS_TEXT['postgresql'].format(contract=':contract_id')} "
+                       "WHERE contract_id = :contract_id"),
+}
+
+
+def update_documents_text(conn: Connection, contract_ids: Iterable[int]) -> None:
+    """Recalcular la columna ``documents`` del índice para esos contratos (un ``executemany``)."""
+    statement = _UPDATE_DOCUMENTS.get(conn.dialect.name)
+    params = [{"contract_id": contract_id} for contract_id in sorted(set(contract_ids))]
+    if statement is not None and params:
+        conn.execute(statement, params)
+
+
+def reindex(conn: Connection) -> int:
+    """Reconstruir el índice desde ``contracts`` y el texto de sus documentos.
+
+    Devuelve el número de contratos indexados.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        conn.execute(text("DELETE FROM contracts_fts"))
+        result = conn.execute(text(f"""
+            INSERT INTO contracts_fts (rowid, reference, title, counterparty, description, documents)
+            SELECT c.id, c.reference, c.title, c.counterparty, c.description,
+                   {_DOCUMENTS_TEXT['sqlite'].format(contract='c.id')}
+            FROM contracts c
+        """))
+        conn.execute(text("INSERT INTO contracts_fts (contracts_fts) VALUES ('optimize')"))
+    elif dialect == "postgresql":
+        conn.execute(text("TRUNCATE contracts_fts"))
+        result = conn.execute(text(f"""
+            INSERT INTO contracts_fts (contract_id, reference, title, counterparty, description, documents)
+            SELECT c.id, c.reference, c.title, c.counterparty, c.description,
+                   {_DOCUMENTS_TEXT['postgresql'].format(contract='c.id')}
+            FROM contracts c
+        """))
+    else:
+        return 0
+    return result.rowcount
@@ -0,0 +1,251 @@
+"""
+Estadísticas de contratos mantenidas de forma incremental.
+
+``contract_aggregates`` guarda, por dimensión (estado, tipo, contraparte, mes
+de inicio, mes de fin y total) y moneda, el número de contratos y la suma de
+sus importes en céntimos. Un listener ``before_flush`` calcula la diferencia
+que produce cada flush sobre ``ContractModel``:
+
+- altas: +1 con sus valores;
+- cambios: -1 con los valores anteriores (historial del atributo, cargado al
+  asignarlo gracias a ``active_history``) y +1 con los nuevos;
+- bajas: -1 con los valores anteriores.
+
+La diferencia se aplica con un ``UPSERT`` por clave en la conexión de la
+sesión, así que los agregados se confirman o se revierten con los contratos.
+La página /estadisticas lee un número acotado de filas por clave primaria,
+independiente del número de contratos.
+
+Los cambios que no pasan por el ORM (``insert()``/``update()`` de Core o SQL
+directo) no actualizan los agregados: después hay que ejecutar
+``python -m pacta.cli rebuild-stats``. ``check-stats`` compara la tabla con el
+``GROUP BY`` completo. Cada cambio toca la fila ``total`` de su moneda, de
+modo que en PostgreSQL las transacciones que modifican contratos esperan unas
+a otras en esa fila hasta el commit.
+"""
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy import BigInteger, cast, delete, event, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from pacta.models.aggregate import ContractAggregateModel
+from pacta.models.contract import ContractModel
+
+TOP_COUNTERPARTIES = 10
+MONTHS = 12
+
+_t = ContractAggregateModel.__table__
+_c = ContractModel.__table__
+# Atributos del contrato de los que dependen los agregados
+_TRACKED = ("status", "contract_type", "counterparty", "start_date", "end_date", "currency", "value")
+_DEFAULTS = {
+    name: _c.c[name].default.arg
+    for name in _TRACKED if _c.c[name].default is not None and _c.c[name].default.is_scalar
+}
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+Deltas = Dict[Tuple[str, str, str], List[int]]
+
+
+def cents(value) -> int:
+    if value is None:
+        return 0
+    return int((Decimal(str(value)) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def _keys(values: dict):
+    currency = values["currency"]
+    return (
+        ("status", values["status"], currency),
+        ("type", values["contract_type"], currency),
+        ("counterparty", values["counterparty"], currency),
+        ("start_month", f"{values['start_date']:%Y-%m}", currency),
+        ("end_month", f"{values['end_date']:%Y-%m}", currency),
+        ("total", "", currency),
+    )
+
+
+def _add(deltas: Deltas, values: dict, sign: int):
+    amount = sign * cents(values["value"])
+    for key in _keys(values):
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += sign
+        delta[1] += amount
+
+
+def _current(contract: ContractModel) -> dict:
+    values = {name: getattr(contract, name) for name in _TRACKED}
+    for name, default in _DEFAULTS.items():
+        if values[name] is None:
+            values[name] = default
+    return values
+
+
+def _previous(contract: ContractModel) -> dict:
+    """Valores confirmados: los anteriores a los cambios pendientes de flush."""
+    attrs = inspect(contract).attrs
+    values = {}
+    for name in _TRACKED:
+        history = attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else getattr(contract, name)
+    return values
+
+
+def contract_deltas(session: Session) -> Deltas:
+    """Diferencia que produce el próximo flush de ``session`` en los agregados."""
+    deltas: Deltas = {}
+    for obj in session.new:
+        if isinstance(obj, ContractModel):
+            _add(deltas, _current(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, ContractModel):
+            _add(deltas, _previous(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, ContractModel):
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in _TRACKED):
+                _add(deltas, _previous(obj), -1)
+                _add(deltas, _current(obj), 1)
+    return deltas
+
+
+def apply_deltas(conn, deltas: Deltas) -> None:
+    rows = [
+        {"dimension": dimension, "key": key, "currency": currency, "contracts": count, "value_cents": amount}
+        for (dimension, key, currency), (count, amount) in deltas.items() if count or amount
+    ]
+    if not rows:
+        return
+    upsert = _UPSERTS.get(conn.dialect.name)
+    if upsert is not None:
+        statement = upsert(_t)
+        statement = statement.on_conflict_do_update(
+            index_elements=[_t.c.dimension, _t.c.key, _t.c.currency],
+            set_={
+                "contracts": _t.c.contracts + statement.excluded.contracts,
+                "value_cents": _t.c.value_cents + statement.excluded.value_cents,
+            },
+        )
+        conn.execute(statement, rows)
+        return
+    for row in rows:
+        result = conn.execute(
+            update(_t)
+            .where(_t.c.dimension == row["dimension"], _t.c.key == row["key"], _t.c.currency == row["currency"])
+            .values(contracts=_t.c.contracts + row["contracts"], value_cents=_t.c.value_cents + row["value_cents"])
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(_t).values(**row))
+
+
+@event.listens_for(Session, "before_flush")
+def _update_aggregates(session, flush_context, instances):
+    deltas = contract_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """Sin efecto: basta con registrarlo con ``active_history``."""
+
+
+# Cargar el valor anterior al asignar un atributo expirado, para restarlo
+for _name in _TRACKED:
+    event.listen(getattr(ContractModel, _name), "set", _load_previous_value, active_history=True)
+
+
+def _month(conn, column):
+    if conn.dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def grouped_queries(conn):
+    """Una consulta ``GROUP BY`` sobre toda la tabla por dimensión (la forma ingenua)."""
+    keys = {
+        "status": _c.c.status,
+        "type": _c.c.contract_type,
+        "counterparty": _c.c.counterparty,
+        "start_month": _month(conn, _c.c.start_date),
+        "end_month": _month(conn, _c.c.end_date),
+        "total": None,
+    }
+    amount = func.sum(cast(func.round(func.coalesce(_c.c.value, 0) * 100), BigInteger))
+    for dimension, key in keys.items():
+        group = [key] if key is not None else []
+        yield select(
+            literal(dimension).label("dimension"),
+            (key if key is not None else literal("")).label("key"),
+            _c.c.currency,
+            func.count().label("contracts"),
+            func.coalesce(amount, 0).label("value_cents"),
+        ).group_by(*group, _c.c.currency)
+
+
+def rebuild(conn) -> int:
+    """Recalcular todos los agregados desde ``contracts``; devuelve el número de filas."""
+    conn.execute(delete(_t))
+    rows = 0
+    for query in grouped_queries(conn):
+        rows += conn.execute(
+            insert(_t).from_select(["dimension", "key", "currency", "contracts", "value_cents"], query)
+        ).rowcount
+    return rows
+
+
+def check(conn) -> List[tuple]:
+    """Diferencias ``(clave, esperado, guardado)`` entre la tabla y el ``GROUP BY`` completo."""
+    expected = {
+        (row.dimension, row.key, row.currency): (row.contracts, row.value_cents)
+        for query in grouped_queries(conn) for row in conn.execute(query)
+    }
+    stored = {
+        (row.dimension, row.key, row.currency): (row.contracts, row.value_cents)
+        for row in conn.execute(select(_t).where((_t.c.contracts != 0) | (_t.c.value_cents != 0)))
+    }
+    return [
+        (key, expected.get(key), stored.get(key))
+        for key in sorted(expected.keys() | stored.keys())
+        if expected.get(key) != stored.get(key)
+    ]
+
+
+def _rows(result) -> List[dict]:
+    return [
+        {"key": row.key, "currency": row.currency, "contracts": row.contracts,
+         "value": f"{row.value_cents / 100:,.2f}"}
+        for row in result
+    ]
+
+
+def _shift_month(day: date, months: int) -> str:
+    month = day.year * 12 + day.month - 1 + months
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def load_statistics(db, today: date = None) -> dict:
+    """Datos de la página /estadisticas: lecturas acotadas por clave primaria o índice."""
+    today = today or date.today()
+
+    def dimension(name, *criteria, order=(_t.c.key, _t.c.currency), limit=None):
+        query = select(_t).where(_t.c.dimension == name, _t.c.contracts > 0, *criteria).order_by(*order)
+        return _rows(db.execute(query.limit(limit) if limit else query))
+
+    return {
+        "totals": dimension("total"),
+        "by_status": dimension("status"),
+        "by_type": dimension("type"),
+        "top_counterparties": dimension(
+            "counterparty", order=(_t.c.contracts.desc(),), limit=TOP_COUNTERPARTIES
+        ),
+        "started_by_month": dimension(
+            "start_month", _t.c.key.between(_shift_month(today, 1 - MONTHS), _shift_month(today, 0))
+        ),
+        "expiring_by_month": dimension(
+            "end_month", _t.c.key.between(_shift_month(today, 0), _shift_month(today, MONTHS - 1))
+        ),
+    }
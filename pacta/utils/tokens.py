@@ -0,0 +1,210 @@
+"""
+Verificación de tokens de acceso con caché y lista de revocación.
+
+Los claims de un JWT ya verificado se guardan en una caché LRU indexada por el
+SHA-256 del token y se descartan al llegar a ``exp``; restaurar una sesión con
+un token conocido evita repetir la verificación HMAC y el parseo JSON.
+Antes de devolver un resultado (también desde la caché) se consulta la lista
+de revocación, de modo que ``logout`` invalida el token en todos los workers
+cuando se usa el backend Redis (``TOKEN_REVOCATION_BACKEND=redis``).
+
+Con Redis no disponible, ``TOKEN_REVOCATION_FAIL_OPEN`` decide si los tokens
+se aceptan (por defecto: la caída de Redis no cierra todas las sesiones) o se
+rechazan como revocados.
+"""
+import hashlib
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+import jwt
+from jwt import PyJWTError
+
+logger = logging.getLogger(__name__)
+
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
+ALGORITHM = "HS256"
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_REVOCATION_BACKEND = os.getenv("TOKEN_REVOCATION_BACKEND", "memory")  # memory | redis
+TOKEN_REVOCATION_FAIL_OPEN = os.getenv("TOKEN_REVOCATION_FAIL_OPEN", "true").lower() in ("1", "true", "yes")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """Caché LRU de claims verificados con caducidad en ``exp``."""
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: bytes, now: float = None) -> Optional[dict]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, digest: bytes, claims: dict, expires_at: float):
+        with self._lock:
+            self._entries[digest] = (claims, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest: bytes):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class RevocationList:
+    """Tokens revocados hasta su caducidad, en memoria del proceso.
+
+    Un heap ordenado por caducidad permite olvidar los tokens caducados en
+    cada ``add`` sin recorrer toda la lista: solo se sacan los que ya han
+    caducado.
+    """
+
+    def __init__(self):
+        self._revoked = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    async def revoke(self, digest: bytes, expires_at: float) -> bool:
+        """Revocar hasta ``expires_at``; devuelve False si no se ha podido compartir."""
+        self.add(digest, expires_at)
+        return True
+
+    async def is_revoked(self, digest: bytes) -> bool:
+        return self.contains(digest)
+
+    def add(self, digest: bytes, expires_at: float):
+        now = time.time()
+        with self._lock:
+            # Los tokens caducados ya no validan: se pueden olvidar
+            while self._expiry and self._expiry[0][0] <= now:
+                exp, d = heapq.heappop(self._expiry)
+                # Salvo que se haya vuelto a revocar con otra caducidad
+                if self._revoked.get(d) == exp:
+                    del self._revoked[d]
+            self._revoked[digest] = expires_at
+            heapq.heappush(self._expiry, (expires_at, digest))
+
+    def contains(self, digest: bytes) -> bool:
+        return digest in self._revoked
+
+
+class RedisRevocationList(RevocationList):
+    """Revocaciones compartidas entre workers; cada clave expira con el token.
+
+    Usa el cliente asíncrono de Redis para no bloquear el bucle de eventos.
+    Las revocaciones se guardan también en memoria, así que el worker que
+    hace logout rechaza el token aunque Redis falle al guardarlo.
+    """
+
+    def __init__(self, client, prefix: str = "pacta:revoked:", fail_open: bool = TOKEN_REVOCATION_FAIL_OPEN):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.fail_open = fail_open
+
+    async def revoke(self, digest: bytes, expires_at: float) -> bool:
+        self.add(digest, expires_at)
+        ttl = max(1, int(expires_at - time.time()) + 1)
+        try:
+            await self.client.set(self.prefix + digest.hex(), 1, ex=ttl)
+        except Exception as e:
+            logger.error("No se ha podido revocar el token en Redis (solo en este worker): %s", e)
+            return False
+        return True
+
+    async def is_revoked(self, digest: bytes) -> bool:
+        if self.contains(digest):
+            return True
+        try:
+            return bool(await self.client.exists(self.prefix + digest.hex()))
+        except Exception as e:
+            logger.warning(
+                "Lista de revocación Redis no disponible, token %s: %s",
+                "aceptado" if self.fail_open else "rechazado", e,
+            )
+            return not self.fail_open
+
+
+def create_revocation_list(backend: str = TOKEN_REVOCATION_BACKEND) -> RevocationList:
+    if backend == "redis":
+        import redis.asyncio as redis
+
+        return RedisRevocationList(redis.from_url(REDIS_URL))
+    return RevocationList()
+
+
+token_cache = TokenCache()
+revocations = create_revocation_list()
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Crear un token de acceso firmado."""
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=15)
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+async def decode_token(token: str) -> Optional[dict]:
+    """Devolver los claims de un token válido y no revocado, o None."""
+    digest = token_digest(token)
+    if await revocations.is_revoked(digest):
+        token_cache.discard(digest)
+        return None
+
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except PyJWTError:
+        return None
+    token_cache.put(digest, claims, claims.get("exp", time.time()))
+    return claims
+
+
+async def revoke_token(token: str) -> bool:
+    """Revocar un token hasta su caducidad natural.
+
+    Devuelve False si la revocación no se ha podido compartir con los demás
+    workers (Redis no disponible).
+    """
+    digest = token_digest(token)
+    try:
+        claims = jwt.decode(
+            token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False}
+        )
+    except PyJWTError:
+        return True
+    token_cache.discard(digest)
+    return await revocations.revoke(digest, claims.get("exp", time.time()))
@@ -0,0 +1,213 @@
+"""
+Caché de lectura de usuarios para login y restauración de sesión.
+
+Guarda una proyección inmutable de la fila (``UserRecord``) indexada por
+username y por id durante ``USER_CACHE_TTL`` segundos, y también los usernames
+inexistentes durante ``USER_CACHE_NEGATIVE_TTL`` para que un ataque de
+enumeración no llegue a la base de datos. Cualquier alta, modificación o
+borrado de ``UserModel`` a través del ORM invalida las entradas afectadas al
+confirmar la transacción; los cambios hechos con SQL directo deben llamar a
+``invalidate_user``.
+
+La caché es local a cada worker: el TTL acota cuánto puede tardar otro worker
+en ver un cambio.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from pacta.models.user import User, UserModel
+from pacta.utils.database import run_db
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))  # 0 desactiva la caché
+USER_CACHE_NEGATIVE_TTL = float(os.getenv("USER_CACHE_NEGATIVE_TTL", "30"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "50000"))
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    """Proyección de ``UserModel`` necesaria para autenticar."""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    password_hash: str
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    def to_user(self) -> User:
+        return User(
+            id=self.id,
+            username=self.username,
+            email=self.email,
+            is_active=self.is_active,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+
+class UserCache:
+    """Caché TTL de ``UserRecord`` con entradas negativas."""
+
+    def __init__(
+        self,
+        ttl: float = USER_CACHE_TTL,
+        negative_ttl: float = USER_CACHE_NEGATIVE_TTL,
+        max_size: int = USER_CACHE_MAX_SIZE,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._by_username = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _evict(self):
+        # Al llenarse se vacía: más barato que llevar un LRU y el TTL es corto
+        if len(self._by_username) >= self.max_size:
+            self._by_username.clear()
+            self._by_id.clear()
+
+    def get_by_username(self, username: str):
+        """Devuelve el ``UserRecord``, None si se sabe que no existe, o ``_MISSING``."""
+        with self._lock:
+            entry = self._by_username.get(username)
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return _MISSING
+            self.hits += 1
+            return entry[0]
+
+    def get_by_id(self, user_id: int) -> Optional[UserRecord]:
+        with self._lock:
+            entry = self._by_id.get(user_id)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            return entry[0]
+
+    def put(self, record: UserRecord):
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._evict()
+            self._by_username[record.username] = (record, expires)
+            self._by_id[record.id] = (record, expires)
+
+    def put_missing(self, username: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._evict()
+            self._by_username[username] = (None, time.monotonic() + self.negative_ttl)
+
+    def invalidate(self, username: Optional[str] = None, user_id: Optional[int] = None):
+        with self._lock:
+            if user_id is not None:
+                entry = self._by_id.pop(user_id, None)
+                if entry is not None:
+                    self._by_username.pop(entry[0].username, None)
+            if username is not None:
+                entry = self._by_username.pop(username, None)
+                if entry is not None and entry[0] is not None:
+                    self._by_id.pop(entry[0].id, None)
+
+    def clear(self):
+        with self._lock:
+            self._by_username.clear()
+            self._by_id.clear()
+
+
+user_cache = UserCache()
+
+
+def _load_user(db: Session, username: str) -> Optional[UserRecord]:
+    row = (
+        db.query(
+            UserModel.id,
+            UserModel.username,
+            UserModel.email,
+            UserModel.is_active,
+            UserModel.password_hash,
+            UserModel.created_at,
+            UserModel.updated_at,
+        )
+        .filter(UserModel.username == username)
+        .first()
+    )
+    if row is None:
+        return None
+    return UserRecord(
+        id=row.id,
+        username=row.username,
+        email=row.email,
+        is_active=row.is_active,
+        password_hash=row.password_hash,
+        created_at=row.created_at.isoformat() if row.created_at else None,
+        updated_at=row.updated_at.isoformat() if row.updated_at else None,
+    )
+
+
+async def get_user(username: str) -> Optional[UserRecord]:
+    """Obtener un usuario por username, consultando la base de datos solo si no está en caché."""
+    record = user_cache.get_by_username(username)
+    if record is not _MISSING:
+        return record
+    record = await run_db(_load_user, username)
+    if record is None:
+        user_cache.put_missing(username)
+    else:
+        user_cache.put(record)
+    return record
+
+
+def cached_user(username: str) -> Optional[UserRecord]:
+    """Consultar solo la caché (sin acceso a la base de datos)."""
+    record = user_cache.get_by_username(username)
+    return None if record is _MISSING else record
+
+
+def invalidate_user(username: Optional[str] = None, user_id: Optional[int] = None):
+    """Hook de invalidación para altas, cambios de contraseña o desactivaciones."""
+    user_cache.invalidate(username=username, user_id=user_id)
+
+
+# Las claves afectadas se acumulan en la sesión y se invalidan al confirmarla:
+# invalidar en el flush dejaría que otra petición recargase la fila antigua
+# (aún sin confirmar) y la guardase en caché hasta el TTL
+@event.listens_for(UserModel, "after_insert")
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _track_user(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    keys = session.info.setdefault("user_cache_keys", set())
+    keys.add((target.username, target.id))
+    # Si cambió el username, la entrada antigua también queda obsoleta
+    for old_username in inspect(target).attrs.username.history.deleted:
+        keys.add((old_username, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users(session):
+    for username, user_id in session.info.pop("user_cache_keys", ()):
+        invalidate_user(username=username, user_id=user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_users(session, previous_transaction):
+    session.info.pop("user_cache_keys", None)
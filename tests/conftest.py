@@ -0,0 +1,105 @@
+"""
+Configuración común de las pruebas: base de datos SQLite y directorio de
+documentos temporales, y envío de eventos a la aplicación Reflex.
+
+``DB_URL`` y ``DOCUMENTS_DIR`` se fijan antes de que ninguna prueba importe
+``pacta``, ya que ``pacta.utils.database`` crea el engine al importarse y
+``pacta.utils.documents``, el almacén.
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.TemporaryDirectory()
+os.environ["DB_URL"] = f"sqlite:///{_db_dir.name}/pacta-test.db"
+os.environ["DOCUMENTS_DIR"] = f"{_db_dir.name}/documents"
+# Coste bcrypt bajo: las pruebas no miden el hashing
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Todas las pruebas inician sesión desde la misma IP
+os.environ.setdefault("LOGIN_ATTEMPT_LIMIT", "1000")
+
+# Usuario de las pruebas de extremo a extremo
+USERNAME = "ana"
+PASSWORD = "secreta-123"
+
+
+class _Updates:
+    """Sustituto del ``EventNamespace`` de Socket.IO: guarda lo que emiten los eventos en segundo plano."""
+
+    def __init__(self):
+        self.updates = []
+
+    async def emit_update(self, update, sid):
+        self.updates.append(update)
+
+
+@pytest.fixture(scope="session")
+def app():
+    import reflex as rx
+    from reflex.state import StateManagerMemory
+
+    from pacta.pacta import app
+    from pacta.utils.database import create_admin, init_db
+
+    init_db()
+    create_admin(USERNAME, f"{USERNAME}@pacta.app", PASSWORD)
+    # Sin servidor no hay socket ni gestor de estado: uno en memoria basta
+    app._state_manager = StateManagerMemory(state=rx.State)
+    return app
+
+
+@pytest.fixture
+def send(app):
+    """``send(client_token, handler, state=AuthState, pathname="/login", **payload)``.
+
+    Procesa el evento con ``reflex.app.process``, como lo haría el websocket,
+    espera a los eventos en segundo plano y devuelve las variables de ``state``
+    que ha modificado, sin el sufijo ``_rx_state_``.
+    """
+    from reflex.app import process
+    from reflex.event import Event
+
+    from pacta.state.auth_state import AuthState
+
+    def send(client_token, handler, state=AuthState, pathname="/login", **payload):
+        name = state.get_full_name()
+        event = Event(
+            token=client_token,
+            name=f"{name}.{handler}",
+            payload=payload,
+            router_data={"pathname": pathname, "query": {}},
+        )
+
+        async def collect():
+            delta = {}
+            async for update in process(app, event, "sid", {}, "127.0.0.1"):
+                delta.update(update.delta.get(name, {}))
+            # Los eventos en segundo plano empiezan después y emiten por el
+            # namespace; con él definido, process pediría recargar los
+            # estados nuevos
+            app._event_namespace = updates = _Updates()
+            try:
+                await asyncio.gather(*app._background_tasks)
+            finally:
+                app._event_namespace = None
+            for update in updates.updates:
+                delta.update(update.delta.get(name, {}))
+            return {key.removesuffix("_rx_state_"): value for key, value in delta.items()}
+
+        return asyncio.run(collect())
+
+    return send
+
+
+@pytest.fixture
+def login(send):
+    """``login(client_token, csrf_token)``: enviar el formulario de login de ``USERNAME``."""
+
+    def login(client_token, csrf_token):
+        send(client_token, "set_username", value=USERNAME)
+        send(client_token, "set_password", value=PASSWORD)
+        return send(client_token, "handle_submit", form_data={"csrf_token": csrf_token})
+
+    return login
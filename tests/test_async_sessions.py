@@ -0,0 +1,39 @@
+"""
+``run_db``: una consulta lenta en una sesión no retrasa las de otras sesiones.
+
+Versión corta de ``benchmarks/async_sessions.py`` sobre la base de datos
+temporal de las pruebas.
+"""
+import asyncio
+import time
+
+from sqlalchemy import text
+
+SLOW_SQL = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT count(*) FROM c"
+)
+MAX_DELAY = 0.25  # s
+
+
+def test_slow_query_does_not_delay_other_sessions():
+    from pacta.utils.database import init_db, run_db
+
+    init_db()
+
+    async def scenario():
+        slow = asyncio.create_task(run_db(lambda db: db.execute(SLOW_SQL, {"n": 2_000_000}).scalar()))
+        await asyncio.sleep(0.02)
+        delays = []
+        while not slow.done():
+            start = time.perf_counter()
+            await run_db(lambda db: db.execute(text("SELECT count(*) FROM users")).scalar())
+            delays.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+        return await slow, delays
+
+    count, delays = asyncio.run(scenario())
+    assert count == 2_000_000
+    # Las consultas rápidas se atienden mientras dura la lenta
+    assert len(delays) >= 5
+    assert max(delays) < MAX_DELAY
@@ -0,0 +1,68 @@
+"""
+Pruebas de ``pacta.utils.csrf``.
+
+Las pruebas de extremo a extremo envían eventos a la aplicación con
+``reflex.app.process``, como lo haría el websocket: el formulario de login
+obtiene un token con ``issue_csrf_token`` y lo devuelve en ``handle_submit``.
+"""
+import pytest
+
+from pacta.utils.csrf import CsrfProtector, ReplayFilter
+
+
+def test_login_with_form_token(send, login):
+    token = send("client-ok", "issue_csrf_token")["csrf_token"]
+    delta = login("client-ok", token)
+    assert delta["is_authenticated"] is True
+    assert delta["auth_token"] == delta["token"]
+    # El token consumido se sustituye por otro
+    assert delta["csrf_token"] not in ("", token)
+
+
+def test_login_without_token_is_rejected(login):
+    delta = login("client-missing", None)
+    assert delta["error"] == "Invalid or missing CSRF token"
+    assert "is_authenticated" not in delta
+
+
+def test_token_is_single_use(send, login):
+    token = send("client-replay", "issue_csrf_token")["csrf_token"]
+    send("client-replay", "set_password", value="incorrecta")
+    first = send("client-replay", "handle_submit", form_data={"csrf_token": token})
+    assert first["error"] == "Usuario o contraseña incorrectos"
+    delta = login("client-replay", token)
+    assert delta["error"] == "Invalid or missing CSRF token"
+
+
+def test_token_is_bound_to_client(send, login):
+    token = send("client-a", "issue_csrf_token")["csrf_token"]
+    delta = login("client-b", token)
+    assert delta["error"] == "Invalid or missing CSRF token"
+
+
+@pytest.mark.parametrize("token", ["ñ", "a.b.c.ñé", "x" * 10, "..."])
+def test_verify_rejects_malformed_tokens(token):
+    protector = CsrfProtector(keys=[b"k"])
+    assert protector.verify(token, "session") is False
+    issued = protector.issue("session")
+    assert protector.verify(issued[:-2] + "ñé", "session") is False
+    assert protector.verify(issued, "session") is True
+
+
+def test_key_rotation():
+    old = CsrfProtector(keys=[b"old"], one_time=False)
+    rotated = CsrfProtector(keys=[b"new", b"old"], one_time=False)
+    assert rotated.verify(old.issue("session"), "session")
+    assert not old.verify(rotated.issue("session"), "session")
+
+
+def test_replay_filter_is_compact_and_expires():
+    replay = ReplayFilter(max_age=3600)
+    ids = [(i * 0x9E3779B97F4A7C15) % 2**64 for i in range(10_000)]
+    assert all(replay.check_and_add(token_id, 0, now=10) for token_id in ids)
+    assert not any(replay.check_and_add(token_id, 0, now=10) for token_id in ids[::7])
+    assert len(replay) == 10_000
+    # 8 bytes por token más la cabecera y la reserva de los arrays
+    assert 8 * 10_000 <= replay.nbytes < 12 * 10_000 + 256 * 80
+    replay.check_and_add(1, 3700, now=3800)
+    assert len(replay) == 1
@@ -0,0 +1,117 @@
+"""
+API de documentos (``pacta.api``) con ``TestClient`` y ficheros pequeños.
+
+``benchmarks/document_upload.py`` hace lo mismo con ficheros de varios GB y
+comprueba el techo de memoria.
+"""
+import hashlib
+import random
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pacta.api import api
+from pacta.utils.documents import document_store
+
+CONTENT = random.Random(18).randbytes(10_000)
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture(scope="module")
+def contracts():
+    from pacta.models.contract import ContractModel
+    from pacta.models.user import UserModel
+    from pacta.utils.database import create_admin, init_db, session_scope
+
+    init_db()
+    create_admin("docs", "docs@pacta.app", "docs-password")
+    with session_scope() as db:
+        owner = db.query(UserModel).filter_by(username="docs").one()
+        rows = [
+            ContractModel(reference=f"CTR-DOC-{i}", title="Arrendamiento", counterparty="Inmuebles S.A.",
+                          start_date=date(2025, 1, 1), end_date=date(2026, 1, 1), owner_id=owner.id)
+            for i in range(2)
+        ]
+        db.add_all(rows)
+        db.flush()
+        return [row.id for row in rows]
+
+
+@pytest.fixture
+def client(contracts, monkeypatch):
+    from pacta.utils.tokens import create_access_token
+
+    # Bloques pequeños: la subida se escribe en varios trozos
+    monkeypatch.setattr(document_store, "chunk_size", 1024)
+    client = TestClient(api)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': 'docs'})}"
+    return client
+
+
+def upload(client, contract_id, content=CONTENT, filename="contrato.pdf"):
+    return client.post(f"/api/contracts/{contract_id}/documents", params={"filename": filename}, content=content)
+
+
+def stored_files():
+    return sorted(path for path in document_store.root.rglob("*") if path.is_file())
+
+
+def test_identical_uploads_are_stored_once(client, contracts):
+    first, second = contracts
+    response = upload(client, first, filename="../otros/contrato.pdf")
+    assert response.status_code == 201
+    document = response.json()
+    assert document["sha256"] == SHA256
+    assert document["size"] == len(CONTENT)
+    assert document["filename"] == "contrato.pdf"
+    assert document["content_type"] == "application/pdf"
+    # El mismo fichero en el mismo contrato es el mismo documento; en otro, otro
+    # documento con el mismo contenido en disco. Sin Content-Length, en streaming
+    again = upload(client, first, content=iter([CONTENT[:3000], CONTENT[3000:]]))
+    assert again.json()["id"] == document["id"]
+    other = upload(client, second)
+    assert other.json()["id"] != document["id"]
+    assert other.json()["sha256"] == SHA256
+    # Dos niveles de directorios por los primeros bytes del hash
+    assert stored_files() == [document_store.root / SHA256[:2] / SHA256[2:4] / SHA256]
+    assert document_store.path_for(SHA256).read_bytes() == CONTENT
+    listed = client.get(f"/api/contracts/{first}/documents").json()
+    assert [d["id"] for d in listed] == [document["id"]]
+
+
+def test_download_with_range(client, contracts):
+    document = upload(client, contracts[0]).json()
+    response = client.get(f"/api/documents/{document['id']}")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{SHA256}"'
+    partial = client.get(f"/api/documents/{document['id']}", headers={"Range": "bytes=100-1123"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 100-1123/{len(CONTENT)}"
+    assert partial.content == CONTENT[100:1124]
+
+
+def test_requires_authentication(client, contracts):
+    anonymous = TestClient(api)
+    assert upload(anonymous, contracts[0]).status_code == 401
+    assert anonymous.get(f"/api/contracts/{contracts[0]}/documents").status_code == 401
+    assert anonymous.get("/api/documents/1").status_code == 401
+    forged = anonymous.get("/api/documents/1", headers={"Authorization": "Bearer no-es-un-token"})
+    assert forged.status_code == 401
+
+
+def test_unknown_contract_or_document(client):
+    assert upload(client, 999_999).status_code == 404
+    assert client.get("/api/documents/999999").status_code == 404
+
+
+def test_too_large(client, contracts, monkeypatch):
+    monkeypatch.setattr(document_store, "max_bytes", len(CONTENT) - 1)
+    before = stored_files()
+    # Rechazada por Content-Length antes de leer el cuerpo
+    assert upload(client, contracts[0], content=CONTENT + b"x").status_code == 413
+    # Sin Content-Length: se corta al superar el límite y se borra el temporal
+    streamed = upload(client, contracts[0], content=iter([CONTENT[:5000], CONTENT[5000:] + b"x"]))
+    assert streamed.status_code == 413
+    assert stored_files() == before
@@ -0,0 +1,213 @@
+"""
+Pruebas de ``pacta.utils.rate_limit``.
+
+``RedisRateLimiter`` se prueba contra ``LocalRedis``, un sustituto en proceso
+del cliente ``redis.asyncio`` que implementa los comandos que usa el
+limitador y la semántica del script Lua. Con ``PACTA_TEST_REDIS_URL`` (p. ej.
+``redis://localhost:6379/15``) las mismas pruebas se ejecutan además contra
+un Redis real.
+"""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pacta.utils import rate_limit as rl
+from pacta.utils.rate_limit import MemoryRateLimiter, RateLimiter, RedisRateLimiter
+
+WINDOW = 900
+T0 = 1_000 * WINDOW  # Inicio de una ventana
+TEST_REDIS_URL = os.getenv("PACTA_TEST_REDIS_URL")
+
+
+class LocalRedis:
+    """Sustituto en proceso de ``redis.asyncio.Redis`` para el limitador."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.data.pop(key, None)
+            del self.expires[key]
+        return key in self.data
+
+    async def get(self, key):
+        return self.data.get(key) if self._alive(key) else None
+
+    async def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        return int(self.expires[key] - time.time()) if key in self.expires else -1
+
+    async def delete(self, *keys):
+        deleted = sum(1 for key in keys if self._alive(key))
+        for key in keys:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return deleted
+
+    def register_script(self, source):
+        assert source == rl._SLIDING_WINDOW_LUA
+
+        async def script(keys, args):
+            # Sin await intermedios: atómico como EVALSHA
+            curr = int(self.data.get(keys[0], 0)) if self._alive(keys[0]) else 0
+            prev = int(self.data.get(keys[1], 0)) if self._alive(keys[1]) else 0
+            if prev * (1 - float(args[1])) + curr >= int(args[0]):
+                return 0
+            self.data[keys[0]] = curr + 1
+            self.expires[keys[0]] = time.time() + int(args[2])
+            return 1
+
+        return script
+
+    async def aclose(self):
+        pass
+
+
+class BrokenRedis(LocalRedis):
+    def register_script(self, source):
+        async def script(keys, args):
+            raise ConnectionError("Connection refused")
+
+        return script
+
+    async def delete(self, *keys):
+        raise ConnectionError("Connection refused")
+
+
+@pytest.fixture(params=["local", "redis"])
+def redis_client(request, monkeypatch):
+    """Fábrica de clientes: el cliente asíncrono debe crearse dentro del bucle."""
+    if request.param == "local":
+        monkeypatch.setattr(rl.time, "time", lambda: T0 + 1.0)
+        return LocalRedis
+    if not TEST_REDIS_URL:
+        pytest.skip("PACTA_TEST_REDIS_URL no definida")
+    import redis.asyncio as redis
+
+    return lambda: redis.from_url(TEST_REDIS_URL)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_interface_is_abstract():
+    class Partial(RateLimiter):
+        async def hit(self, key):
+            return True
+
+    with pytest.raises(TypeError):
+        Partial(5, WINDOW)
+
+
+def test_memory_limit_and_sliding_window():
+    limiter = MemoryRateLimiter(5, WINDOW)
+    assert all(limiter.check("ip:a", now=T0 + i) for i in range(5))
+    assert not limiter.check("ip:a", now=T0 + 10)
+    assert limiter.check("ip:b", now=T0 + 10)
+    # A mitad de la siguiente ventana cuentan 5 * 0.5 intentos anteriores
+    assert all(limiter.check("ip:a", now=T0 + WINDOW * 1.5) for _ in range(3))
+    assert not limiter.check("ip:a", now=T0 + WINDOW * 1.5)
+
+
+def test_memory_evicts_least_recently_active():
+    limiter = MemoryRateLimiter(5, WINDOW, max_keys=3)
+    for i, key in enumerate(["a", "b", "c", "a", "d"]):
+        limiter.check(key, now=T0 + i)
+    assert len(limiter) == 3
+    assert list(limiter._counters) == ["c", "a", "d"]
+
+
+def test_memory_blocked_attempts_count_as_activity():
+    limiter = MemoryRateLimiter(1, WINDOW, max_keys=2)
+    limiter.check("a", now=T0)
+    limiter.check("b", now=T0 + 1)
+    assert not limiter.check("a", now=T0 + 2)
+    limiter.check("c", now=T0 + 3)
+    assert list(limiter._counters) == ["a", "c"]
+
+
+def test_memory_sweeps_idle_keys():
+    limiter = MemoryRateLimiter(5, WINDOW)
+    for i in range(1000):
+        limiter.check(f"ip:{i}", now=T0 + i / 1000)
+    limiter.check("ip:late", now=T0 + WINDOW + 1)
+    assert len(limiter) == 1001
+    limiter.check("ip:later", now=T0 + 2 * WINDOW + 1)
+    assert list(limiter._counters) == ["ip:late", "ip:later"]
+
+
+def test_memory_reset():
+    limiter = MemoryRateLimiter(1, WINDOW)
+    assert run(limiter.hit("user:ana"))
+    assert not run(limiter.hit("user:ana"))
+    run(limiter.reset("user:ana"))
+    assert run(limiter.hit("user:ana"))
+
+
+def test_redis_limit_is_shared_and_atomic(redis_client):
+    async def scenario():
+        client = redis_client()
+        # Dos workers con su propio limitador sobre el mismo Redis
+        workers = [RedisRateLimiter(client, 5, WINDOW, prefix="pacta:test:rl:") for _ in range(2)]
+        await workers[0].reset("ip:shared")
+        results = await asyncio.gather(*(workers[i % 2].hit("ip:shared") for i in range(20)))
+        ttl = await client.ttl(workers[0]._keys("ip:shared", int(rl.time.time() // WINDOW))[0])
+        await workers[0].reset("ip:shared")
+        await client.aclose()
+        return results, ttl
+
+    results, ttl = run(scenario())
+    assert sum(results) == 5
+    assert 0 < ttl <= 2 * WINDOW + 1
+
+
+def test_redis_reset(redis_client):
+    async def scenario():
+        client = redis_client()
+        limiter = RedisRateLimiter(client, 1, WINDOW, prefix="pacta:test:rl:")
+        await limiter.reset("user:ana")
+        first = await limiter.hit("user:ana")
+        blocked = await limiter.hit("user:ana")
+        await limiter.reset("user:ana")
+        again = await limiter.hit("user:ana")
+        await limiter.reset("user:ana")
+        await client.aclose()
+        return first, blocked, again
+
+    assert run(scenario()) == (True, False, True)
+
+
+def test_redis_unavailable_fails_open(caplog):
+    limiter = RedisRateLimiter(BrokenRedis(), 1, WINDOW)
+    assert run(limiter.hit("ip:a"))
+    assert run(limiter.hit("ip:a"))
+    run(limiter.reset("ip:a"))
+    assert "Redis no disponible" in caplog.text
+
+
+def test_decorator_limits_by_session_ip():
+    limiter = MemoryRateLimiter(2, WINDOW)
+    calls = []
+
+    @rl.rate_limit(limiter, key=("ip", "username"), message="bloqueado")
+    async def login(state):
+        calls.append(state.username)
+
+    def state(ip, username):
+        router = SimpleNamespace(session=SimpleNamespace(client_ip=ip))
+        return SimpleNamespace(router=router, username=username, error="")
+
+    for _ in range(2):
+        run(login(state("10.0.0.1", "ana")))
+    blocked = state("10.0.0.1", "luis")
+    run(login(blocked))
+    assert calls == ["ana", "ana"]
+    assert blocked.error == "bloqueado"
+    assert "ip:10.0.0.1" in limiter._counters
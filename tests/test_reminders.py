@@ -0,0 +1,58 @@
+"""Pruebas de la sincronización incremental de ``pacta.utils.reminders``."""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, update
+
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.models.user import Base, UserModel
+from pacta.utils.database import create_db_engine
+from pacta.utils.reminders import ReminderScheduler
+
+NOW = datetime(2025, 6, 2, 6, tzinfo=timezone.utc)
+
+
+def contract(contract_id: int, end_date: date, **values) -> dict:
+    return {
+        "id": contract_id, "reference": f"CTR-{contract_id}", "title": "Mantenimiento", "counterparty": "Acme S.L.",
+        "status": ContractStatus.ACTIVE, "start_date": date(2025, 1, 1), "end_date": end_date, "owner_id": 1,
+        **values,
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'reminders.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel).values(id=1, username="ana", email="ana@pacta.app", password_hash="x"))
+        conn.execute(insert(ContractModel), [contract(i, date(2026, 1, 1)) for i in (1, 2, 3)])
+    yield engine
+    engine.dispose()
+
+
+def test_sync_rereads_inserts_committed_late(engine):
+    scheduler = ReminderScheduler(engine, sync_seconds=60, sync_overlap=300)
+    scheduler.reload(NOW)
+    with engine.begin() as conn:
+        conn.execute(insert(ContractModel), [contract(10, date(2026, 1, 1))])
+    scheduler.sync(NOW)
+    # Transacción larga: su id es anterior al último leído, pero confirma después
+    with engine.begin() as conn:
+        conn.execute(insert(ContractModel), [contract(5, NOW.date() + timedelta(days=1))])
+    scheduler.sync(NOW)
+    assert 5 in scheduler._scheduled
+
+
+@pytest.mark.parametrize("overlap, seen", [(300, True), (1, False)])
+def test_sync_rereads_updates_within_overlap(engine, overlap, seen):
+    scheduler = ReminderScheduler(engine, sync_seconds=60, sync_overlap=overlap)
+    scheduler.reload(NOW)
+    # updated_at es la hora de inicio de la transacción, anterior a la marca de agua
+    with engine.begin() as conn:
+        conn.execute(
+            update(ContractModel).where(ContractModel.id == 2)
+            .values(end_date=NOW.date() + timedelta(days=1), updated_at=NOW - timedelta(seconds=200))
+        )
+    scheduler.sync(NOW)
+    assert (2 in scheduler._scheduled) is seen
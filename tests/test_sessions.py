@@ -0,0 +1,60 @@
+"""
+Ciclo de vida de las sesiones de base de datos (``pacta.utils.database``).
+
+La prueba de resistencia es la versión corta de
+``benchmarks/session_soak.py``: logins concurrentes por ``run_db`` y, al
+terminar, ninguna sesión abierta ni conexión prestada.
+"""
+import asyncio
+import logging
+import time
+
+from pacta.utils.database import SessionStats
+
+USERNAME = "soak"
+PASSWORD = "soak-password"
+
+
+def test_concurrent_logins_release_sessions_and_connections():
+    from pacta.utils.database import checked_out_connections, create_admin, init_db, run_db, session_stats
+    from pacta.utils.passwords import verify_password
+    from pacta.utils.user_cache import _load_user
+
+    init_db()
+    create_admin(username=USERNAME, email="soak@pacta.app", password=PASSWORD)
+    session_stats.reset()
+
+    async def soak(logins=500, concurrency=50):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                user = await run_db(_load_user, USERNAME)
+                return user is not None and await verify_password(PASSWORD, user.password_hash)
+
+        return sum(await asyncio.gather(*(login() for _ in range(logins))))
+
+    assert asyncio.run(soak()) == 500
+    stats = session_stats.snapshot()
+    assert stats["sessions_total"] >= 500
+    assert stats["open_sessions"] == stats["stale_sessions"] == stats["checked_out"] == 0
+    assert checked_out_connections() == 0
+
+
+def test_sessions_left_open_are_reported_once(caplog):
+    stats = SessionStats(warn_after=0.01)
+    leaked = stats.session_opened()
+    closed = stats.session_opened()
+    time.sleep(0.02)
+    stats.session_closed(closed)
+    with caplog.at_level(logging.WARNING, logger="pacta.utils.database"):
+        snapshot = stats.snapshot()
+        assert snapshot["open_sessions"] == snapshot["stale_sessions"] == 1
+        assert snapshot["oldest_session_seconds"] > 0.01
+        assert snapshot["long_lived_sessions"] == 2
+        # Ni una nueva lectura ni el cierre la cuentan otra vez
+        stats.snapshot()
+        stats.session_closed(leaked)
+    assert stats.snapshot()["long_lived_sessions"] == 2
+    assert stats.snapshot()["open_sessions"] == 0
+    assert len([r for r in caplog.records if "sin cerrarse" in r.getMessage()]) == 1
@@ -0,0 +1,73 @@
+"""
+Acceso a los datos de contratos desde los estados de Reflex.
+
+La interfaz de las páginas privadas se oculta con ``rx.cond``, pero cualquier
+cliente del websocket puede lanzar sus eventos: sin sesión no deben devolver
+datos.
+"""
+from datetime import date
+
+import pytest
+
+from pacta.models.contract import ContractModel, ContractStatus
+from pacta.state.contracts_state import ContractsState
+from pacta.state.statistics_state import StatisticsState
+
+REFERENCE = "CTR-PRIVADO-1"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def contract(app):
+    from pacta.models.user import UserModel
+    from pacta.utils.database import session_scope
+
+    with session_scope() as db:
+        owner = db.query(UserModel).filter_by(username="ana").one()
+        db.add(ContractModel(
+            reference=REFERENCE, title="Suministro confidencial", counterparty="ACME Secreta S.L.",
+            status=ContractStatus.ACTIVE, value=125000, start_date=date(2025, 1, 1), end_date=date(2030, 1, 1),
+            owner_id=owner.id,
+        ))
+
+
+@pytest.fixture
+def signed_in(send, login):
+    """Token de un cliente con sesión iniciada."""
+    client_token = "client-signed-in"
+    login(client_token, send(client_token, "issue_csrf_token")["csrf_token"])
+    return client_token
+
+
+def test_contracts_require_session(send):
+    delta = send("client-anonymous", "load", state=ContractsState, pathname="/contratos")
+    assert not delta.get("rows")
+    assert not delta.get("total")
+    delta = send("client-anonymous", "scroll_to", state=ContractsState, pathname="/contratos", scroll_top=4000)
+    assert not delta.get("rows")
+
+
+def test_contracts_with_session(send, signed_in):
+    delta = send(signed_in, "load", state=ContractsState, pathname="/contratos")
+    # La base de datos es común a todas las pruebas
+    assert REFERENCE in [row["reference"] for row in delta["rows"]]
+
+
+def test_search_requires_session(send, signed_in):
+    delta = send("client-anonymous", "set_search_query", state=ContractsState, pathname="/contratos", value="ACME")
+    assert not delta.get("search_results")
+    delta = send(signed_in, "set_search_query", state=ContractsState, pathname="/contratos", value="ACME")
+    assert [row["title"] for row in delta["search_results"]] == ["Suministro confidencial"]
+
+
+def test_statistics_require_session(send, signed_in):
+    delta = send("client-anonymous", "load", state=StatisticsState, pathname="/estadisticas")
+    assert not any(delta.get(name) for name in ("totals", "by_status", "by_type", "top_counterparties"))
+    delta = send(signed_in, "load", state=StatisticsState, pathname="/estadisticas")
+    assert delta["by_status"]
+
+
+def test_portfolio_analytics_require_session(send, signed_in):
+    delta = send("client-anonymous", "load_analytics", state=StatisticsState, pathname="/estadisticas")
+    assert not delta.get("exposure")
+    delta = send(signed_in, "load_analytics", state=StatisticsState, pathname="/estadisticas")
+    assert [row["key"] for row in delta["exposure"]] == ["ACME Secreta S.L."]
@@ -0,0 +1,68 @@
+"""Pruebas de la lista de revocación de ``pacta.utils.tokens``."""
+import asyncio
+import time
+
+import pytest
+
+from pacta.utils.tokens import RedisRevocationList, token_digest
+
+
+class LocalRedis:
+    """Sustituto en proceso de ``redis.asyncio.Redis`` (SET con EX y EXISTS)."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, time.time() + ex)
+
+    async def exists(self, key):
+        return int(key in self.data and self.data[key][1] > time.time())
+
+
+class BrokenRedis:
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("Connection refused")
+
+    async def exists(self, key):
+        raise ConnectionError("Connection refused")
+
+
+def test_revocation_is_shared_between_workers():
+    client = LocalRedis()
+    worker_a, worker_b = RedisRevocationList(client), RedisRevocationList(client)
+    digest = token_digest("token")
+    assert asyncio.run(worker_a.revoke(digest, time.time() + 60))
+    assert asyncio.run(worker_b.is_revoked(digest))
+    assert not asyncio.run(worker_b.is_revoked(token_digest("otro")))
+
+
+def test_failed_revoke_is_reported_and_kept_locally(caplog):
+    revocations = RedisRevocationList(BrokenRedis())
+    digest = token_digest("token")
+    assert asyncio.run(revocations.revoke(digest, time.time() + 60)) is False
+    assert "solo en este worker" in caplog.text
+    assert asyncio.run(revocations.is_revoked(digest))
+
+
+@pytest.mark.parametrize("fail_open", [True, False])
+def test_unavailable_redis_follows_fail_open(fail_open):
+    revocations = RedisRevocationList(BrokenRedis(), fail_open=fail_open)
+    assert asyncio.run(revocations.is_revoked(token_digest("token"))) is not fail_open
+
+
+def test_expired_revocations_are_swept(monkeypatch):
+    from pacta.utils import tokens
+
+    revoked = tokens.RevocationList()
+    monkeypatch.setattr(tokens.time, "time", lambda: 1000.0)
+    for i in range(100):
+        revoked.add(token_digest(f"t{i}"), 1000.0 + i)
+    # Vuelto a revocar con una caducidad posterior: la entrada antigua no lo borra
+    revoked.add(token_digest("t0"), 2000.0)
+    monkeypatch.setattr(tokens.time, "time", lambda: 1050.5)
+    revoked.add(token_digest("nuevo"), 3000.0)
+    assert len(revoked._revoked) == 100 - 51 + 1 + 1
+    assert revoked.contains(token_digest("t0"))
+    assert not revoked.contains(token_digest("t1"))
+    assert revoked.contains(token_digest("t51"))